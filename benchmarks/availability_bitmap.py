@@ -0,0 +1,98 @@
+"""
+Banc d'essai : créneaux libres et « l'agent est-il libre ? » sur de longues fenêtres
+
+Compare, avec le registre rempli comme dans benchmarks.busy_index :
+  - intervalles : créneaux candidats testés un à un contre chaque plage
+    occupée (_overlaps), comme _generate_slots_for_day avant les bitmaps ;
+  - bitmaps : tools.availability_bitmap, journées froides (construites à la
+    demande) puis chaudes (déjà en mémoire).
+
+Usage : python -m benchmarks.availability_bitmap [jours de fenêtre]
+"""
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List, Tuple
+
+from benchmarks.busy_index import BASE, _populate
+from tools.busy_index import BOOKED_INTERVALS
+from tools.check_availability import CALENDAR, _mock_busy, _overlaps, _working_blocks
+
+AGENTS = 500
+
+
+def _interval_free_slots(agent_id: str, start: datetime, end: datetime) -> List[Tuple[datetime, datetime]]:
+    found = []
+    day = start
+    while day < end:
+        busy = list(_mock_busy(agent_id, day)) + BOOKED_INTERVALS.overlapping(agent_id, day, day + timedelta(days=1))
+        for block_start, block_end in _working_blocks(day, None):
+            s = block_start
+            while s + timedelta(minutes=45) <= block_end:
+                e = s + timedelta(minutes=45)
+                if all(not _overlaps(s, e, b_s, b_e) for b_s, b_e in busy):
+                    found.append((s, e))
+                s += timedelta(hours=1)
+        day += timedelta(days=1)
+    return found
+
+
+def _interval_is_free(agent_id: str, start: datetime, end: datetime) -> bool:
+    day = start.replace(hour=0, minute=0)
+    if not any(b_s <= start and end <= b_e for b_s, b_e in _working_blocks(day, None)):
+        return False
+    busy = list(_mock_busy(agent_id, day)) + BOOKED_INTERVALS.overlapping(agent_id, start, end)
+    return all(not _overlaps(start, end, b_s, b_e) for b_s, b_e in busy)
+
+
+def _per_call_us(fn: Callable[..., object], calls: List[tuple]) -> float:
+    started = time.perf_counter()
+    for args in calls:
+        fn(*args)
+    return (time.perf_counter() - started) / len(calls) * 1e6
+
+
+def main() -> None:
+    window_days = int(sys.argv[1]) if len(sys.argv) > 1 else 90
+    rng = random.Random(42)
+    _populate(100_000, AGENTS, rng)
+
+    windows = [(f"agent-{rng.randrange(AGENTS)}", BASE + timedelta(days=rng.randrange(200))) for _ in range(100)]
+    windows = [(a, s, s + timedelta(days=window_days)) for a, s in windows]
+    for args in windows[:10]:
+        assert _interval_free_slots(*args) == CALENDAR.free_slots(*args)
+
+    print(f"Créneaux libres sur {window_days} jours (µs par requête)")
+    interval = _per_call_us(_interval_free_slots, windows)
+    CALENDAR.clear()
+    cold = _per_call_us(CALENDAR.free_slots, windows)
+    warm = _per_call_us(CALENDAR.free_slots, windows)
+    print(f"  intervalles       : {interval:10.1f}")
+    print(f"  bitmaps (froid)   : {cold:10.1f}")
+    print(f"  bitmaps (chaud)   : {warm:10.1f}  (x{interval / warm:.0f})")
+    for args in windows[:10]:
+        assert CALENDAR.count_free_slots(*args) == len(_interval_free_slots(*args))
+    print(f"  nombre seulement  : {_per_call_us(CALENDAR.count_free_slots, windows):10.1f}")
+    print(f"  premier créneau   : {_per_call_us(CALENDAR.first_free_slot, windows):10.1f}")
+
+    checks = []
+    for agent_id, start, _ in windows:
+        s = start + timedelta(days=rng.randrange(window_days), hours=rng.choice((9, 10, 11, 14, 15, 16, 17)))
+        checks.append((agent_id, s, s + timedelta(minutes=45)))
+    for args in checks:
+        assert _interval_is_free(*args) == CALENDAR.is_free(*args)
+    print("Agent libre sur un créneau (µs par requête)")
+    interval = _per_call_us(_interval_is_free, checks * 20)
+    warm = _per_call_us(CALENDAR.is_free, checks * 20)
+    print(f"  intervalles       : {interval:10.2f}")
+    print(f"  bitmaps (chaud)   : {warm:10.2f}  (x{interval / warm:.1f})")
+
+    started = time.perf_counter()
+    for agent_id, start, end in checks:
+        CALENDAR.mark_busy(agent_id, start, end)
+    print(f"Mise à jour à la réservation (mark_busy) : {(time.perf_counter() - started) / len(checks) * 1e6:.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
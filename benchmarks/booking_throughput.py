@@ -0,0 +1,91 @@
+"""
+Banc d'essai : débit des réservations sur le chemin asynchrone du nœud d'outils
+
+Compare create_event en outil synchrone (saut de thread puis create_event_sync)
+et avec son implémentation asynchrone native, attendue directement par
+ParallelToolNode. Mesure aussi les appels synchrones directs : une boucle
+d'événements neuve par appel (ancien create_event_sync) contre la boucle
+d'arrière-plan partagée (tools.loop_runner).
+
+Usage : python -m benchmarks.booking_throughput [réservations] [tours concurrents]
+"""
+import asyncio
+import itertools
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, Optional
+
+# Réglages email fictifs : sans eux, l'import du service email échoue à chaque
+# réservation et masque la mesure (aucun email n'est envoyé : pas de participant)
+for _name, _value in (("MAIL_USERNAME", "bench"), ("MAIL_PASSWORD", "bench"), ("MAIL_FROM", "bench@example.com")):
+    os.environ.setdefault(_name, _value)
+
+from langchain_core.messages import AIMessage
+from langchain_core.tools import BaseTool
+
+from src.graph.tool_node import ParallelToolNode
+from src.graph.tools import TOOL_CONCURRENCY_LIMITS, create_event
+from tools.create_event import create_event as acreate_event, create_event_sync
+
+# Numéros d'agents uniques d'une mesure à l'autre (aucun conflit de créneau)
+_agent_ids = itertools.count()
+
+
+def _event_args() -> Dict:
+    agent_id = f"bench-agent-{next(_agent_ids)}"
+    # 12:00-12:45 : jamais occupé dans l'agenda simulé ; sans participant, pas d'email
+    return {"agent_id": agent_id, "start": "2030-03-04T12:00:00", "end": "2030-03-04T12:45:00", "title": "Visite banc d'essai"}
+
+
+def _booking_state(call_id: str) -> Dict:
+    return {"messages": [AIMessage(content="", tool_calls=[{"name": "create_event", "args": _event_args(), "id": call_id, "type": "tool_call"}])]}
+
+
+async def _run(tool: BaseTool, bookings: int, concurrency: int, limits: Optional[Dict[str, int]]) -> float:
+    node = ParallelToolNode([tool], max_workers=concurrency, concurrency_limits=limits)
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one_turn(i: int) -> None:
+        async with gate:
+            result = await node.ainvoke(_booking_state(f"call_{i}"), {})
+            assert '"event_id"' in result["messages"][0].content, result["messages"][0].content
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_turn(i) for i in range(bookings)))
+    return bookings / (time.perf_counter() - started)
+
+
+def _direct_sync_rate(book: Callable[[Dict], Dict], bookings: int) -> float:
+    started = time.perf_counter()
+    for _ in range(bookings):
+        book(_event_args())
+    return bookings / (time.perf_counter() - started)
+
+
+def main() -> None:
+    bookings = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    # Outil synchrone seul : même fonction, sans implémentation asynchrone
+    before = create_event.model_copy(update={"coroutine": None})
+
+    os.chdir(tempfile.mkdtemp(prefix="booking-bench-"))  # fichiers ICS
+    print(f"{bookings} réservations, {concurrency} tours concurrents")
+    for label, limits in (("plafond create_event=1 (production)", TOOL_CONCURRENCY_LIMITS), ("sans plafond", None)):
+        asyncio.run(_run(before, 20, concurrency, limits))  # chauffe
+        sync_rate = asyncio.run(_run(before, bookings, concurrency, limits))
+        async_rate = asyncio.run(_run(create_event, bookings, concurrency, limits))
+        print(f"  {label}")
+        print(f"    outil synchrone (saut de thread)  : {sync_rate:8.1f} réservations/s")
+        print(f"    coroutine native                  : {async_rate:8.1f} réservations/s  (x{async_rate / sync_rate:.2f})")
+
+    print("  appels synchrones directs (create_event_sync)")
+    per_call = _direct_sync_rate(lambda args: asyncio.run(acreate_event(**args)), bookings)
+    shared = _direct_sync_rate(lambda args: create_event_sync(**args), bookings)
+    print(f"    boucle neuve par appel            : {per_call:8.1f} réservations/s")
+    print(f"    boucle d'arrière-plan partagée    : {shared:8.1f} réservations/s  (x{shared / per_call:.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Banc d'essai : vérification de conflit sur un registre d'événements chargé
+
+Remplit le registre avec 100 000 événements répartis sur 500 agents, puis
+compare le coût d'un _collect_busy (vérification avant réservation) :
+  - avant : parcours de tous les événements + _mock_busy recalculé ;
+  - après : index trié par agent (tools.busy_index) + _mock_busy mémoïsé.
+Mesure aussi l'ajout et le retrait d'une plage dans l'index.
+
+Usage : python -m benchmarks.busy_index [événements] [agents]
+"""
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List, Tuple
+
+from tools.check_availability import TZ, _mock_busy
+from tools.create_event import _BUSY_INDEX, _EVENTS, _collect_busy
+
+BASE = datetime(2030, 1, 7, tzinfo=TZ)  # lundi
+DAYS = 365
+
+
+def _legacy_collect_busy(agent_id: str, start: datetime, end: datetime) -> List[tuple]:
+    """_collect_busy d'avant l'index : tout le registre à chaque appel"""
+    busy = []
+    day_cursor = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    while day_cursor < end:
+        busy.extend(_mock_busy.__wrapped__(agent_id, day_cursor))
+        day_cursor += timedelta(days=1)
+    for ev in _EVENTS.values():
+        if ev["agent_id"] != agent_id:
+            continue
+        busy.append((ev["start_dt"], ev["end_dt"]))
+    return busy
+
+
+def _random_slot(rng: random.Random) -> Tuple[datetime, datetime]:
+    start = BASE + timedelta(days=rng.randrange(DAYS), hours=rng.choice((9, 10, 11, 14, 15, 16, 17)))
+    return start, start + timedelta(minutes=45)
+
+
+def _populate(events: int, agents: int, rng: random.Random) -> None:
+    for i in range(events):
+        agent_id = f"agent-{i % agents}"
+        start, end = _random_slot(rng)
+        event_id = f"bench-{i}"
+        _EVENTS[event_id] = {"event_id": event_id, "agent_id": agent_id, "start_dt": start, "end_dt": end}
+        _BUSY_INDEX.add(agent_id, start, end, event_id)
+
+
+def _per_call_us(fn: Callable[[str, datetime, datetime], object], queries: List[Tuple[str, datetime, datetime]]) -> float:
+    started = time.perf_counter()
+    for agent_id, start, end in queries:
+        fn(agent_id, start, end)
+    return (time.perf_counter() - started) / len(queries) * 1e6
+
+
+def main() -> None:
+    events = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    agents = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    rng = random.Random(42)
+
+    started = time.perf_counter()
+    _populate(events, agents, rng)
+    print(f"{events} événements, {agents} agents (remplissage {time.perf_counter() - started:.2f}s)")
+
+    queries = [(f"agent-{rng.randrange(agents)}", *_random_slot(rng)) for _ in range(2000)]
+    # Mêmes résultats pour le créneau demandé
+    for agent_id, start, end in queries[:200]:
+        overlaps = lambda busy: sorted((s, e) for s, e in busy if s < end and e > start)
+        assert overlaps(_legacy_collect_busy(agent_id, start, end)) == overlaps(_collect_busy(agent_id, start, end))
+
+    legacy = _per_call_us(_legacy_collect_busy, queries[:200])
+    indexed = _per_call_us(_collect_busy, queries)
+    print("Vérification de conflit (µs par réservation)")
+    print(f"  parcours du registre : {legacy:10.1f}")
+    print(f"  index par agent      : {indexed:10.1f}  (x{legacy / indexed:.0f})")
+
+    started = time.perf_counter()
+    for i, (agent_id, start, end) in enumerate(queries):
+        _BUSY_INDEX.add(agent_id, start, end, f"extra-{i}")
+    for i, (agent_id, start, end) in enumerate(queries):
+        _BUSY_INDEX.remove(agent_id, start, end, f"extra-{i}")
+    print(f"Ajout + retrait dans l'index : {(time.perf_counter() - started) / len(queries) * 1e6:.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+"""
+Utilitaires partagés des bancs d'essai
+"""
+from typing import Callable, Tuple
+
+
+def token_counter() -> Tuple[str, Callable[[str], int]]:
+    """Tokenizer tiktoken si disponible hors ligne, sinon estimation ~4 caractères/token"""
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding("o200k_base")
+        return "tiktoken o200k_base", lambda text: len(encoding.encode(text))
+    except Exception:
+        return "estimation 4 car./token", lambda text: max(1, round(len(text) / 4))
@@ -0,0 +1,161 @@
+"""
+Banc d'essai : arguments d'outils typés contre « JSON dans une chaîne »
+
+Rejoue un jeu d'appels d'outils représentatifs sous les deux formes
+d'arguments et mesure :
+  - les tokens de sortie émis par le modèle pour les arguments ;
+  - les échecs de décodage (ancienne forme : json.loads, nouvelle : schéma) ;
+  - le coût de décodage par appel ;
+  - le coût des schémas dans le préfixe du prompt.
+
+Usage : python -m benchmarks.tool_args_replay
+"""
+import json
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from benchmarks.common import token_counter
+from src.graph.tools import (
+    create_event,
+    search_properties_by_criteria,
+    suggest_agent_by_preferences,
+    suggest_properties_for_client,
+    validate_client_data,
+)
+
+TOOLS = {
+    t.name: t
+    for t in (create_event, search_properties_by_criteria, suggest_agent_by_preferences,
+              suggest_properties_for_client, validate_client_data)
+}
+
+# Argument qui était une chaîne JSON, par outil
+NESTED_ARG = {
+    "create_event": "attendees",
+    "search_properties_by_criteria": "criteria",
+    "suggest_agent_by_preferences": "client_data",
+    "suggest_properties_for_client": "client_preferences",
+    "validate_client_data": "client_data",
+}
+
+# Appels relevés dans des conversations de réservation (arguments structurés)
+REPLAY: List[Tuple[str, Dict[str, Any]]] = [
+    ("search_properties_by_criteria", {"criteria": {"type": "Appartement", "min_price": 300000, "max_price": 600000, "min_bedrooms": 2}}),
+    ("search_properties_by_criteria", {"criteria": {"type": "Maison", "location": "Neuilly", "min_surface": 150}}),
+    ("search_properties_by_criteria", {"criteria": {"max_price": 1000000, "location": "Paris"}}),
+    ("search_properties_by_criteria", {"criteria": {"type": "Bureau", "agent_id": "agent2"}}),
+    ("validate_client_data", {"client_data": {"name": "Jean Dupont", "email": "jean.dupont@example.com", "phone": "06 12 34 56 78"}}),
+    ("validate_client_data", {"client_data": {"name": "Émilie Laurent-Petit", "email": "emilie@example.fr", "preferred_agent": "agent3"}}),
+    ("validate_client_data", {"client_data": {"name": "Marc O'Brien", "email": "marc@example.com", "notes": "Préfère \"le matin\""}}),
+    ("suggest_agent_by_preferences", {"client_data": {"property_type": "Appartement", "budget_range": "moyen"}}),
+    ("suggest_agent_by_preferences", {"client_data": {"property_type": "Villa", "budget_range": "luxe", "location_preference": "Saint-Tropez"}}),
+    ("suggest_properties_for_client", {"client_preferences": {"property_type": "Appartement", "budget_range": "accessible", "location_preference": "Paris"}}),
+    ("suggest_properties_for_client", {"client_preferences": {"budget_range": "luxe"}}),
+    ("create_event", {"agent_id": "agent1", "start": "2030-03-04T10:00:00", "end": "2030-03-04T10:45:00", "title": "Visite prop1",
+                      "attendees": [{"name": "Jean Dupont", "email": "jean.dupont@example.com"}]}),
+    ("create_event", {"agent_id": "agent3", "start": "2030-03-05T15:00:00", "end": "2030-03-05T15:45:00", "title": "Visite prop5",
+                      "attendees": [{"name": "Sophie Martin", "email": "sophie@example.com"}, {"name": "Paul Martin", "email": "paul@example.com"}],
+                      "location": "16ème arrondissement, Paris"}),
+]
+
+# Chaînes mal échappées typiques de l'ancienne forme (guillemets simples, virgule finale, None Python)
+MALFORMED_LEGACY: List[Tuple[str, Dict[str, Any]]] = [
+    ("search_properties_by_criteria", {"criteria": "{'type': 'Appartement', 'max_price': 600000}"}),
+    ("search_properties_by_criteria", {"criteria": '{"type": "Maison", "min_surface": 150,}'}),
+    ("validate_client_data", {"client_data": '{"name": "Jean Dupont", "email": "jean@example.com", "phone": None}'}),
+    ("validate_client_data", {"client_data": '{"name": "Marc", "notes": "Préfère "le matin""}'}),
+    ("create_event", {"agent_id": "agent1", "start": "2030-03-04T10:00:00", "end": "2030-03-04T10:45:00", "title": "Visite",
+                      "attendees": "[{'name': 'Jean', 'email': 'jean@example.com'}]"}),
+]
+
+
+def _legacy(tool_name: str, args: Dict[str, Any]) -> Dict[str, Any]:
+    """Même appel sous l'ancienne forme : l'argument imbriqué sérialisé en chaîne"""
+    key = NESTED_ARG[tool_name]
+    legacy = dict(args)
+    if key in legacy and not isinstance(legacy[key], str):
+        legacy[key] = json.dumps(legacy[key], ensure_ascii=False)
+    return legacy
+
+
+def _legacy_parse(tool_name: str, args: Dict[str, Any]) -> bool:
+    """Décodage de l'ancienne implémentation (json.loads dans le corps de l'outil)"""
+    value = args.get(NESTED_ARG[tool_name])
+    if value is None:
+        return True
+    try:
+        json.loads(value)
+        return True
+    except (TypeError, json.JSONDecodeError):
+        return False
+
+
+def _typed_parse(tool_name: str, args: Dict[str, Any]) -> bool:
+    try:
+        TOOLS[tool_name].args_schema.model_validate(args)
+        return True
+    except Exception:
+        return False
+
+
+def _time_per_call(fn: Callable[[str, Dict[str, Any]], Any], calls: List[Tuple[str, Dict[str, Any]]], rounds: int = 2000) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for name, args in calls:
+            fn(name, args)
+    return (time.perf_counter() - started) / (rounds * len(calls)) * 1e6
+
+
+def _schema_tokens(count: Callable[[str], int], legacy: bool) -> int:
+    """Tokens des schémas d'outils ; legacy : argument imbriqué redevenu ``string``"""
+    total = 0
+    for name, t in TOOLS.items():
+        schema = convert_to_openai_tool(t)
+        if legacy:
+            key = NESTED_ARG[name]
+            properties = schema["function"]["parameters"]["properties"]
+            properties[key] = {"type": "string", **({"default": None} if "default" in properties[key] else {})}
+        total += count(json.dumps(schema, ensure_ascii=False))
+    return total
+
+
+def main() -> None:
+    tokenizer, count = token_counter()
+    legacy_calls = [(name, _legacy(name, args)) for name, args in REPLAY]
+
+    def arguments(args: Dict[str, Any]) -> str:
+        # Ce que le modèle émet réellement : l'objet arguments sérialisé
+        return json.dumps(args, ensure_ascii=False)
+
+    legacy_tokens = sum(count(arguments(args)) for _, args in legacy_calls)
+    typed_tokens = sum(count(arguments(args)) for _, args in REPLAY)
+
+    print(f"Jeu rejoué : {len(REPLAY)} appels valides + {len(MALFORMED_LEGACY)} chaînes mal échappées ({tokenizer})")
+    print()
+    print("Tokens de sortie (arguments)")
+    print(f"  ancienne forme : {legacy_tokens}")
+    print(f"  forme typée    : {typed_tokens}  ({(typed_tokens - legacy_tokens) / legacy_tokens:+.1%})")
+    print()
+    print("Échecs de décodage")
+    legacy_failures = sum(not _legacy_parse(n, a) for n, a in legacy_calls + MALFORMED_LEGACY)
+    shim_failures = sum(not _typed_parse(n, a) for n, a in legacy_calls + MALFORMED_LEGACY)
+    typed_failures = sum(not _typed_parse(n, a) for n, a in REPLAY)
+    total = len(legacy_calls) + len(MALFORMED_LEGACY)
+    print(f"  ancienne forme, ancien code (json.loads) : {legacy_failures}/{total}")
+    print(f"  ancienne forme, nouveau code (shim)      : {shim_failures}/{total}")
+    print(f"  forme typée, nouveau code                : {typed_failures}/{len(REPLAY)}")
+    print()
+    print("Décodage par appel (µs)")
+    print(f"  json.loads (ancien)      : {_time_per_call(_legacy_parse, legacy_calls):.1f}")
+    print(f"  schéma, chaîne (shim)    : {_time_per_call(_typed_parse, legacy_calls):.1f}")
+    print(f"  schéma, objet (typé)     : {_time_per_call(_typed_parse, REPLAY):.1f}")
+    print()
+    print("Schémas dans le préfixe du prompt (tokens, envoyés avec chaque requête)")
+    print(f"  anciennes signatures : {_schema_tokens(count, legacy=True)}")
+    print(f"  signatures typées    : {_schema_tokens(count, legacy=False)}")
+
+
+if __name__ == "__main__":
+    main()
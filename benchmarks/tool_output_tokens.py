@@ -0,0 +1,56 @@
+"""
+Banc d'essai : tokens des résultats d'outils, encodage complet contre compact
+
+Rejoue des consultations typiques et compare la taille du résultat lu par le
+modèle dans les deux modes de src/graph/tool_output.py.
+
+Usage : python -m benchmarks.tool_output_tokens
+"""
+from typing import Any, Callable, List, Tuple
+
+from benchmarks.common import token_counter
+from src.graph.tool_output import COMPACT, FULL, encode
+from tools import (
+    check_availability,
+    find_agent_by_speciality,
+    get_agent_info,
+    get_properties_by_agent,
+    get_property_info,
+    list_agents,
+    list_properties,
+    search_properties_by_criteria,
+)
+
+# (outil, description de la requête, appel produisant les données brutes)
+QUERIES: List[Tuple[str, str, Callable[[], Any]]] = [
+    ("check_availability", "agent1, next 7 days", lambda: check_availability("agent1", "next 7 days")),
+    ("check_availability", "agent2, 2030-03-04 afternoon", lambda: check_availability("agent2", "2030-03-04 afternoon")),
+    ("check_availability", "agent3, 2030-03-05", lambda: check_availability("agent3", "2030-03-05")),
+    ("list_agents", "tous les agents", list_agents),
+    ("find_agent_by_speciality", "Luxury", lambda: find_agent_by_speciality("Luxury")),
+    ("get_agent_info", "agent1", lambda: get_agent_info("agent1")),
+    ("list_properties", "sans filtre", lambda: list_properties()),
+    ("list_properties", "Appartement", lambda: list_properties("Appartement")),
+    ("search_properties_by_criteria", "max 1 M€", lambda: search_properties_by_criteria({"max_price": 1000000})),
+    ("get_properties_by_agent", "agent1", lambda: get_properties_by_agent("agent1")),
+    ("get_property_info", "prop5", lambda: get_property_info("prop5")),
+]
+
+
+def main() -> None:
+    tokenizer, count = token_counter()
+    print(f"Tokens des résultats d'outils ({tokenizer})")
+    print(f"{'outil':<30} {'requête':<28} {'full':>6} {'compact':>8} {'gain':>7}")
+    total_full = total_compact = 0
+    for tool_name, label, call in QUERIES:
+        data = call()
+        full = count(encode(tool_name, data, FULL))
+        compact = count(encode(tool_name, data, COMPACT))
+        total_full += full
+        total_compact += compact
+        print(f"{tool_name:<30} {label:<28} {full:>6} {compact:>8} {(compact - full) / full:>+7.1%}")
+    print(f"{'total':<59} {total_full:>6} {total_compact:>8} {(total_compact - total_full) / total_full:>+7.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -22,7 +22,7 @@ from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langgraph.types import RunnableConfig
 
 # Your graph comes from your own repo
-from graph import graph  # noqa: F401
+from src.graph.builder import graph  # noqa: F401
 
 # ------------- Config -------------
 TRIM_MESSAGE_LENGTH = 16        # keep last N messages (incl. tool messages)
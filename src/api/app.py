@@ -4,8 +4,8 @@ Application FastAPI principale
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from src.core.config import get_settings
-from src.api.routes import chat, threads, agents, properties, appointments, health
+from src.core.config import get_settings, install_reload_signal
+from src.api.routes import chat, threads, agents, properties, appointments, health, stats, admin
 
 def create_app() -> FastAPI:
     """Crée et configure l'application FastAPI"""
@@ -35,6 +35,11 @@ def create_app() -> FastAPI:
     app.include_router(agents.router)
     app.include_router(properties.router)
     app.include_router(appointments.router)
+    app.include_router(stats.router)
+    app.include_router(admin.router)
+
+    # kill -HUP <pid> recharge les paramètres sans redémarrer
+    install_reload_signal()
 
     return app
 
@@ -0,0 +1,113 @@
+"""
+Regroupement des requêtes identiques en cours (single-flight)
+
+Deux requêtes identiques (même thread, même message, même checkpoint de départ)
+arrivées pendant qu'une exécution est en cours partagent cette exécution : le
+même résultat pour /chat, le même flux (rejoué depuis le début) pour /chat/stream.
+L'exécution partagée va à son terme même si tous les clients se déconnectent,
+pour que le tour soit enregistré une seule fois et en entier.
+"""
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional, Set
+
+
+class _SharedStream:
+    """Flux mis en mémoire tampon et relu par chaque abonné"""
+
+    def __init__(self) -> None:
+        self.items: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self._changed = asyncio.Condition()
+
+    async def push(self, item: Any) -> None:
+        async with self._changed:
+            self.items.append(item)
+            self._changed.notify_all()
+
+    async def close(self, error: Optional[BaseException] = None) -> None:
+        async with self._changed:
+            self.done = True
+            self.error = error
+            self._changed.notify_all()
+
+    async def subscribe(self) -> AsyncIterator[Any]:
+        index = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: index < len(self.items) or self.done)
+                pending = self.items[index:]
+                finished, error = self.done, self.error
+            for item in pending:
+                yield item
+            index += len(pending)
+            if finished and index >= len(self.items):
+                if error is not None:
+                    raise error
+                return
+
+
+class SingleFlight:
+    """Exécutions partagées, indexées par clé de requête"""
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self._streams: Dict[Hashable, _SharedStream] = {}
+        # La boucle ne garde qu'une référence faible aux tâches : les pompes
+        # restent ici jusqu'à la fin, même si tous les abonnés sont partis
+        self._pumps: Set["asyncio.Task[None]"] = set()
+        self.executions = 0
+        self.coalesced = 0
+        self.stream_executions = 0
+        self.coalesced_streams = 0
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Exécute ``factory()`` ou rejoint l'exécution identique en cours"""
+        task = self._calls.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(factory())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._calls.get(key) is done and self._calls.pop(key))
+        else:
+            self.coalesced += 1
+        # shield : l'annulation d'un client n'interrompt pas l'exécution partagée
+        return await asyncio.shield(task)
+
+    def stream(self, key: Hashable, factory: Callable[[], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+        """Itère sur le flux de ``factory()`` ou sur le flux identique en cours"""
+        shared = self._streams.get(key)
+        if shared is None:
+            self.stream_executions += 1
+            shared = _SharedStream()
+            self._streams[key] = shared
+            pump = asyncio.ensure_future(self._pump(key, shared, factory))
+            self._pumps.add(pump)
+            pump.add_done_callback(self._pumps.discard)
+        else:
+            self.coalesced_streams += 1
+        return shared.subscribe()
+
+    async def _pump(self, key: Hashable, shared: _SharedStream, factory: Callable[[], AsyncIterator[Any]]) -> None:
+        error = None
+        try:
+            async for item in factory():
+                await shared.push(item)
+        except Exception as e:
+            error = e
+        finally:
+            self._streams.pop(key, None)
+            await shared.close(error)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._calls) + len(self._streams),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "stream_executions": self.stream_executions,
+            "coalesced_streams": self.coalesced_streams,
+        }
+
+
+# Instance globale, partagée par les routes de chat
+single_flight = SingleFlight()
@@ -0,0 +1,19 @@
+"""
+Routes d'administration
+"""
+from fastapi import APIRouter
+
+from src.core.config import reload_settings
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+@router.post("/settings/reload")
+async def reload_settings_endpoint():
+    """
+    Relit l'environnement et le .env, puis notifie les caches dépendants
+    (pool de clients du modèle, cache des prompts, ...)
+    """
+    changed = reload_settings()
+    # Seuls les noms sont renvoyés : les valeurs peuvent contenir des secrets
+    return {"changed": changed}
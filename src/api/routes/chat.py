@@ -1,18 +1,43 @@
 """
 Routes de chat pour l'API
 """
+import json
 import uuid
 from datetime import datetime
+from typing import Hashable, Optional
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 from langchain_core.messages import AIMessageChunk
 
+from src.api.coalescing import single_flight
+from src.api.thread_locks import ThreadQueueError, ThreadQueueFullError, thread_locks
 from src.core.models import ChatRequest, ChatResponse, ChatStreamRequest
+from src.graph.admission import ModelOverloadedError
 from src.graph.builder import graph
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
 
 
+def _turn_key(kind: str, thread_id: Optional[str], payload: str) -> Optional[Hashable]:
+    """
+    Clé de regroupement ; None pour un nouveau thread anonyme.
+
+    Une exécution n'est partagée que tant qu'elle est en cours : toutes les
+    requêtes qui la rejoignent partent donc du même checkpoint. Le checkpoint
+    courant n'entre pas dans la clé car l'exécution partagée le fait avancer
+    dès son premier pas.
+    """
+    if not thread_id:
+        return None
+    return (kind, thread_id, payload)
+
+
+def _queue_error(error: ThreadQueueError) -> HTTPException:
+    """429 si la file du thread est pleine, 503 si l'attente a expiré"""
+    status = 429 if isinstance(error, ThreadQueueFullError) else 503
+    return HTTPException(status_code=status, detail=str(error), headers={"Retry-After": str(error.retry_after)})
+
+
 @router.post("/", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """
@@ -25,9 +50,16 @@ async def chat(request: ChatRequest):
         # Préparer les messages pour le graph
         messages = [{"role": "user", "content": request.message}]
         
-        # Exécuter le graph
+        # Exécuter le graph : un tour à la fois par thread, une requête
+        # identique déjà en cours est partagée
         config = {"configurable": {"thread_id": thread_id}}
-        result = graph.invoke({"messages": messages}, config)
+
+        async def run_turn():
+            async with thread_locks.turn(thread_id):
+                return await graph.ainvoke({"messages": messages}, config)
+
+        key = _turn_key("chat", request.thread_id, request.message)
+        result = await (run_turn() if key is None else single_flight.run(key, run_turn))
         
         # Extraire la réponse
         response_content = ""
@@ -41,6 +73,10 @@ async def chat(request: ChatRequest):
             timestamp=datetime.now().isoformat()
         )
     
+    except ThreadQueueError as e:
+        raise _queue_error(e)
+    except ModelOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur lors du traitement: {str(e)}")
 
@@ -48,21 +84,37 @@ async def chat(request: ChatRequest):
 @router.post("/stream")
 async def chat_stream(req: ChatStreamRequest):
     """Endpoint de streaming pour le chat"""
-    async def event_gen():
+    payload = json.dumps([req.user_input.strip(), req.graph_state], sort_keys=True, default=str)
+    key = _turn_key("stream", req.thread_id, payload)
+    thread_id = req.thread_id or str(uuid.uuid4())
+
+    async def run_graph():
         state = req.graph_state or {"messages":[{"role":"system","content":"You are helpful."}]}
         state["messages"] = state.get("messages", []) + [{"role":"user","content":req.user_input.strip()}]
-        cfg = {"configurable":{"thread_id": req.thread_id or str(uuid.uuid4())}}
-
-        async for stream_mode, chunk in graph.astream(
-            state, 
-            config=cfg, 
-            version="v1",
-            stream_mode=["messages"]
-        ):
-            if isinstance(chunk, AIMessageChunk):
-                yield f"data: {chunk.model_dump_json()}\n\n"
-            else:
-                yield f"data: {chunk}\n\n"
+        cfg = {"configurable":{"thread_id": thread_id}}
+
+        try:
+            async with thread_locks.turn(thread_id):
+                async for stream_mode, chunk in graph.astream(
+                    state, 
+                    config=cfg, 
+                    version="v1",
+                    stream_mode=["messages"]
+                ):
+                    if isinstance(chunk, AIMessageChunk):
+                        yield f"data: {chunk.model_dump_json()}\n\n"
+                    else:
+                        yield f"data: {chunk}\n\n"
+        except (ThreadQueueError, ModelOverloadedError) as e:
+            # La réponse a déjà commencé : l'erreur est envoyée comme événement
+            error = {"error": str(e), "retry_after": e.retry_after}
+            yield f"data: {json.dumps(error, ensure_ascii=False)}\n\n"
+
+    async def event_gen():
+        # Les flux identiques en cours sont partagés (relus depuis le début)
+        events = run_graph() if key is None else single_flight.stream(key, run_graph)
+        async for event in events:
+            yield event
 
     return StreamingResponse(
         event_gen(), 
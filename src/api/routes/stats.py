@@ -0,0 +1,48 @@
+"""
+Routes de statistiques d'exécution
+"""
+from fastapi import APIRouter
+
+from src.api.coalescing import single_flight
+from src.api.thread_locks import thread_locks
+from src.graph.admission import admission
+from src.graph.builder import graph
+from src.core.prompts import prompt_cache
+from src.graph.context import context_stats, prefix_fingerprint
+from src.graph.hedging import hedging_stats
+from src.graph.fast_path import fast_path_router
+from src.graph.model_pool import model_registry
+from src.graph.routing import routing_stats
+from src.graph.tool_cache import tool_cache_stats
+from src.graph.tool_node import tool_stats
+
+router = APIRouter(prefix="/stats", tags=["Stats"])
+
+
+def _checkpoint_stats() -> dict:
+    """Occupation du checkpointer (si borné)"""
+    checkpointer = graph.checkpointer
+    if hasattr(checkpointer, "stats"):
+        return checkpointer.stats()
+    return {"type": type(checkpointer).__name__}
+
+
+@router.get("/")
+async def get_stats():
+    """
+    Statistiques internes (pool de clients du modèle, caches des outils, ...)
+    """
+    return {
+        "model_pool": model_registry.stats(),
+        "admission": admission.stats(),
+        "endpoints": hedging_stats(),
+        "model_routes": routing_stats.snapshot(),
+        "coalescing": single_flight.stats(),
+        "thread_locks": thread_locks.stats(),
+        "tool_cache": tool_cache_stats(),
+        "tools": tool_stats.snapshot(),
+        "checkpoints": _checkpoint_stats(),
+        "context": context_stats.snapshot(),
+        "fast_path": fast_path_router.stats.snapshot(),
+        "prompt": {**prompt_cache.stats(), "prefix_fingerprint": prefix_fingerprint("v1")},
+    }
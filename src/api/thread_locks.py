@@ -0,0 +1,148 @@
+"""
+Sérialisation des tours par conversation
+
+Les tours d'un même thread_id s'exécutent un par un, dans l'ordre d'arrivée
+(asyncio.Lock est équitable) ; les threads différents restent parallèles. Le
+nombre de verrous conservés est borné : les verrous libres les moins récents
+sont évincés. La file d'attente par thread est bornée en profondeur et en durée.
+"""
+import asyncio
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+from src.core.config import Settings, get_settings, on_settings_change
+
+
+class ThreadQueueError(Exception):
+    """Le tour n'a pas pu obtenir la main sur la conversation"""
+
+    def __init__(self, message: str, retry_after: int = 1) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ThreadQueueFullError(ThreadQueueError):
+    """Trop de tours déjà en attente sur cette conversation"""
+
+
+class ThreadQueueTimeoutError(ThreadQueueError):
+    """Attente trop longue derrière les tours précédents"""
+
+
+class _ThreadSlot:
+    __slots__ = ("lock", "waiting")
+
+    def __init__(self) -> None:
+        self.lock = asyncio.Lock()
+        self.waiting = 0
+
+
+class ThreadLockManager:
+    """Verrous asynchrones par thread_id, bornés en nombre (LRU)"""
+
+    def __init__(self, max_entries: int = 10000, max_queue_depth: int = 8, wait_timeout: float = 30.0) -> None:
+        self.max_entries = max_entries
+        self.max_queue_depth = max_queue_depth
+        self.wait_timeout = wait_timeout
+        # Un jeu de verrous par boucle d'événements (les verrous asyncio y sont liés)
+        self._slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, OrderedDict[str, _ThreadSlot]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self.turns = 0
+        self.max_waiting = 0
+        self.total_wait_ms = 0.0
+        self.rejections = 0
+        self.timeouts = 0
+        self.evictions = 0
+
+    def _slot(self, thread_id: str) -> _ThreadSlot:
+        slots = self._slots.setdefault(asyncio.get_running_loop(), OrderedDict())
+        slot = slots.get(thread_id)
+        if slot is None:
+            slot = slots[thread_id] = _ThreadSlot()
+            self._evict(slots, keep=thread_id)
+        else:
+            slots.move_to_end(thread_id)
+        return slot
+
+    def _evict(self, slots: "OrderedDict[str, _ThreadSlot]", keep: str) -> None:
+        """Retire les verrous libres les plus anciens au-delà de max_entries"""
+        excess = len(slots) - self.max_entries
+        for thread_id in list(slots):
+            if excess <= 0:
+                break
+            slot = slots[thread_id]
+            if thread_id != keep and not slot.lock.locked() and not slot.waiting:
+                del slots[thread_id]
+                self.evictions += 1
+                excess -= 1
+
+    @asynccontextmanager
+    async def turn(self, thread_id: str, timeout: Optional[float] = None) -> AsyncIterator[None]:
+        """Attend son tour sur la conversation puis le garde jusqu'à la sortie du bloc"""
+        slot = self._slot(thread_id)
+        if slot.lock.locked() and slot.waiting >= self.max_queue_depth:
+            self.rejections += 1
+            raise ThreadQueueFullError(f"Trop de messages en attente pour la conversation {thread_id}")
+
+        slot.waiting += 1
+        self.max_waiting = max(self.max_waiting, slot.waiting)
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(slot.lock.acquire(), timeout if timeout is not None else self.wait_timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise ThreadQueueTimeoutError(
+                f"Délai d'attente dépassé pour la conversation {thread_id}", retry_after=int(self.wait_timeout) or 1
+            )
+        finally:
+            slot.waiting -= 1
+        self.turns += 1
+        self.total_wait_ms += (time.perf_counter() - started) * 1000
+        try:
+            yield
+        finally:
+            slot.lock.release()
+            # Les verrous créés pendant un pic sont évincés au fur et à mesure qu'ils se libèrent
+            slots = self._slots.get(asyncio.get_running_loop())
+            if slots is not None and len(slots) > self.max_entries:
+                self._evict(slots, keep="")
+
+    def stats(self) -> Dict[str, float]:
+        slots = [slot for loop_slots in list(self._slots.values()) for slot in loop_slots.values()]
+        return {
+            "threads": len(slots),
+            "active": sum(1 for slot in slots if slot.lock.locked()),
+            "waiting": sum(slot.waiting for slot in slots),
+            "max_waiting": self.max_waiting,
+            "turns": self.turns,
+            "avg_wait_ms": round(self.total_wait_ms / self.turns, 2) if self.turns else 0.0,
+            "rejections": self.rejections,
+            "timeouts": self.timeouts,
+            "evictions": self.evictions,
+        }
+
+
+def _from_settings(settings: Settings) -> ThreadLockManager:
+    return ThreadLockManager(
+        max_entries=settings.thread_lock_max_entries,
+        max_queue_depth=settings.thread_queue_depth,
+        wait_timeout=settings.thread_wait_timeout,
+    )
+
+
+# Instance globale, partagée par les routes de chat
+thread_locks = _from_settings(get_settings())
+
+
+def _on_settings_change(old: Settings, new: Settings) -> None:
+    """Applique les nouvelles bornes sans perdre les verrous en cours"""
+    thread_locks.max_entries = new.thread_lock_max_entries
+    thread_locks.max_queue_depth = new.thread_queue_depth
+    thread_locks.wait_timeout = new.thread_wait_timeout
+
+
+on_settings_change(_on_settings_change)
@@ -2,9 +2,11 @@
 Configuration centralisée du projet
 """
 import os
-from typing import Optional
+import signal
+import threading
+from typing import Callable, Dict, List, Optional, Set
 from pydantic import BaseModel
-from dotenv import load_dotenv
+from dotenv import dotenv_values, find_dotenv
 
 
 class Settings(BaseModel):
@@ -17,11 +19,71 @@ class Settings(BaseModel):
     mistral_api_key: Optional[str] = None
     api_key: Optional[str] = None
     base_url: Optional[str] = None
+    # Points d'accès compatibles OpenAI, par ordre de préférence (prioritaire sur base_url)
+    base_urls: List[str] = []
+    
+    # Couverture des requêtes lentes et disjoncteur par point d'accès
+    hedge_percentile: float = 95.0
+    hedge_initial_delay: float = 2.0
+    breaker_failure_threshold: int = 3
+    breaker_reset_timeout: float = 30.0
     
     # Modèle
     model_name: str = "gpt-oss-120b"
+    # Modèle rapide pour les étapes de reformulation (vide = toujours model_name)
+    fast_model_name: Optional[str] = None
     temperature: float = 0.2
     
+    # Pool de connexions HTTP vers le fournisseur du modèle
+    model_pool_max_connections: int = 20
+    model_pool_max_keepalive: int = 10
+    model_pool_keepalive_expiry: float = 60.0
+    
+    # Admission des appels au modèle (0 = pas de limite de concurrence)
+    model_max_concurrency: int = 8
+    model_queue_per_thread: int = 2
+    model_queue_timeout: float = 10.0
+    model_max_queue: int = 256
+    
+    # Compactage de l'historique (0 = désactivé)
+    history_token_budget: int = 8000
+    history_keep_recent_tokens: int = 2000
+    
+    # Intervalle minimal entre deux contrôles du mtime des prompts (secondes)
+    prompt_check_interval: float = 5.0
+    
+    # Résultats d'outils résumés dans le contexte du modèle après N tours (-1 = désactivé)
+    tool_result_max_age_turns: int = 2
+    tool_result_digest_chars: int = 160
+    
+    # Tours sérialisés par conversation (file d'attente bornée)
+    thread_lock_max_entries: int = 10000
+    thread_queue_depth: int = 8
+    thread_wait_timeout: float = 30.0
+    
+    # Réponses directes aux consultations simples, sans appel au modèle
+    fast_path_enabled: bool = False
+    
+    # Exécution des outils
+    tool_max_workers: int = 8
+    tool_concurrency_limits: Dict[str, int] = {}
+    # Échéances par outil en secondes ("*" = autres outils, 0 = aucune)
+    tool_timeouts: Dict[str, float] = {}
+    # Encodage des résultats lus par le modèle, par outil ("full" ou "compact", "*" = tous)
+    tool_output_modes: Dict[str, str] = {}
+    
+    # Persistance des conversations ("memory" ou "sqlite")
+    checkpointer: str = "memory"
+    checkpoint_db_path: str = "data/checkpoints.sqlite"
+    checkpoint_pool_size: int = 4
+    # Bornes du checkpointer en mémoire (0 = illimité)
+    checkpoint_max_threads: int = 0
+    checkpoint_max_bytes: int = 0
+    checkpoint_idle_ttl: float = 0
+    checkpoint_spill_dir: Optional[str] = None
+    # Un thread accédé depuis moins de N secondes n'est pas évincé (exécution en cours)
+    checkpoint_evict_grace: float = 30.0
+    
     # Serveur
     host: str = "0.0.0.0"
     port: int = 8000
@@ -45,17 +107,149 @@ class Settings(BaseModel):
     mail_ssl_tls: bool = False
 
 
+def _parse_int_map(value: str) -> Dict[str, int]:
+    """Parse "nom:valeur,nom2:valeur2" en dictionnaire"""
+    return {key: int(raw) for key, raw in _parse_str_map(value).items()}
+
+
+def _parse_float_map(value: str) -> Dict[str, float]:
+    """Parse "nom:valeur,nom2:valeur2" en dictionnaire de flottants"""
+    return {key: float(raw) for key, raw in _parse_str_map(value).items()}
+
+
+def _parse_str_map(value: str) -> Dict[str, str]:
+    """Parse "nom:valeur,nom2:valeur2" en dictionnaire de chaînes"""
+    result = {}
+    for item in value.split(","):
+        if ":" in item:
+            key, raw = item.split(":", 1)
+            result[key.strip()] = raw.strip()
+    return result
+
+
+# Paramètres mémoïsés, remplacés uniquement par reload_settings()
+_settings: Optional[Settings] = None
+_settings_lock = threading.Lock()
+_subscribers: List[Callable[[Settings, Settings], None]] = []
+# Variables posées par nous depuis le .env (les autres ont priorité et ne sont pas écrasées)
+_dotenv_keys: Set[str] = set()
+
+
+def _apply_dotenv() -> None:
+    """Charge le .env ; au rechargement, met à jour les clés venant du .env"""
+    values = {k: v for k, v in dotenv_values(find_dotenv()).items() if v is not None}
+    for key in list(_dotenv_keys):
+        if key not in values:
+            os.environ.pop(key, None)
+            _dotenv_keys.discard(key)
+    for key, value in values.items():
+        if key in _dotenv_keys or key not in os.environ:
+            os.environ[key] = value
+            _dotenv_keys.add(key)
+
+
 def get_settings() -> Settings:
-    """Retourne l'instance des paramètres"""
-    load_dotenv()
+    """Retourne l'instance des paramètres (lue une seule fois)"""
+    settings = _settings
+    if settings is not None:
+        return settings
+    with _settings_lock:
+        if _settings is None:
+            _store_settings(_build_settings())
+        return _settings
+
+
+def _store_settings(settings: Settings) -> None:
+    global _settings
+    _settings = settings
+
+
+def reload_settings() -> List[str]:
+    """
+    Relit l'environnement et le .env, puis notifie les abonnés si des valeurs changent.
+
+    Retourne les noms des champs modifiés.
+    """
+    with _settings_lock:
+        old = _settings
+        new = _build_settings()
+        _store_settings(new)
+        if old is None:
+            return []
+        previous, current = old.model_dump(), new.model_dump()
+        changed = [name for name in current if previous[name] != current[name]]
+        if changed:
+            for callback in list(_subscribers):
+                try:
+                    callback(old, new)
+                except Exception as e:
+                    print(f"Erreur lors de la notification du rechargement: {e}")
+        return changed
+
+
+def on_settings_change(callback: Callable[[Settings, Settings], None]) -> None:
+    """Enregistre ``callback(ancien, nouveau)``, appelé quand les paramètres changent"""
+    with _settings_lock:
+        _subscribers.append(callback)
+
+
+def install_reload_signal() -> bool:
+    """Recharge les paramètres sur SIGHUP (thread principal uniquement)"""
+    if not hasattr(signal, "SIGHUP") or threading.current_thread() is not threading.main_thread():
+        return False
+    # Le rechargement se fait hors du gestionnaire de signal (qui peut interrompre un détenteur du verrou)
+    signal.signal(
+        signal.SIGHUP,
+        lambda signum, frame: threading.Thread(target=reload_settings, name="settings-reload", daemon=True).start(),
+    )
+    return True
+
+
+def _build_settings() -> Settings:
+    """Construit les paramètres depuis l'environnement"""
+    _apply_dotenv()
     
     return Settings(
         openai_api_key=os.getenv("OPENAI_API_KEY"),
         mistral_api_key=os.getenv("MISTRAL_API_KEY"),
         api_key=os.getenv("API_KEY"),
         base_url=os.getenv("BASE_URL"),
+        base_urls=[url.strip() for url in os.getenv("BASE_URLS", "").split(",") if url.strip()],
+        hedge_percentile=float(os.getenv("HEDGE_PERCENTILE", "95")),
+        hedge_initial_delay=float(os.getenv("HEDGE_INITIAL_DELAY", "2")),
+        breaker_failure_threshold=int(os.getenv("BREAKER_FAILURE_THRESHOLD", "3")),
+        breaker_reset_timeout=float(os.getenv("BREAKER_RESET_TIMEOUT", "30")),
         model_name=os.getenv("MODEL_NAME", "gpt-oss-120b"),
+        fast_model_name=os.getenv("FAST_MODEL_NAME") or None,
         temperature=float(os.getenv("TEMPERATURE", "0.2")),
+        model_pool_max_connections=int(os.getenv("MODEL_POOL_MAX_CONNECTIONS", "20")),
+        model_pool_max_keepalive=int(os.getenv("MODEL_POOL_MAX_KEEPALIVE", "10")),
+        model_pool_keepalive_expiry=float(os.getenv("MODEL_POOL_KEEPALIVE_EXPIRY", "60")),
+        model_max_concurrency=int(os.getenv("MODEL_MAX_CONCURRENCY", "8")),
+        model_queue_per_thread=int(os.getenv("MODEL_QUEUE_PER_THREAD", "2")),
+        model_queue_timeout=float(os.getenv("MODEL_QUEUE_TIMEOUT", "10")),
+        model_max_queue=int(os.getenv("MODEL_MAX_QUEUE", "256")),
+        history_token_budget=int(os.getenv("HISTORY_TOKEN_BUDGET", "8000")),
+        history_keep_recent_tokens=int(os.getenv("HISTORY_KEEP_RECENT_TOKENS", "2000")),
+        prompt_check_interval=float(os.getenv("PROMPT_CHECK_INTERVAL", "5")),
+        tool_result_max_age_turns=int(os.getenv("TOOL_RESULT_MAX_AGE_TURNS", "2")),
+        tool_result_digest_chars=int(os.getenv("TOOL_RESULT_DIGEST_CHARS", "160")),
+        thread_lock_max_entries=int(os.getenv("THREAD_LOCK_MAX_ENTRIES", "10000")),
+        thread_queue_depth=int(os.getenv("THREAD_QUEUE_DEPTH", "8")),
+        thread_wait_timeout=float(os.getenv("THREAD_WAIT_TIMEOUT", "30")),
+        fast_path_enabled=os.getenv("FAST_PATH_ENABLED", "false").lower() == "true",
+        tool_max_workers=int(os.getenv("TOOL_MAX_WORKERS", "8")),
+        tool_concurrency_limits=_parse_int_map(os.getenv("TOOL_CONCURRENCY_LIMITS", "")),
+        tool_output_modes=_parse_str_map(os.getenv("TOOL_OUTPUT_MODES", "")),
+        tool_timeouts=_parse_float_map(os.getenv("TOOL_TIMEOUTS", "")),
+        checkpointer=os.getenv("CHECKPOINTER", "memory").lower(),
+        checkpoint_db_path=os.getenv("CHECKPOINT_DB_PATH", "data/checkpoints.sqlite"),
+        checkpoint_pool_size=int(os.getenv("CHECKPOINT_POOL_SIZE", "4")),
+        checkpoint_max_threads=int(os.getenv("CHECKPOINT_MAX_THREADS", "0")),
+        checkpoint_max_bytes=int(os.getenv("CHECKPOINT_MAX_BYTES", "0")),
+        checkpoint_idle_ttl=float(os.getenv("CHECKPOINT_IDLE_TTL", "0")),
+        checkpoint_spill_dir=os.getenv("CHECKPOINT_SPILL_DIR"),
+        checkpoint_evict_grace=float(os.getenv("CHECKPOINT_EVICT_GRACE", "30")),
         host=os.getenv("HOST", "0.0.0.0"),
         port=int(os.getenv("PORT", "8000")),
         debug=os.getenv("DEBUG", "false").lower() == "true",
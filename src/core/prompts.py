@@ -2,9 +2,70 @@
 Gestion des prompts système
 """
 import os
+import threading
+import time
 from pathlib import Path
-from typing import List, Optional
-from src.core.config import get_settings
+from typing import Dict, List, Optional, Tuple
+from src.core.config import Settings, get_settings, on_settings_change
+
+
+class PromptCache:
+    """Cache mémoire des fichiers de prompt, revalidé par mtime"""
+
+    def __init__(self, check_interval: float = 5.0) -> None:
+        self.check_interval = check_interval
+        # chemin -> (contenu ou None, (mtime_ns, taille) ou None, dernier contrôle)
+        self._entries: Dict[str, Tuple[Optional[str], Optional[Tuple[int, int]], float]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stat_checks = 0
+        self.reloads = 0
+
+    def read(self, path: str) -> Optional[str]:
+        """Retourne le contenu du fichier (None s'il est absent ou illisible)"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and now - entry[2] < self.check_interval:
+                self.hits += 1
+                return entry[0]
+
+            self.stat_checks += 1
+            try:
+                stat = os.stat(path)
+                signature = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                signature = None
+
+            if entry is not None and entry[1] == signature:
+                self._entries[path] = (entry[0], signature, now)
+                return entry[0]
+
+            content = None
+            if signature is None:
+                print(f"Fichier de prompt non trouvé: {path}")
+            else:
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        content = f.read()
+                except Exception as e:
+                    print(f"Erreur lors de la lecture du prompt: {e}")
+            self.reloads += 1
+            self._entries[path] = (content, signature, now)
+            return content
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "files": len(self._entries),
+                "hits": self.hits,
+                "stat_checks": self.stat_checks,
+                "reloads": self.reloads,
+            }
 
 
 class PromptManager:
@@ -14,6 +75,8 @@ class PromptManager:
         settings = get_settings()
         self.directory = Path(directory or settings.prompts_dir)
         self.directory.mkdir(parents=True, exist_ok=True)
+        # Versions connues par nom, revalidées avec le mtime du répertoire
+        self._versions: Dict[str, Tuple[int, List[int]]] = {}
 
     def _version_key(self, path: Path) -> int:
         """Extrait la version d'un fichier de prompt"""
@@ -27,9 +90,14 @@ class PromptManager:
 
     def available_versions(self, name: str) -> List[int]:
         """Retourne toutes les versions disponibles pour un nom"""
+        mtime = self.directory.stat().st_mtime_ns
+        cached = self._versions.get(name)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
         files = self.directory.glob(f"{name}_v*.md")
-        versions = [self._version_key(p) for p in files]
-        return sorted(v for v in versions if v)
+        versions = sorted(v for v in (self._version_key(p) for p in files) if v)
+        self._versions[name] = (mtime, versions)
+        return versions
 
     def load(self, name: str, version: Optional[int] = None) -> str:
         """Charge un prompt par nom et version"""
@@ -40,26 +108,17 @@ class PromptManager:
             version = versions[-1]
         
         path = self.directory / f"{name}_v{version}.md"
-        if not path.exists():
+        content = prompt_cache.read(str(path))
+        if content is None:
             raise FileNotFoundError(f"Prompt '{name}' version {version} non trouvé")
         
-        return path.read_text(encoding="utf-8")
+        return content
 
 
 def load_system_prompt(version: str = "v1") -> Optional[str]:
-    """Charge le prompt système depuis le fichier correspondant"""
+    """Charge le prompt système depuis le fichier correspondant (via le cache)"""
     prompt_file = f"prompts/chatbot_{version}.md"
-    
-    if not os.path.exists(prompt_file):
-        print(f"Fichier de prompt non trouvé: {prompt_file}")
-        return None
-    
-    try:
-        with open(prompt_file, 'r', encoding='utf-8') as f:
-            return f.read()
-    except Exception as e:
-        print(f"Erreur lors de la lecture du prompt: {e}")
-        return None
+    return prompt_cache.read(prompt_file)
 
 
 def get_default_system_prompt() -> str:
@@ -79,5 +138,20 @@ Vous devez :
 Soyez professionnel, courtois et efficace dans vos réponses."""
 
 
+# Instance globale du cache de prompts
+prompt_cache = PromptCache(get_settings().prompt_check_interval)
+
+
+def _on_settings_change(old: Settings, new: Settings) -> None:
+    """Vide le cache des prompts au rechargement des paramètres"""
+    prompt_cache.check_interval = new.prompt_check_interval
+    prompt_cache.clear()
+    if old.prompts_dir != new.prompts_dir:
+        prompt_manager.directory = Path(new.prompts_dir)
+        prompt_manager._versions.clear()
+
+
+on_settings_change(_on_settings_change)
+
 # Instance globale du gestionnaire de prompts
 prompt_manager = PromptManager()
@@ -0,0 +1,266 @@
+"""
+Contrôle d'admission des appels au modèle
+
+Au plus ``model_max_concurrency`` appels au fournisseur sont en cours à la fois.
+Les appels en surplus attendent dans une file équitable entre conversations
+(tour de rôle par thread_id, au plus ``model_queue_per_thread`` en attente par
+conversation). Un appel qui attend plus de ``model_queue_timeout`` secondes
+échoue immédiatement avec ``ModelOverloadedError`` (503 + Retry-After côté API)
+plutôt que de saturer le fournisseur. Fonctionne pour les chemins sync et async.
+"""
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, Optional
+
+from src.core.config import Settings, get_settings, on_settings_change
+
+
+class ModelOverloadedError(Exception):
+    """Le modèle n'a pas pu être appelé à temps (file pleine, délai, 429 du fournisseur)"""
+
+    def __init__(self, message: str, retry_after: int = 1, reason: str = "overloaded") -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class _Waiter:
+    """Appel en attente : réveillé par un Event (sync) ou un Future (async)"""
+    __slots__ = ("event", "future", "loop", "granted")
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        self.loop = loop
+        self.event = None if loop else threading.Event()
+        self.future = loop.create_future() if loop else None
+        self.granted = False
+
+    def wake(self) -> None:
+        self.granted = True
+        if self.event is not None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self) -> None:
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class AdmissionController:
+    """Sémaphore global avec file d'attente équitable par conversation"""
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        max_queue_per_thread: int = 2,
+        queue_timeout: float = 10.0,
+        max_queue: int = 256,
+    ) -> None:
+        self._lock = threading.Lock()
+        self.max_concurrency = max_concurrency
+        self.max_queue_per_thread = max_queue_per_thread
+        self.queue_timeout = queue_timeout
+        self.max_queue = max_queue
+        self._in_use = 0
+        # thread_id -> appels en attente ; l'ordre des clés sert de tour de rôle
+        self._queues: "OrderedDict[str, Deque[_Waiter]]" = OrderedDict()
+        self._queued = 0
+        self.admitted = 0
+        self.queued_total = 0
+        self.max_queued = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.total_hold_ms = 0.0
+        self.rejections: Dict[str, int] = {}
+
+    def configure(self, max_concurrency: int, max_queue_per_thread: int, queue_timeout: float, max_queue: int) -> None:
+        """Change les bornes ; les appels en attente profitent d'une hausse de concurrence"""
+        with self._lock:
+            self.max_concurrency = max_concurrency
+            self.max_queue_per_thread = max_queue_per_thread
+            self.queue_timeout = queue_timeout
+            self.max_queue = max_queue
+            self._grant_next()
+
+    # -- Gestion de la file (sous self._lock) --
+
+    def _has_room(self) -> bool:
+        return self.max_concurrency <= 0 or self._in_use < self.max_concurrency
+
+    def _enqueue(self, thread_id: str, waiter: _Waiter) -> None:
+        queue = self._queues.get(thread_id)
+        if queue is not None and len(queue) >= self.max_queue_per_thread:
+            self._reject("thread_queue_full")
+        if self._queued >= self.max_queue:
+            self._reject("queue_full")
+        if queue is None:
+            queue = self._queues[thread_id] = deque()
+        queue.append(waiter)
+        self._queued += 1
+        self.queued_total += 1
+        self.max_queued = max(self.max_queued, self._queued)
+
+    def _grant_next(self) -> None:
+        while self._queues and self._has_room():
+            thread_id, queue = next(iter(self._queues.items()))
+            waiter = queue.popleft()
+            self._queued -= 1
+            # Tour de rôle : la conversation servie repasse en fin de file
+            del self._queues[thread_id]
+            if queue:
+                self._queues[thread_id] = queue
+            self._in_use += 1
+            waiter.wake()
+
+    def _withdraw(self, thread_id: str, waiter: _Waiter) -> bool:
+        """Retire un appel expiré ; False s'il a été admis entre-temps"""
+        if waiter.granted:
+            return False
+        queue = self._queues.get(thread_id)
+        if queue is not None:
+            queue.remove(waiter)
+            self._queued -= 1
+            if not queue:
+                del self._queues[thread_id]
+        self._reject("timeout", count_only=True)
+        return True
+
+    def _reject(self, reason: str, count_only: bool = False) -> None:
+        self.rejections[reason] = self.rejections.get(reason, 0) + 1
+        if not count_only:
+            raise ModelOverloadedError(
+                f"Trop de requêtes en attente vers le modèle ({reason})", self._retry_after(), reason
+            )
+
+    def _retry_after(self) -> int:
+        """Estimation du délai avant qu'un créneau se libère (secondes)"""
+        average_hold = self.total_hold_ms / self.admitted / 1000 if self.admitted else 1.0
+        slots = max(self.max_concurrency, 1)
+        return max(1, math.ceil(average_hold * (self._queued + 1) / slots))
+
+    def _record_admission(self, waited: float) -> None:
+        waited_ms = waited * 1000
+        self.admitted += 1
+        self.total_wait_ms += waited_ms
+        self.max_wait_ms = max(self.max_wait_ms, waited_ms)
+
+    def _release(self, held: float) -> None:
+        with self._lock:
+            self._in_use -= 1
+            self.total_hold_ms += held * 1000
+            self._grant_next()
+
+    def _timeout_error(self) -> ModelOverloadedError:
+        return ModelOverloadedError(
+            f"Délai d'attente du modèle dépassé ({self.queue_timeout:g}s)", self._retry_after(), "timeout"
+        )
+
+    # -- API publique --
+
+    @contextmanager
+    def slot(self, thread_id: Optional[str] = None) -> Iterator[None]:
+        """Réserve un créneau d'appel au modèle (chemin synchrone)"""
+        thread_id = thread_id or ""
+        started = time.perf_counter()
+        with self._lock:
+            if self._has_room() and not self._queues:
+                self._in_use += 1
+                waiter = None
+            else:
+                waiter = _Waiter()
+                self._enqueue(thread_id, waiter)
+        if waiter is not None and not waiter.event.wait(self.queue_timeout):
+            with self._lock:
+                if self._withdraw(thread_id, waiter):
+                    raise self._timeout_error()
+        admitted = time.perf_counter()
+        with self._lock:
+            self._record_admission(admitted - started)
+        try:
+            yield
+        finally:
+            self._release(time.perf_counter() - admitted)
+
+    @asynccontextmanager
+    async def aslot(self, thread_id: Optional[str] = None) -> AsyncIterator[None]:
+        """Réserve un créneau d'appel au modèle (chemin asynchrone)"""
+        thread_id = thread_id or ""
+        started = time.perf_counter()
+        with self._lock:
+            if self._has_room() and not self._queues:
+                self._in_use += 1
+                waiter = None
+            else:
+                waiter = _Waiter(asyncio.get_running_loop())
+                self._enqueue(thread_id, waiter)
+        if waiter is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter.future), self.queue_timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+                with self._lock:
+                    withdrawn = self._withdraw(thread_id, waiter)
+                if not withdrawn:
+                    # Admis au moment de l'expiration : rendre le créneau
+                    self._release(0.0)
+                if isinstance(e, asyncio.CancelledError):
+                    raise
+                raise self._timeout_error()
+        admitted = time.perf_counter()
+        with self._lock:
+            self._record_admission(admitted - started)
+        try:
+            yield
+        finally:
+            self._release(time.perf_counter() - admitted)
+
+    def rate_limited(self, error: Exception) -> ModelOverloadedError:
+        """Convertit un 429 du fournisseur (openai.RateLimitError) en erreur 503"""
+        with self._lock:
+            self.rejections["provider_429"] = self.rejections.get("provider_429", 0) + 1
+            retry_after = self._retry_after()
+        response = getattr(error, "response", None)
+        header = response.headers.get("retry-after") if response is not None else None
+        if header:
+            try:
+                retry_after = max(1, math.ceil(float(header)))
+            except ValueError:
+                pass
+        return ModelOverloadedError(f"Le fournisseur du modèle limite le débit : {error}", retry_after, "provider_429")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "in_use": self._in_use,
+                "queued": self._queued,
+                "max_queued": self.max_queued,
+                "queued_total": self.queued_total,
+                "admitted": self.admitted,
+                "avg_wait_ms": round(self.total_wait_ms / self.admitted, 2) if self.admitted else 0.0,
+                "max_wait_ms": round(self.max_wait_ms, 2),
+                "rejections": dict(self.rejections),
+            }
+
+
+def thread_id_of(config: Optional[Dict[str, Any]]) -> Optional[str]:
+    """thread_id de la configuration LangGraph (clé de la file équitable)"""
+    return ((config or {}).get("configurable") or {}).get("thread_id")
+
+
+def _limits(settings: Settings) -> Dict[str, Any]:
+    return {
+        "max_concurrency": settings.model_max_concurrency,
+        "max_queue_per_thread": settings.model_queue_per_thread,
+        "queue_timeout": settings.model_queue_timeout,
+        "max_queue": settings.model_max_queue,
+    }
+
+
+# Instance globale, partagée par tous les appels au modèle du processus
+admission = AdmissionController(**_limits(get_settings()))
+
+on_settings_change(lambda old, new: admission.configure(**_limits(new)))
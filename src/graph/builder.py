@@ -2,53 +2,102 @@
 Construction du graphe LangGraph
 """
 import os
+import time
 from typing import Annotated, Dict, List, TypedDict
 
+import openai
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.message import AnyMessage, add_messages
-from langgraph.prebuilt import ToolNode
-from langgraph.checkpoint.memory import MemorySaver
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 
 from src.core.config import get_settings
-from src.core.prompts import load_system_prompt, get_default_system_prompt
-from src.graph.tools import TOOLS
+from src.graph.admission import admission, thread_id_of
+from src.graph.checkpoint import create_checkpointer
+from src.graph.compaction import acompact_history, compact_history
+from src.graph.context import context_stats, elide_stale_tool_results, stable_prefix
+from src.graph.fast_path import fast_path, route_fast_path
+from src.graph.hedging import hedged_model
+from src.graph.routing import choose_route, route_settings, routing_stats
+from src.graph.tool_node import ParallelToolNode
+from src.graph.tools import TOOL_CONCURRENCY_LIMITS, TOOL_TIMEOUTS, TOOLS
 
 
 class ChatState(TypedDict):
     """État du chat"""
     messages: Annotated[List[AnyMessage], add_messages]
+    # Résumé glissant des tours compactés (voir src/graph/compaction.py)
+    summary: str
 
 
-def call_model(state: ChatState) -> dict:
-    """Appelle le modèle de langage avec les outils"""
-    settings = get_settings()
-    
-    print(settings.api_key)
-
-    model = ChatOpenAI(
-        model=settings.model_name,
-        temperature=settings.temperature,
-        api_key=settings.api_key,
-        base_url=settings.base_url,
-    ).bind_tools(TOOLS)
-
-    # Charger le prompt système
-    system_prompt = load_system_prompt("v1")
-    if not system_prompt:
-        system_prompt = get_default_system_prompt()
+def _prepare_messages(state: ChatState) -> List[AnyMessage]:
+    """Construit la liste de messages envoyée au modèle"""
+    # Prompt système servi depuis le cache, identique octet pour octet d'un appel à l'autre
+    prefix = stable_prefix("v1")
     
     # Ajouter le message système au début si pas déjà présent
     messages = state["messages"]
     if not messages or not isinstance(messages[0], SystemMessage):
-        messages = [SystemMessage(content=system_prompt)] + messages
+        messages = [prefix.system_message] + messages
+
+    # Résumé des tours compactés, juste après le(s) message(s) système
+    if state.get("summary"):
+        head = 0
+        while head < len(messages) and isinstance(messages[head], SystemMessage):
+            head += 1
+        summary = SystemMessage(content=f"Résumé de la conversation précédente :\n{state['summary']}")
+        messages = messages[:head] + [summary] + messages[head:]
+
+    # Résultats d'outils anciens : résumé dans le contexte, payload complet dans le checkpoint
+    settings = get_settings()
+    if settings.tool_result_max_age_turns >= 0:
+        messages, elided, saved = elide_stale_tool_results(
+            messages, settings.tool_result_max_age_turns, settings.tool_result_digest_chars
+        )
+        context_stats.record(elided, saved)
+    return messages
+
+
+def call_model(state: ChatState, config: RunnableConfig) -> dict:
+    """Appelle le modèle de langage avec les outils"""
+    # Modèle rapide pour reformuler un résultat de consultation, principal sinon
+    route = choose_route(state)
+    settings = route_settings(get_settings(), route)
+
+    # Client lié aux outils, réutilisé tant que les paramètres ne changent pas
+    # (couvert sur plusieurs points d'accès si BASE_URLS en liste plusieurs)
+    model = hedged_model(settings)
     
-    response = model.invoke(messages)
+    messages = _prepare_messages(state)
+    # Créneau d'appel au fournisseur (concurrence bornée, file équitable par thread)
+    with admission.slot(thread_id_of(config)):
+        started = time.perf_counter()
+        try:
+            response = model.invoke(messages, config)
+        except openai.RateLimitError as e:
+            raise admission.rate_limited(e)
+    routing_stats.record(route, settings.model_name, time.perf_counter() - started, response)
     print(response)
     return {"messages": [response]}
 
 
+async def acall_model(state: ChatState, config: RunnableConfig) -> dict:
+    """Variante asynchrone de call_model, utilisée par ainvoke/astream"""
+    route = choose_route(state)
+    settings = route_settings(get_settings(), route)
+    model = hedged_model(settings)
+
+    messages = _prepare_messages(state)
+    async with admission.aslot(thread_id_of(config)):
+        started = time.perf_counter()
+        try:
+            response = await model.ainvoke(messages, config)
+        except openai.RateLimitError as e:
+            raise admission.rate_limited(e)
+    routing_stats.record(route, settings.model_name, time.perf_counter() - started, response)
+    return {"messages": [response]}
+
+
 def route_tools(state: ChatState):
     """Route vers les outils ou fin selon les appels d'outils"""
     last = state["messages"][-1]
@@ -60,27 +109,43 @@ def route_tools(state: ChatState):
 
 def create_graph():
     """Crée et compile le graphe LangGraph"""
+    settings = get_settings()
     builder = StateGraph(ChatState)
     
-    # Créer le nœud d'outils
-    tool_node = ToolNode(TOOLS)
+    # Créer le nœud d'outils (appels d'un même tour exécutés en parallèle)
+    tool_node = ParallelToolNode(
+        TOOLS,
+        max_workers=settings.tool_max_workers,
+        concurrency_limits={**TOOL_CONCURRENCY_LIMITS, **settings.tool_concurrency_limits},
+        timeouts={**TOOL_TIMEOUTS, **settings.tool_timeouts},
+    )
     
     # Ajouter les nœuds
-    builder.add_node("model", call_model)
-    builder.add_node("tools", tool_node)
+    # Le nœud modèle expose les deux chemins : invoke (CLI) et ainvoke/astream (API, UI)
+    builder.add_node("model", RunnableLambda(call_model, afunc=acall_model, name="model"))
+    builder.add_node("tools", tool_node.as_runnable())
+    # Compactage de l'historique avant chaque appel au modèle
+    builder.add_node("compact", RunnableLambda(compact_history, afunc=acompact_history, name="compact"))
     
     # Ajouter les arêtes
-    builder.add_edge(START, "model")
+    if settings.fast_path_enabled:
+        # Consultations simples servies sans le modèle, sinon suite normale
+        builder.add_node("fast_path", RunnableLambda(fast_path, name="fast_path"))
+        builder.add_edge(START, "fast_path")
+        builder.add_conditional_edges("fast_path", route_fast_path, {"done": END, "model": "compact"})
+    else:
+        builder.add_edge(START, "compact")
+    builder.add_edge("compact", "model")
     builder.add_conditional_edges(
         "model",
         route_tools,
         {"tools": "tools", END: END},
     )
-    # Après l'exécution des outils, retourner au modèle
-    builder.add_edge("tools", "model")
+    # Après l'exécution des outils, retourner au modèle (via le compactage)
+    builder.add_edge("tools", "compact")
     
-    # Persistance via thread_id
-    checkpointer = MemorySaver()
+    # Persistance via thread_id (MemorySaver ou SQLite selon CHECKPOINTER)
+    checkpointer = create_checkpointer(settings)
     return builder.compile(checkpointer=checkpointer)
 
 
@@ -0,0 +1,703 @@
+"""
+Persistance des conversations (checkpointers LangGraph)
+
+``SQLiteCheckpointSaver`` conserve les checkpoints dans un fichier SQLite en
+mode WAL, partageable entre workers uvicorn et persistant aux redémarrages.
+Les écritures intermédiaires d'un super-step sont tamponnées en mémoire et
+validées dans la même transaction que le checkpoint qui clôt ce super-step.
+
+``BoundedCheckpointSaver`` borne la mémoire du checkpointer en mémoire
+(éviction LRU / inactivité, déversement optionnel sur disque).
+"""
+import asyncio
+import hashlib
+import os
+import pickle
+import queue
+import random
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    ERROR,
+    INTERRUPT,
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+    writes_sort_key,
+)
+from langgraph.checkpoint.memory import MemorySaver
+
+from src.core.config import Settings
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT,
+    checkpoint BLOB,
+    metadata_type TEXT,
+    metadata BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT,
+    value BLOB,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+CREATE INDEX IF NOT EXISTS idx_checkpoints_thread
+    ON checkpoints (thread_id, checkpoint_ns, checkpoint_id DESC);
+CREATE INDEX IF NOT EXISTS idx_checkpoints_checkpoint_id
+    ON checkpoints (checkpoint_id);
+CREATE INDEX IF NOT EXISTS idx_writes_checkpoint
+    ON writes (thread_id, checkpoint_ns, checkpoint_id);
+"""
+
+# Écritures qui doivent être visibles immédiatement (reprise après erreur / interruption)
+_FLUSH_NOW_CHANNELS = {ERROR, INTERRUPT}
+
+_WriteRow = Tuple[str, str, str, str, int, str, str, bytes, str]
+
+
+class SQLiteConnectionPool:
+    """Pool de connexions SQLite (mode WAL) partagé par le processus"""
+
+    _pools: Dict[Tuple[int, str], "SQLiteConnectionPool"] = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(self, path: str, size: int = 4) -> None:
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connections: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(max(1, size)):
+            self._connections.put(self._connect())
+        with self.connection() as conn:
+            conn.executescript(_SCHEMA)
+
+    @classmethod
+    def for_path(cls, path: str, size: int = 4) -> "SQLiteConnectionPool":
+        """Retourne le pool du processus courant pour ce fichier"""
+        # Clé par PID : un worker forké ne réutilise pas les connexions du parent
+        key = (os.getpid(), os.path.abspath(path))
+        with cls._pools_lock:
+            pool = cls._pools.get(key)
+            if pool is None:
+                pool = cls(path, size)
+                cls._pools[key] = pool
+            return pool
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connections.get()
+        try:
+            yield conn
+        finally:
+            self._connections.put(conn)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+
+class SQLiteCheckpointSaver(BaseCheckpointSaver[str]):
+    """Checkpointer LangGraph persistant sur SQLite"""
+
+    def __init__(self, path: str, pool_size: int = 4, *, serde=None) -> None:
+        super().__init__(serde=serde)
+        self.pool = SQLiteConnectionPool.for_path(path, pool_size)
+        # (thread_id, checkpoint_ns, checkpoint_id) -> lignes de writes en attente
+        self._pending: Dict[Tuple[str, str, str], Dict[Tuple[str, int], _WriteRow]] = {}
+        self._pending_lock = threading.Lock()
+
+    # --- Écriture ---
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        type_, blob = self.serde.dumps_typed(checkpoint)
+        meta_type, meta_blob = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        pending = self._take_pending(thread_id)
+
+        # Un seul commit par super-step : writes tamponnés + nouveau checkpoint
+        with self.pool.transaction() as conn:
+            if pending:
+                self._insert_writes(conn, pending)
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id, "
+                "parent_checkpoint_id, type, checkpoint, metadata_type, metadata) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id,
+                    checkpoint_ns,
+                    checkpoint["id"],
+                    config["configurable"].get("checkpoint_id"),
+                    type_,
+                    blob,
+                    meta_type,
+                    meta_blob,
+                ),
+            )
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        if self._buffer_writes(config, writes, task_id, task_path):
+            self.flush(config["configurable"]["thread_id"])
+
+    def _buffer_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str,
+    ) -> bool:
+        """Met les writes en attente ; True s'ils doivent être validés tout de suite"""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        outer_key = (thread_id, checkpoint_ns, checkpoint_id)
+        flush_now = False
+        with self._pending_lock:
+            bucket = self._pending.setdefault(outer_key, {})
+            for idx, (channel, value) in enumerate(writes):
+                inner_key = (task_id, WRITES_IDX_MAP.get(channel, idx))
+                if inner_key[1] >= 0 and inner_key in bucket:
+                    continue
+                type_, blob = self.serde.dumps_typed(value)
+                bucket[inner_key] = (
+                    thread_id, checkpoint_ns, checkpoint_id, task_id,
+                    inner_key[1], channel, type_, blob, task_path,
+                )
+                flush_now = flush_now or channel in _FLUSH_NOW_CHANNELS
+        return flush_now
+
+    def flush(self, thread_id: Optional[str] = None) -> None:
+        """Valide immédiatement les writes en attente (d'un thread ou de tous)"""
+        pending = self._take_pending(thread_id)
+        if pending:
+            with self.pool.transaction() as conn:
+                self._insert_writes(conn, pending)
+
+    def delete_thread(self, thread_id: str) -> None:
+        self._take_pending(thread_id)
+        with self.pool.transaction() as conn:
+            conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+            conn.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+
+    # --- Lecture ---
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+        with self.pool.connection() as conn:
+            if checkpoint_id:
+                row = conn.execute(
+                    "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata "
+                    "FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchone()
+            else:
+                row = conn.execute(
+                    "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata "
+                    "FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns),
+                ).fetchone()
+            if row is None:
+                return None
+            return self._to_tuple(conn, thread_id, checkpoint_ns, row)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        query = (
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, "
+            "metadata_type, metadata FROM checkpoints"
+        )
+        clauses: List[str] = []
+        params: List[Any] = []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            checkpoint_ns = config["configurable"].get("checkpoint_ns")
+            if checkpoint_ns is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY checkpoint_id DESC"
+
+        with self.pool.connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+            results = []
+            for thread_id, checkpoint_ns, *row in rows:
+                if limit is not None and len(results) >= limit:
+                    break
+                item = self._to_tuple(conn, thread_id, checkpoint_ns, tuple(row))
+                if filter and not all(item.metadata.get(k) == v for k, v in filter.items()):
+                    continue
+                results.append(item)
+        yield from results
+
+    # --- Variantes asynchrones (exécutées hors de la boucle) ---
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.get_running_loop().run_in_executor(None, self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.get_running_loop().run_in_executor(
+            None, lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.put, config, checkpoint, metadata, new_versions
+        )
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        # Tamponné en mémoire ; seuls les writes spéciaux (erreur, interruption)
+        # sont validés aussitôt, hors de la boucle
+        if self._buffer_writes(config, writes, task_id, task_path):
+            await asyncio.get_running_loop().run_in_executor(
+                None, self.flush, config["configurable"]["thread_id"]
+            )
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.delete_thread, thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: None = None) -> str:
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    # --- Utilitaires ---
+    def _take_pending(self, thread_id: Optional[str]) -> List[_WriteRow]:
+        with self._pending_lock:
+            keys = [k for k in self._pending if thread_id is None or k[0] == thread_id]
+            rows: List[_WriteRow] = []
+            for key in keys:
+                rows.extend(self._pending.pop(key).values())
+        return rows
+
+    @staticmethod
+    def _insert_writes(conn: sqlite3.Connection, rows: List[_WriteRow]) -> None:
+        conn.executemany(
+            "INSERT OR REPLACE INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, "
+            "channel, type, value, task_path) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+
+    def _pending_writes(
+        self, conn: sqlite3.Connection, thread_id: str, checkpoint_ns: str, checkpoint_id: str
+    ) -> List[Tuple[str, str, Any]]:
+        rows = conn.execute(
+            "SELECT task_id, idx, channel, type, value, task_path FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        merged = {(task_id, idx): (channel, type_, value, task_path) for task_id, idx, channel, type_, value, task_path in rows}
+        with self._pending_lock:
+            for inner_key, row in self._pending.get((thread_id, checkpoint_ns, checkpoint_id), {}).items():
+                merged[inner_key] = (row[5], row[6], row[7], row[8])
+        ordered = sorted(merged.items(), key=lambda item: writes_sort_key(item[1][3], *item[0]))
+        return [
+            (task_id, channel, self.serde.loads_typed((type_, value)))
+            for (task_id, _), (channel, type_, value, _) in ordered
+        ]
+
+    def _to_tuple(
+        self, conn: sqlite3.Connection, thread_id: str, checkpoint_ns: str, row: tuple
+    ) -> CheckpointTuple:
+        checkpoint_id, parent_id, type_, blob, meta_type, meta_blob = row
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint=self.serde.loads_typed((type_, blob)),
+            metadata=self.serde.loads_typed((meta_type, meta_blob)),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_id,
+                    }
+                }
+                if parent_id
+                else None
+            ),
+            pending_writes=self._pending_writes(conn, thread_id, checkpoint_ns, checkpoint_id),
+        )
+
+
+class BoundedCheckpointSaver(BaseCheckpointSaver):
+    """
+    Enveloppe un checkpointer en mémoire pour borner sa taille.
+
+    Limites : nombre de threads résidents, octets résidents et durée
+    d'inactivité. Les threads évincés (LRU) sont soit supprimés, soit déversés
+    dans un fichier compressé de ``spill_dir`` puis rechargés au prochain accès.
+
+    Sans ``spill_dir``, un thread évincé perd tout son historique : la
+    conversation repart de zéro. Un thread accédé depuis moins de
+    ``evict_grace`` secondes n'est jamais évincé (il est sans doute au milieu
+    d'une exécution, entre deux super-steps) : les limites peuvent être
+    dépassées le temps que ces threads se calment.
+    """
+
+    def __init__(
+        self,
+        inner: BaseCheckpointSaver,
+        max_threads: int = 0,
+        max_bytes: int = 0,
+        idle_ttl: float = 0,
+        spill_dir: Optional[str] = None,
+        evict_grace: float = 30.0,
+    ) -> None:
+        super().__init__(serde=inner.serde)
+        self.inner = inner
+        self.max_threads = max_threads
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self.spill_dir = spill_dir
+        self.evict_grace = evict_grace
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+        # thread_id -> [octets, dernier accès], ordonné du moins au plus récent
+        self._resident: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._resident_bytes = 0
+        self._lock = threading.RLock()
+        self.evictions = 0
+        self.spills = 0
+        self.faults = 0
+
+    # --- Écriture ---
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            self._touch(thread_id)
+            result = self.inner.put(config, checkpoint, metadata, new_versions)
+            self._account(thread_id, self._checkpoint_size(config, checkpoint, new_versions))
+            self._enforce_limits(keep=thread_id)
+            return result
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            self._touch(thread_id)
+            self.inner.put_writes(config, writes, task_id, task_path)
+            size = sum(len(self.serde.dumps_typed(value)[1]) for _, value in writes)
+            self._account(thread_id, size)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._forget(thread_id)
+            self.inner.delete_thread(thread_id)
+            path = self._spill_path(thread_id)
+            if path and os.path.exists(path):
+                os.remove(path)
+
+    # --- Lecture ---
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        with self._lock:
+            self._touch(config["configurable"]["thread_id"])
+            self._enforce_limits(keep=config["configurable"]["thread_id"])
+            return self.inner.get_tuple(config)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        with self._lock:
+            if config:
+                self._touch(config["configurable"]["thread_id"])
+            items = list(self.inner.list(config, filter=filter, before=before, limit=limit))
+        yield from items
+
+    # --- Variantes asynchrones ---
+    # Avec spill_dir, éviction et rechargement lisent/écrivent des fichiers sous
+    # le verrou : exécutés hors de la boucle. Sinon tout reste en mémoire.
+    async def _run(self, fn, *args):
+        if not self.spill_dir:
+            return fn(*args)
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await self._run(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await self._run(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await self._run(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await self._run(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await self._run(self.delete_thread, thread_id)
+
+    def get_next_version(self, current: Optional[Any], channel: None = None) -> Any:
+        return self.inner.get_next_version(current, channel)
+
+    def stats(self) -> Dict[str, Any]:
+        """Threads et octets résidents, évictions et rechargements"""
+        with self._lock:
+            return {
+                "resident_threads": len(self._resident),
+                "resident_bytes": self._resident_bytes,
+                "max_threads": self.max_threads,
+                "max_bytes": self.max_bytes,
+                "idle_ttl": self.idle_ttl,
+                "evictions": self.evictions,
+                "spills": self.spills,
+                "faults": self.faults,
+            }
+
+    # --- Gestion de la résidence ---
+    def _touch(self, thread_id: str) -> None:
+        entry = self._resident.get(thread_id)
+        if entry is None:
+            entry = [0, 0.0]
+            self._resident[thread_id] = entry
+            self._fault_in(thread_id)
+        entry[1] = time.monotonic()
+        self._resident.move_to_end(thread_id)
+
+    def _account(self, thread_id: str, size: int) -> None:
+        self._resident[thread_id][0] += size
+        self._resident_bytes += size
+
+    def _forget(self, thread_id: str) -> None:
+        entry = self._resident.pop(thread_id, None)
+        if entry is not None:
+            self._resident_bytes -= entry[0]
+
+    def _enforce_limits(self, keep: str) -> None:
+        # Du moins au plus récent : on s'arrête au premier thread encore actif
+        now = time.monotonic()
+        recent = now - self.evict_grace
+        if self.idle_ttl:
+            deadline = min(now - self.idle_ttl, recent)
+            for thread_id, (_, last_access) in list(self._resident.items()):
+                if last_access >= deadline:
+                    break
+                if thread_id != keep:
+                    self._evict(thread_id)
+        for thread_id, (_, last_access) in list(self._resident.items()):
+            over_threads = self.max_threads and len(self._resident) > self.max_threads
+            over_bytes = self.max_bytes and self._resident_bytes > self.max_bytes
+            if not (over_threads or over_bytes) or last_access >= recent:
+                break
+            if thread_id != keep:
+                self._evict(thread_id)
+
+    def _evict(self, thread_id: str) -> None:
+        path = self._spill_path(thread_id)
+        if path:
+            tuples = list(self.inner.list({"configurable": {"thread_id": thread_id}}))
+            if tuples:
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(zlib.compress(pickle.dumps(tuples, protocol=pickle.HIGHEST_PROTOCOL)))
+                os.replace(tmp_path, path)
+                self.spills += 1
+        self.inner.delete_thread(thread_id)
+        self._forget(thread_id)
+        self.evictions += 1
+
+    def _fault_in(self, thread_id: str) -> None:
+        path = self._spill_path(thread_id)
+        if not path or not os.path.exists(path):
+            return
+        with open(path, "rb") as f:
+            raw = zlib.decompress(f.read())
+        os.remove(path)
+        # Rejoue les checkpoints du plus ancien au plus récent
+        for item in sorted(pickle.loads(raw), key=lambda t: t.config["configurable"]["checkpoint_id"]):
+            configurable = item.config["configurable"]
+            parent_id = (item.parent_config or {}).get("configurable", {}).get("checkpoint_id")
+            put_config = {
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": configurable.get("checkpoint_ns", ""),
+                    "checkpoint_id": parent_id,
+                }
+            }
+            self.inner.put(put_config, item.checkpoint, item.metadata, item.checkpoint["channel_versions"])
+            writes_by_task: "OrderedDict[str, List[Tuple[str, Any]]]" = OrderedDict()
+            for task_id, channel, value in item.pending_writes or []:
+                writes_by_task.setdefault(task_id, []).append((channel, value))
+            for task_id, writes in writes_by_task.items():
+                self.inner.put_writes(item.config, writes, task_id)
+        self._account(thread_id, len(raw))
+        self.faults += 1
+
+    def _spill_path(self, thread_id: str) -> Optional[str]:
+        if not self.spill_dir:
+            return None
+        digest = hashlib.sha256(str(thread_id).encode()).hexdigest()
+        return os.path.join(self.spill_dir, f"{digest}.ckpt.z")
+
+    def _checkpoint_size(self, config: RunnableConfig, checkpoint: Checkpoint, new_versions: ChannelVersions) -> int:
+        # Les blobs des canaux modifiés + un forfait pour le checkpoint et ses métadonnées
+        values = checkpoint.get("channel_values", {})
+        if isinstance(self.inner, MemorySaver):
+            # Taille exacte des blobs déjà sérialisés par MemorySaver
+            thread_id = config["configurable"]["thread_id"]
+            checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+            return sum(
+                len(self.inner.blobs.get((thread_id, checkpoint_ns, k, v), ("", b""))[1])
+                for k, v in new_versions.items()
+            ) + 512
+        return sum(len(self.serde.dumps_typed(values[k])[1]) for k in new_versions if k in values) + 512
+
+
+def create_checkpointer(settings: Settings) -> BaseCheckpointSaver:
+    """Crée le checkpointer choisi par la configuration"""
+    if settings.checkpointer == "sqlite":
+        return SQLiteCheckpointSaver(settings.checkpoint_db_path, settings.checkpoint_pool_size)
+    if settings.checkpointer == "memory":
+        if (
+            settings.checkpoint_max_threads
+            or settings.checkpoint_max_bytes
+            or settings.checkpoint_idle_ttl
+        ):
+            return BoundedCheckpointSaver(
+                MemorySaver(),
+                max_threads=settings.checkpoint_max_threads,
+                max_bytes=settings.checkpoint_max_bytes,
+                idle_ttl=settings.checkpoint_idle_ttl,
+                spill_dir=settings.checkpoint_spill_dir,
+                evict_grace=settings.checkpoint_evict_grace,
+            )
+        return MemorySaver()
+    raise ValueError(f"Checkpointer inconnu: {settings.checkpointer}")
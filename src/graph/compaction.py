@@ -0,0 +1,148 @@
+"""
+Compactage de l'historique de conversation
+
+Quand l'historique dépasse un budget de tokens, les tours les plus anciens sont
+résumés dans un résumé glissant (``ChatState.summary``) et retirés des messages.
+Les tours récents sont conservés tels quels. La coupe se fait toujours au début
+d'un tour (HumanMessage) : un AIMessage avec ``tool_calls`` n'est jamais séparé
+des ToolMessage qui lui répondent.
+"""
+from typing import List, Optional, Sequence
+
+import openai
+from langchain_core.messages import (
+    AIMessage,
+    AnyMessage,
+    HumanMessage,
+    RemoveMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.runnables import RunnableConfig
+from langgraph.constants import TAG_NOSTREAM
+
+from src.core.config import get_settings
+from src.graph.admission import admission, thread_id_of
+from src.graph.hedging import hedged_model
+
+# Longueur maximale d'un message dans la transcription envoyée au résumeur
+_TRANSCRIPT_CHARS = 1500
+
+SUMMARY_INSTRUCTIONS = (
+    "Vous résumez une conversation entre un client et l'assistant d'une agence immobilière. "
+    "Produisez un résumé factuel et concis en français qui conserve : l'identité et les "
+    "coordonnées du client, ses critères de recherche, les agents et biens évoqués (avec "
+    "leurs identifiants), les créneaux proposés et les rendez-vous confirmés (event_id, "
+    "dates). N'inventez rien."
+)
+
+
+def find_compaction_cut(
+    messages: Sequence[AnyMessage], budget: int, keep_recent_tokens: int
+) -> Optional[int]:
+    """
+    Retourne l'index à partir duquel les messages sont conservés, ou None.
+
+    Les messages avant cet index (hors messages système de tête) sont à résumer.
+    """
+    if budget <= 0 or count_tokens_approximately(messages) <= budget:
+        return None
+
+    start = 0
+    while start < len(messages) and isinstance(messages[start], SystemMessage):
+        start += 1
+
+    # Coupes possibles : début de chaque tour utilisateur
+    turn_starts = [i for i in range(start + 1, len(messages)) if isinstance(messages[i], HumanMessage)]
+    if not turn_starts:
+        return None
+
+    cut = turn_starts[-1]
+    for index in turn_starts:
+        if count_tokens_approximately(messages[index:]) <= keep_recent_tokens:
+            cut = index
+            break
+    return cut if _is_safe_cut(messages, start, cut) else None
+
+
+def _is_safe_cut(messages: Sequence[AnyMessage], start: int, cut: int) -> bool:
+    """Vérifie que chaque tool_call résumé a sa réponse dans la partie résumée"""
+    pending = set()
+    for message in messages[start:cut]:
+        if isinstance(message, AIMessage):
+            pending.update(call["id"] for call in message.tool_calls)
+        elif isinstance(message, ToolMessage):
+            pending.discard(message.tool_call_id)
+    return not pending
+
+
+def _transcript(messages: Sequence[AnyMessage]) -> str:
+    lines = []
+    for message in messages:
+        content = message.content if isinstance(message.content, str) else str(message.content)
+        if isinstance(message, HumanMessage):
+            role = "Client"
+        elif isinstance(message, ToolMessage):
+            role = f"Outil {message.name or ''}".strip()
+        elif isinstance(message, AIMessage):
+            role = "Assistant"
+            if message.tool_calls:
+                calls = ", ".join(f"{c['name']}({c['args']})" for c in message.tool_calls)
+                content = f"{content} [appels: {calls}]".strip()
+        else:
+            role = "Système"
+        lines.append(f"{role}: {content[:_TRANSCRIPT_CHARS]}")
+    return "\n".join(lines)
+
+
+def _summary_request(previous: Optional[str], old: Sequence[AnyMessage]) -> List[AnyMessage]:
+    body = ""
+    if previous:
+        body += f"Résumé existant :\n{previous}\n\n"
+    body += f"Nouveaux échanges à intégrer :\n{_transcript(old)}"
+    return [SystemMessage(content=SUMMARY_INSTRUCTIONS), HumanMessage(content=body)]
+
+
+def _messages_to_compact(state: dict) -> List[AnyMessage]:
+    """Messages anciens à résumer (liste vide si le budget est respecté)"""
+    settings = get_settings()
+    messages = state["messages"]
+    cut = find_compaction_cut(messages, settings.history_token_budget, settings.history_keep_recent_tokens)
+    if cut is None:
+        return []
+    return [m for m in messages[:cut] if not isinstance(m, SystemMessage)]
+
+
+def _summarizer():
+    return hedged_model(get_settings(), bind_tools=False)
+
+
+# Les tokens du résumé ne doivent pas apparaître dans le flux envoyé au client
+_SUMMARY_CONFIG = {"tags": [TAG_NOSTREAM]}
+
+
+def compact_history(state: dict, config: RunnableConfig) -> dict:
+    """Nœud de compactage (chemin synchrone)"""
+    old = _messages_to_compact(state)
+    if not old:
+        return {}
+    with admission.slot(thread_id_of(config)):
+        try:
+            response = _summarizer().invoke(_summary_request(state.get("summary"), old), _SUMMARY_CONFIG)
+        except openai.RateLimitError as e:
+            raise admission.rate_limited(e)
+    return {"summary": response.content, "messages": [RemoveMessage(id=m.id) for m in old]}
+
+
+async def acompact_history(state: dict, config: RunnableConfig) -> dict:
+    """Nœud de compactage (chemin asynchrone)"""
+    old = _messages_to_compact(state)
+    if not old:
+        return {}
+    async with admission.aslot(thread_id_of(config)):
+        try:
+            response = await _summarizer().ainvoke(_summary_request(state.get("summary"), old), _SUMMARY_CONFIG)
+        except openai.RateLimitError as e:
+            raise admission.rate_limited(e)
+    return {"summary": response.content, "messages": [RemoveMessage(id=m.id) for m in old]}
@@ -0,0 +1,148 @@
+"""
+Mise en forme du contexte envoyé au modèle
+
+Le préfixe (prompt système + schémas des outils) est précalculé et réutilisé
+tel quel d'un appel à l'autre, pour que le cache de préfixe du fournisseur
+s'applique. Les résultats d'outils anciens (plus de N tours utilisateur) sont remplacés,
+dans le contexte du modèle uniquement, par un court résumé : nom de l'outil,
+arguments et aperçu du résultat. Le ToolMessage complet reste dans le
+checkpoint et peut être rejoué.
+"""
+import hashlib
+import json
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+
+from src.core.prompts import get_default_system_prompt, load_system_prompt
+from src.graph.model_pool import model_registry
+
+
+class PromptPrefix(NamedTuple):
+    """Préfixe stable envoyé en tête de chaque requête au modèle"""
+    system_message: SystemMessage
+    tool_schemas: List[Dict[str, Any]]
+    fingerprint: str
+
+
+_prefixes: Dict[str, PromptPrefix] = {}
+_prefix_lock = threading.Lock()
+
+
+def stable_prefix(version: str = "v1") -> PromptPrefix:
+    """Retourne le préfixe, reconstruit seulement si le prompt a changé"""
+    text = load_system_prompt(version) or get_default_system_prompt()
+    with _prefix_lock:
+        prefix = _prefixes.get(version)
+        if prefix is None or prefix.system_message.content != text:
+            schemas = model_registry.tool_schemas
+            payload = json.dumps({"system": text, "tools": schemas}, ensure_ascii=False, sort_keys=True)
+            prefix = PromptPrefix(
+                system_message=SystemMessage(content=text),
+                tool_schemas=schemas,
+                fingerprint=hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16],
+            )
+            _prefixes[version] = prefix
+        return prefix
+
+
+def prefix_fingerprint(version: str = "v1") -> Optional[str]:
+    """Empreinte du dernier préfixe calculé (None si aucun)"""
+    prefix = _prefixes.get(version)
+    return prefix.fingerprint if prefix else None
+
+
+class ContextShapingStats:
+    """Compteurs des tokens économisés par l'élision des résultats d'outils"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.model_calls = 0
+        self.elided_messages = 0
+        self.tokens_saved = 0
+        self.last_tokens_saved = 0
+
+    def record(self, elided: int, saved: int) -> None:
+        with self._lock:
+            self.model_calls += 1
+            self.elided_messages += elided
+            self.tokens_saved += saved
+            self.last_tokens_saved = saved
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "model_calls": self.model_calls,
+                "elided_messages": self.elided_messages,
+                "tokens_saved": self.tokens_saved,
+                "last_tokens_saved": self.last_tokens_saved,
+                "avg_tokens_saved": round(self.tokens_saved / self.model_calls, 1) if self.model_calls else 0.0,
+            }
+
+
+# Instance globale des statistiques
+context_stats = ContextShapingStats()
+
+
+def _digest(content: str, max_chars: int) -> str:
+    """Aperçu court d'un résultat d'outil"""
+    try:
+        data = json.loads(content)
+    except (TypeError, ValueError):
+        data = None
+    if isinstance(data, list):
+        shape = f"liste de {len(data)} éléments"
+    elif isinstance(data, dict):
+        shape = f"objet {{{', '.join(list(data)[:6])}}}"
+    else:
+        shape = f"{len(content)} caractères"
+    preview = " ".join(content.split())
+    if len(preview) > max_chars:
+        preview = preview[:max_chars] + "…"
+    return f"{shape} : {preview}"
+
+
+def elide_stale_tool_results(
+    messages: Sequence[AnyMessage], max_age_turns: int, digest_chars: int = 160
+) -> Tuple[List[AnyMessage], int, int]:
+    """
+    Remplace les ToolMessage de plus de ``max_age_turns`` tours par un résumé.
+
+    Returns:
+        (messages pour le modèle, nombre de messages élidés, tokens économisés)
+    """
+    calls = {
+        call["id"]: call
+        for message in messages
+        if isinstance(message, AIMessage)
+        for call in message.tool_calls
+    }
+    shaped: List[AnyMessage] = list(messages)
+    age = 0
+    originals: List[AnyMessage] = []
+    stubs: List[AnyMessage] = []
+    for index in range(len(shaped) - 1, -1, -1):
+        message = shaped[index]
+        if isinstance(message, HumanMessage):
+            age += 1
+        elif isinstance(message, ToolMessage) and age > max_age_turns:
+            call = calls.get(message.tool_call_id, {})
+            name = message.name or call.get("name", "outil")
+            args = json.dumps(call.get("args", {}), ensure_ascii=False, separators=(",", ":"))
+            content = message.content if isinstance(message.content, str) else str(message.content)
+            stub = ToolMessage(
+                content=f"[résultat élidé] {name}({args}) → {_digest(content, digest_chars)}",
+                tool_call_id=message.tool_call_id,
+                name=message.name,
+                id=message.id,
+            )
+            originals.append(message)
+            stubs.append(stub)
+            shaped[index] = stub
+
+    saved = 0
+    if stubs:
+        saved = max(count_tokens_approximately(originals) - count_tokens_approximately(stubs), 0)
+    return shaped, len(stubs), saved
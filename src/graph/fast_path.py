@@ -0,0 +1,231 @@
+"""
+Routeur déterministe pour les consultations simples du catalogue
+
+Placé avant le modèle (FAST_PATH_ENABLED), il reconnaît les demandes sans
+ambiguïté ("montre-moi prop3", "quels sont vos agents ?", "agents spécialisés
+en luxury", ...), appelle directement l'outil correspondant et répond avec un
+modèle de texte. L'appel d'outil et son résultat sont ajoutés à l'historique
+comme si le modèle les avait demandés. Dans le doute, la main passe au modèle.
+"""
+import json
+import re
+import threading
+import unicodedata
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from src.graph.tool_output import expand
+from src.graph.tools import (
+    find_agent_by_speciality,
+    get_agent_info,
+    get_property_summary,
+    list_agents,
+    list_properties,
+)
+from tools import AGENTS_STORE, PROPERTIES_STORE, on_store_change
+from tools.agent_info import AGENTS_DB
+from tools.property_manager import PROPERTIES_DB
+
+# Au-delà, la demande est probablement plus riche qu'une simple consultation
+_MAX_WORDS = 14
+
+# Réservation, dates, budget, localisation, négation... : laissés au modèle
+_BLOCKLIST = re.compile(
+    r"\b(reserv\w*|rendez\w*|rdv|visit\w*|creneau\w*|disponibilite\w*|dispo|demain|aujourd\w*|"
+    r"lundi|mardi|mercredi|jeudi|vendredi|samedi|dimanche|semaine|matin|apres-midi|soir|heures?|"
+    r"mail|email|annul\w*|prix|budget|moins|plus|max\w*|euros?|pas|ne|sauf|a|dans|pres|quartier|"
+    r"arrondissement|compar\w*)\b|[0-9€@]"
+)
+_PROPERTY_WORD = re.compile(r"\b(propriete\w*|biens?|annonces?|logements?)\b")
+_LIST_WORDS = re.compile(r"\b(quels?|quelles?|liste[rz]?|montre\w*|affiche\w*|voir|qui|vos|les|tous|toutes)\b")
+_AGENT_WORD = re.compile(r"\bagents?\b")
+
+
+def _normalize(text: str) -> str:
+    """Minuscules, sans accents ni apostrophes"""
+    text = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r"['’]", " ", text)
+
+
+def _term_pattern(terms: Iterable[str]) -> Dict[str, "re.Pattern[str]"]:
+    """Un motif par terme, tolérant le pluriel (s/x)"""
+    patterns = {}
+    for term in terms:
+        stem = re.sub(r"[sx]$", "", _normalize(term))
+        patterns[term] = re.compile(rf"\b{re.escape(stem)}[sx]?\b")
+    return patterns
+
+
+class FastPathStats:
+    """Taux de réponses servies sans appel au modèle"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.seen = 0
+        self.hits: Dict[str, int] = {}
+
+    def record(self, intent: Optional[str]) -> None:
+        with self._lock:
+            self.seen += 1
+            if intent:
+                self.hits[intent] = self.hits.get(intent, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            total = sum(self.hits.values())
+            return {
+                "seen": self.seen,
+                "hits": total,
+                "hit_rate": round(total / self.seen, 3) if self.seen else 0.0,
+                "by_intent": dict(self.hits),
+            }
+
+
+class FastPathRouter:
+    """Reconnaissance d'intentions par mots-clés, motifs compilés une seule fois"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.stats = FastPathStats()
+        self.rebuild()
+        on_store_change(AGENTS_STORE, self.rebuild)
+        on_store_change(PROPERTIES_STORE, self.rebuild)
+
+    def rebuild(self) -> None:
+        """Recompile les motifs à partir des identifiants et valeurs connus"""
+        agent_ids = sorted(AGENTS_DB, key=len, reverse=True)
+        property_ids = sorted(PROPERTIES_DB, key=len, reverse=True)
+        specialities = {s for agent in AGENTS_DB.values() for s in agent.specialities}
+        types = {prop.type for prop in PROPERTIES_DB.values()}
+        with self._lock:
+            self._agent_ids = re.compile(rf"\b({'|'.join(map(re.escape, agent_ids))})\b") if agent_ids else None
+            self._property_ids = (
+                re.compile(rf"\b({'|'.join(map(re.escape, property_ids))})\b") if property_ids else None
+            )
+            self._specialities = _term_pattern(specialities)
+            self._types = _term_pattern(types)
+
+    def match(self, text: str) -> Optional[Tuple[str, Callable, Dict[str, Any]]]:
+        """Retourne (intention, outil, arguments) si la demande est sans ambiguïté"""
+        norm = _normalize(text)
+        if len(norm.split()) > _MAX_WORDS:
+            return None
+        with self._lock:
+            agents = set(self._agent_ids.findall(norm)) if self._agent_ids else set()
+            props = set(self._property_ids.findall(norm)) if self._property_ids else set()
+            # Les identifiants contiennent des chiffres : on les retire avant la liste d'exclusion
+            rest = self._property_ids.sub(" ", norm) if self._property_ids else norm
+            rest = self._agent_ids.sub(" ", rest) if self._agent_ids else rest
+            if _BLOCKLIST.search(rest):
+                return None
+            specialities = [s for s, p in self._specialities.items() if p.search(rest)]
+            types = [t for t, p in self._types.items() if p.search(rest)]
+
+        if len(props) == 1 and not agents:
+            (property_id,) = props
+            return "property_summary", get_property_summary, {"property_id": property_id}
+        if len(agents) == 1 and not props and not _PROPERTY_WORD.search(rest):
+            (agent_id,) = agents
+            return "agent_info", get_agent_info, {"agent_id": agent_id}
+        if agents or props:
+            return None
+        listing = bool(_LIST_WORDS.search(rest))
+        if _AGENT_WORD.search(rest):
+            if _PROPERTY_WORD.search(rest):
+                return None
+            if len(specialities) == 1:
+                return "agents_by_speciality", find_agent_by_speciality, {"speciality": specialities[0]}
+            if not specialities and listing:
+                return "list_agents", list_agents, {}
+            return None
+        if len(types) == 1 and listing:
+            return "properties_by_type", list_properties, {"property_type": types[0]}
+        return None
+
+
+def _format_agents(agents: List[Dict[str, Any]], intro: str) -> str:
+    lines = [intro]
+    for agent in agents:
+        lines.append(f"- **{agent['name']}** ({agent['id']}) : {', '.join(agent['specialities'])}")
+    lines.append("\nSouhaitez-vous vérifier les disponibilités de l'un d'eux ?")
+    return "\n".join(lines)
+
+
+def _render(intent: str, args: Dict[str, Any], result: str) -> Optional[str]:
+    """Réponse à partir du résultat de l'outil (None si le résultat ne convient pas)"""
+    if intent == "property_summary":
+        if result.endswith("non trouvée"):
+            return None
+        return f"{result}\nSouhaitez-vous organiser une visite de ce bien ?"
+
+    # Les listes peuvent être renvoyées en encodage compact (champs communs regroupés)
+    data = expand(json.loads(result))
+    if not data or (isinstance(data, dict) and "error" in data):
+        return None
+    if intent == "agent_info":
+        return (
+            f"**{data['name']}** ({data['id']})\n"
+            f"- Spécialités : {', '.join(data['specialities'])}\n"
+            f"- Langues : {', '.join(data['languages'])}\n"
+            f"- Contact : {data['email']} / {data['phone']}\n\n"
+            f"{data['description']}\n\n"
+            "Souhaitez-vous vérifier ses disponibilités ?"
+        )
+    if intent == "list_agents":
+        return _format_agents(data, "Voici les agents de l'agence :")
+    if intent == "agents_by_speciality":
+        return _format_agents(data, f"Agents spécialisés en « {args['speciality']} » :")
+    if intent == "properties_by_type":
+        lines = [f"Biens de type « {args['property_type']} » :"]
+        for prop in data:
+            lines.append(f"- **{prop['title']}** ({prop['id']}) — {prop['price']:,.0f} € — {prop['location']}")
+        lines.append("\nSouhaitez-vous plus de détails sur l'un de ces biens ?")
+        return "\n".join(lines)
+    return None
+
+
+def answer(state: dict) -> Optional[List[Any]]:
+    """Messages de réponse directe, ou None pour laisser la main au modèle"""
+    last = state["messages"][-1] if state["messages"] else None
+    if not isinstance(last, HumanMessage) or not isinstance(last.content, str):
+        return None
+
+    matched = fast_path_router.match(last.content)
+    reply = None
+    if matched:
+        intent, tool, args = matched
+        result = tool.invoke(args)
+        reply = _render(intent, args, result)
+    if reply is None:
+        fast_path_router.stats.record(None)
+        return None
+
+    fast_path_router.stats.record(intent)
+    call_id = f"fastpath_{uuid.uuid4().hex[:12]}"
+    metadata = {"fast_path": intent}
+    return [
+        AIMessage(content="", tool_calls=[{"name": tool.name, "args": args, "id": call_id}], response_metadata=metadata),
+        ToolMessage(content=result, tool_call_id=call_id, name=tool.name),
+        AIMessage(content=reply, response_metadata=metadata),
+    ]
+
+
+def fast_path(state: dict) -> dict:
+    """Nœud du routeur : répond directement ou ne modifie rien"""
+    messages = answer(state)
+    return {"messages": messages} if messages else {}
+
+
+def route_fast_path(state: dict) -> str:
+    """Fin du tour si le routeur a répondu, sinon suite vers le modèle"""
+    last = state["messages"][-1]
+    if isinstance(last, AIMessage) and last.response_metadata.get("fast_path") and not last.tool_calls:
+        return "done"
+    return "model"
+
+
+# Instance globale du routeur
+fast_path_router = FastPathRouter()
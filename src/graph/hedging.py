@@ -0,0 +1,355 @@
+"""
+Requêtes au modèle couvertes (hedging) sur plusieurs points d'accès
+
+Avec plusieurs URL compatibles OpenAI (BASE_URLS), une requête part vers le
+premier point d'accès disponible. Si elle n'a pas répondu après le percentile
+de latence observé (HEDGE_PERCENTILE), une copie part vers le suivant : la
+première réponse gagne, l'autre est annulée. Une erreur déclenche aussitôt le
+point d'accès suivant. Un disjoncteur écarte pendant un temps les points
+d'accès qui échouent à répétition.
+
+Les copies de couverture ne diffusent pas leurs tokens (TAG_NOSTREAM) : seul
+le point d'accès principal alimente le flux. Dès que le principal a diffusé son
+premier token, il est gardé : plus aucune copie ne part et celles en cours sont
+abandonnées (le client ne reçoit jamais un début de réponse suivi d'une autre).
+Le délai de couverture est celui du dernier point d'accès sollicité. Sur le
+chemin synchrone, l'appel perdant ne peut pas être interrompu : son résultat
+est simplement ignoré.
+"""
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, InvalidStateError, ThreadPoolExecutor, wait
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.callbacks.base import BaseCallbackManager
+from langchain_core.runnables import Runnable, ensure_config
+from langgraph.constants import TAG_NOSTREAM
+
+from src.core.config import Settings
+from src.graph.model_pool import model_registry
+
+# Nombre minimal de mesures avant d'utiliser le percentile
+_MIN_SAMPLES = 20
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class EndpointHealth:
+    """Latences récentes et disjoncteur d'un point d'accès"""
+
+    def __init__(self, url: str, window: int = 200) -> None:
+        self.url = url
+        self._lock = threading.Lock()
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.attempts = 0
+        self.wins = 0
+        self.failures = 0
+        self.cancelled = 0
+
+    def available(self, reset_timeout: float) -> bool:
+        """Le disjoncteur laisse-t-il passer une requête ?"""
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= reset_timeout:
+                # Essai : un succès referme le disjoncteur, un échec le rouvre
+                self.state = HALF_OPEN
+            return self.state != OPEN
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Latence (secondes) au percentile p, None si trop peu de mesures"""
+        with self._lock:
+            if len(self._latencies) < _MIN_SAMPLES:
+                return None
+            ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            self.attempts += 1
+            self._latencies.append(latency)
+            self.consecutive_failures = 0
+            self.state = CLOSED
+
+    def record_failure(self, threshold: int) -> None:
+        with self._lock:
+            self.attempts += 1
+            self.failures += 1
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or self.consecutive_failures >= threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def record_cancelled(self) -> None:
+        with self._lock:
+            self.attempts += 1
+            self.cancelled += 1
+
+    def record_win(self) -> None:
+        with self._lock:
+            self.wins += 1
+
+    def stats(self) -> Dict[str, Any]:
+        p50, p95 = self.percentile(50), self.percentile(95)
+        with self._lock:
+            return {
+                "state": self.state,
+                "attempts": self.attempts,
+                "wins": self.wins,
+                "failures": self.failures,
+                "cancelled": self.cancelled,
+                "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            }
+
+
+class _FirstToken(BaseCallbackHandler):
+    """Résout ``future`` au premier token diffusé par la tentative principale"""
+
+    run_inline = True
+
+    def __init__(self) -> None:
+        self.future: Future = Future()
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        try:
+            self.future.set_result(None)
+        except InvalidStateError:
+            pass
+
+
+_health: Dict[str, EndpointHealth] = {}
+_health_lock = threading.Lock()
+_hedges = {"requests": 0, "hedged": 0, "fallbacks": 0}
+# Compteurs mis à jour depuis la boucle et depuis les threads de l'exécuteur
+_hedges_lock = threading.Lock()
+# Exécuteur des appels synchrones couverts (les perdants y terminent en arrière-plan)
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="hedge")
+
+
+def endpoint_health(url: str) -> EndpointHealth:
+    with _health_lock:
+        health = _health.get(url)
+        if health is None:
+            health = _health[url] = EndpointHealth(url)
+        return health
+
+
+def _count(name: str) -> None:
+    with _hedges_lock:
+        _hedges[name] += 1
+
+
+def configured_base_urls(settings: Settings) -> List[str]:
+    """BASE_URLS s'il est défini, sinon BASE_URL seul"""
+    return list(settings.base_urls) or ([settings.base_url] if settings.base_url else [])
+
+
+class HedgedModel:
+    """Même interface invoke/ainvoke qu'un modèle, répartie sur plusieurs points d'accès"""
+
+    def __init__(self, endpoints: Sequence[Tuple[str, Runnable]], settings: Settings) -> None:
+        self.endpoints = [(endpoint_health(url), model) for url, model in endpoints]
+        self.percentile = settings.hedge_percentile
+        self.initial_delay = settings.hedge_initial_delay
+        self.failure_threshold = settings.breaker_failure_threshold
+        self.reset_timeout = settings.breaker_reset_timeout
+
+    def _plan(self) -> List[Tuple[EndpointHealth, Runnable]]:
+        """Points d'accès à essayer, dans l'ordre ; les disjonctés en dernier recours"""
+        allowed = [e for e in self.endpoints if e[0].available(self.reset_timeout)]
+        return allowed or list(self.endpoints)
+
+    def _delay(self, health: EndpointHealth) -> float:
+        """Délai avant la copie de couverture"""
+        latency = health.percentile(self.percentile)
+        return self.initial_delay if latency is None else latency
+
+    def _config(
+        self, config: Optional[Dict[str, Any]], attempt: int, first_token: Optional[_FirstToken] = None
+    ) -> Optional[Dict[str, Any]]:
+        config = dict(config or {})
+        if attempt:
+            config["tags"] = list(config.get("tags") or []) + [TAG_NOSTREAM]
+            return config
+        # Principal : on écoute son premier token, en plus des callbacks reçus ou
+        # hérités du contexte (flux de messages LangGraph, traces)
+        callbacks = config.get("callbacks")
+        if callbacks is None:
+            callbacks = ensure_config().get("callbacks")
+        if isinstance(callbacks, BaseCallbackManager):
+            callbacks = callbacks.copy()
+            callbacks.add_handler(first_token, inherit=False)
+            config["callbacks"] = callbacks
+        else:
+            config["callbacks"] = list(callbacks or []) + [first_token]
+        return config
+
+    def _settle(self, health: EndpointHealth, started: float, error: Optional[BaseException]) -> None:
+        if error is None:
+            health.record_success(time.perf_counter() - started)
+        elif isinstance(error, asyncio.CancelledError):
+            health.record_cancelled()
+        else:
+            health.record_failure(self.failure_threshold)
+
+    # -- Chemin asynchrone --
+
+    async def _aattempt(
+        self, health: EndpointHealth, model: Runnable, messages: Any, config: Optional[Dict[str, Any]], attempt: int,
+        first_token: _FirstToken,
+    ) -> Any:
+        started = time.perf_counter()
+        try:
+            result = await model.ainvoke(messages, self._config(config, attempt, first_token))
+        except BaseException as e:
+            self._settle(health, started, e)
+            raise
+        self._settle(health, started, None)
+        return result
+
+    async def ainvoke(self, messages: Any, config: Optional[Dict[str, Any]] = None) -> Any:
+        plan = self._plan()
+        _count("requests")
+        pending: Dict["asyncio.Task[Any]", EndpointHealth] = {}
+        launched = 0
+        last_error: Optional[BaseException] = None
+        first_token = _FirstToken()
+        streaming = asyncio.wrap_future(first_token.future)
+
+        def launch() -> "asyncio.Task[Any]":
+            nonlocal launched
+            health, model = plan[launched]
+            task = asyncio.ensure_future(self._aattempt(health, model, messages, config, launched, first_token))
+            pending[task] = health
+            launched += 1
+            return task
+
+        primary = launch()
+        try:
+            while pending:
+                hedging = not streaming.done() and launched < len(plan)
+                timeout = self._delay(plan[launched - 1][0]) if hedging else None
+                waiting = set(pending) if streaming.done() else {*pending, streaming}
+                done, _ = await asyncio.wait(waiting, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if streaming in done:
+                    done.discard(streaming)
+                    # Le principal diffuse déjà : il est gardé, les copies sont annulées
+                    for task in [t for t in pending if t is not primary and t not in done]:
+                        pending.pop(task)
+                        task.cancel()
+                    if not done:
+                        continue
+                if not done:
+                    _count("hedged")
+                    launch()
+                    continue
+                for task in done:
+                    health = pending.pop(task)
+                    if task.exception() is None:
+                        health.record_win()
+                        return task.result()
+                    last_error = task.exception()
+                if not pending and launched < len(plan):
+                    _count("fallbacks")
+                    launch()
+            raise last_error
+        finally:
+            # Les requêtes perdantes sont annulées (la connexion HTTP est abandonnée)
+            for task in pending:
+                task.cancel()
+            streaming.cancel()
+
+    # -- Chemin synchrone --
+
+    def _attempt(
+        self, health: EndpointHealth, model: Runnable, messages: Any, config: Optional[Dict[str, Any]], attempt: int,
+        first_token: _FirstToken,
+    ) -> Any:
+        started = time.perf_counter()
+        try:
+            result = model.invoke(messages, self._config(config, attempt, first_token))
+        except Exception as e:
+            self._settle(health, started, e)
+            raise
+        self._settle(health, started, None)
+        return result
+
+    def invoke(self, messages: Any, config: Optional[Dict[str, Any]] = None) -> Any:
+        plan = self._plan()
+        _count("requests")
+        pending: Dict[Future, EndpointHealth] = {}
+        launched = 0
+        last_error: Optional[BaseException] = None
+        first_token = _FirstToken()
+        streaming = first_token.future
+
+        def launch() -> Future:
+            nonlocal launched
+            health, model = plan[launched]
+            # Le contexte (callbacks LangGraph) suit l'appel dans le thread de l'exécuteur
+            context = contextvars.copy_context()
+            future = _executor.submit(
+                context.run, self._attempt, health, model, messages, config, launched, first_token
+            )
+            pending[future] = health
+            launched += 1
+            return future
+
+        primary = launch()
+        try:
+            while pending:
+                hedging = not streaming.done() and launched < len(plan)
+                timeout = self._delay(plan[launched - 1][0]) if hedging else None
+                waiting = set(pending) if streaming.done() else {*pending, streaming}
+                done, _ = wait(waiting, timeout=timeout, return_when=FIRST_COMPLETED)
+                if streaming in done:
+                    done.discard(streaming)
+                    # Le principal diffuse déjà : il est gardé, les copies sont ignorées
+                    for future in [f for f in pending if f is not primary and f not in done]:
+                        pending.pop(future)
+                        future.cancel()
+                    if not done:
+                        continue
+                if not done:
+                    _count("hedged")
+                    launch()
+                    continue
+                for future in done:
+                    health = pending.pop(future)
+                    if future.exception() is None:
+                        health.record_win()
+                        return future.result()
+                    last_error = future.exception()
+                if not pending and launched < len(plan):
+                    _count("fallbacks")
+                    launch()
+            raise last_error
+        finally:
+            for loser in pending:
+                loser.cancel()
+            streaming.cancel()
+
+
+def hedged_model(settings: Settings, bind_tools: bool = True) -> Any:
+    """Modèle pour ces paramètres : couvert si plusieurs URL sont configurées"""
+    get = model_registry.get if bind_tools else model_registry.get_chat_model
+    urls = configured_base_urls(settings)
+    if len(urls) <= 1:
+        return get(settings.model_copy(update={"base_url": urls[0]}) if urls else settings)
+    endpoints = [(url, get(settings.model_copy(update={"base_url": url}))) for url in urls]
+    return HedgedModel(endpoints, settings)
+
+
+def hedging_stats() -> Dict[str, Any]:
+    with _health_lock:
+        endpoints = dict(_health)
+    with _hedges_lock:
+        counters = dict(_hedges)
+    return {**counters, "endpoints": {url: health.stats() for url, health in endpoints.items()}}
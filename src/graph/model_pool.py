@@ -0,0 +1,192 @@
+"""
+Registre des clients du modèle de langage
+
+Un client ``ChatOpenAI`` déjà lié aux outils est conservé par jeu de paramètres
+effectifs (modèle, température, URL, clé API). Il réutilise un pool de
+connexions HTTP keep-alive et n'est reconstruit que si ces paramètres changent.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Sequence
+
+import httpx
+from langchain_core.runnables import Runnable
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from langchain_openai import ChatOpenAI
+
+from src.core.config import Settings, on_settings_change
+from src.graph.tools import TOOLS
+
+
+class ModelKey(NamedTuple):
+    """Paramètres effectifs identifiant un client du registre"""
+    model_name: str
+    temperature: float
+    base_url: Optional[str]
+    api_key: Optional[str]
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ModelKey":
+        return cls(
+            model_name=settings.model_name,
+            temperature=settings.temperature,
+            base_url=settings.base_url,
+            api_key=settings.api_key,
+        )
+
+
+class _ConnectionCounter:
+    """Compte les requêtes HTTP et les connexions TCP réellement ouvertes"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+
+    def _on_trace(self, event_name: str) -> None:
+        if event_name in ("connection.connect_tcp.complete", "connection.connect_unix_socket.complete"):
+            with self._lock:
+                self.new_connections += 1
+
+    def _on_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    # Hooks httpx (client synchrone)
+    def trace(self, event_name: str, info: dict) -> None:
+        self._on_trace(event_name)
+
+    def request_hook(self, request: httpx.Request) -> None:
+        self._on_request()
+        request.extensions["trace"] = self.trace
+
+    # Hooks httpx (client asynchrone)
+    async def atrace(self, event_name: str, info: dict) -> None:
+        self._on_trace(event_name)
+
+    async def arequest_hook(self, request: httpx.Request) -> None:
+        self._on_request()
+        request.extensions["trace"] = self.atrace
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": max(self.requests - self.new_connections, 0),
+            }
+
+
+class _ModelEntry:
+    """Client du modèle, sa version liée aux outils et ses clients HTTP"""
+
+    def __init__(self, key: ModelKey, tools: Sequence, limits: httpx.Limits) -> None:
+        self.counter = _ConnectionCounter()
+        self.http_client = httpx.Client(
+            limits=limits,
+            event_hooks={"request": [self.counter.request_hook]},
+        )
+        self.http_async_client = httpx.AsyncClient(
+            limits=limits,
+            event_hooks={"request": [self.counter.arequest_hook]},
+        )
+        self.chat_model = ChatOpenAI(
+            model=key.model_name,
+            temperature=key.temperature,
+            api_key=key.api_key,
+            base_url=key.base_url,
+            http_client=self.http_client,
+            http_async_client=self.http_async_client,
+        )
+        self.bound_model = self.chat_model.bind_tools(list(tools))
+
+    def close(self) -> None:
+        self.http_client.close()
+        # Le client asynchrone est fermé par le ramasse-miettes : on ne peut
+        # pas attendre ``aclose`` depuis un contexte potentiellement synchrone.
+
+
+class ModelRegistry:
+    """Registre process-wide des clients du modèle, indexé par paramètres"""
+
+    def __init__(self, tools: Sequence, max_entries: int = 8) -> None:
+        # Schémas calculés une seule fois : sérialisation identique à chaque requête
+        self.tool_schemas = [convert_to_openai_tool(tool) for tool in tools]
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[ModelKey, _ModelEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._retired: Dict[str, int] = {"requests": 0, "new_connections": 0, "reused_connections": 0}
+
+    def _entry(self, settings: Settings) -> _ModelEntry:
+        key = ModelKey.from_settings(settings)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._hits += 1
+                self._entries.move_to_end(key)
+                return entry
+
+            self._misses += 1
+            limits = httpx.Limits(
+                max_connections=settings.model_pool_max_connections,
+                max_keepalive_connections=settings.model_pool_max_keepalive,
+                keepalive_expiry=settings.model_pool_keepalive_expiry,
+            )
+            entry = _ModelEntry(key, self.tool_schemas, limits)
+            self._entries[key] = entry
+            while len(self._entries) > self._max_entries:
+                _, old = self._entries.popitem(last=False)
+                self._retire(old)
+            return entry
+
+    def _retire(self, entry: _ModelEntry) -> None:
+        for name, value in entry.counter.snapshot().items():
+            self._retired[name] += value
+        entry.close()
+
+    def get(self, settings: Settings) -> Runnable:
+        """Retourne le modèle lié aux outils pour ces paramètres"""
+        return self._entry(settings).bound_model
+
+    def get_chat_model(self, settings: Settings) -> ChatOpenAI:
+        """Retourne le modèle sans outils (même pool de connexions)"""
+        return self._entry(settings).chat_model
+
+    def clear(self) -> None:
+        """Ferme tous les clients ; ils seront reconstruits à la demande"""
+        with self._lock:
+            while self._entries:
+                _, entry = self._entries.popitem(last=False)
+                self._retire(entry)
+
+    def stats(self) -> Dict[str, int]:
+        """Compteurs de cache et de réutilisation des connexions"""
+        with self._lock:
+            totals = dict(self._retired)
+            for entry in self._entries.values():
+                for name, value in entry.counter.snapshot().items():
+                    totals[name] += value
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                **totals,
+            }
+
+
+# Instance globale du registre
+model_registry = ModelRegistry(TOOLS)
+
+
+def _on_settings_change(old: Settings, new: Settings) -> None:
+    """Ferme les clients quand le modèle ou le pool de connexions change"""
+    pool_fields = ("model_pool_max_connections", "model_pool_max_keepalive", "model_pool_keepalive_expiry")
+    if ModelKey.from_settings(old) != ModelKey.from_settings(new) or any(
+        getattr(old, name) != getattr(new, name) for name in pool_fields
+    ):
+        model_registry.clear()
+
+
+on_settings_change(_on_settings_change)
@@ -0,0 +1,150 @@
+"""
+Choix du modèle par étape : modèle rapide ou modèle principal
+
+Les étapes qui ne font que reformuler un résultat d'outil de consultation ou
+répondre à une formule de politesse partent vers FAST_MODEL_NAME ; celles qui
+doivent planifier des appels d'outils (nouvelle demande, résultat intermédiaire
+d'une réservation, erreur d'outil) restent sur MODEL_NAME. Le choix repose
+uniquement sur des indices bon marché de ChatState (les outils renvoient leurs
+erreurs dans le contenu JSON, relu ici).
+"""
+import json
+import re
+import threading
+from collections import deque
+from typing import Any, Deque, Dict
+
+from langchain_core.messages import HumanMessage, ToolMessage
+
+from src.core.config import Settings
+
+FAST, STRONG = "fast", "strong"
+
+# Outils dont le résultat se reformule simplement (aucun appel de suite attendu)
+LOOKUP_TOOLS = {
+    "calc",
+    "now",
+    "create_event",
+    "book_visit",
+    "get_agent_info",
+    "list_agents",
+    "find_agent_by_speciality",
+    "get_agent_availability_summary",
+    "get_property_info",
+    "list_properties",
+    "get_properties_by_agent",
+    "get_property_summary",
+    "get_properties_info",
+    "get_property_summaries",
+    "get_agents_info",
+    "get_properties_by_agents",
+}
+
+# Statut attendu dans le résultat : tout autre (conflit, client invalide...) demande de replanifier
+EXPECTED_STATUS = {
+    "book_visit": "booked",
+}
+
+_SMALL_TALK = re.compile(
+    r"^\s*(bonjour|bonsoir|salut|hello|coucou|merci( beaucoup)?|ok|d'accord|parfait|super|"
+    r"au revoir|bonne (journée|soirée)|à bientôt)\s*[.!]*\s*$",
+    re.IGNORECASE,
+)
+
+
+def _pending_tool_results(state: dict) -> list:
+    """ToolMessage qui suivent le dernier AIMessage"""
+    results = []
+    for message in reversed(state["messages"]):
+        if not isinstance(message, ToolMessage):
+            break
+        results.append(message)
+    return results
+
+
+def _failed(result: ToolMessage) -> bool:
+    """
+    Erreur d'outil : statut error, erreur renvoyée dans le contenu JSON
+    ({"error": ...}) ou statut différent de celui attendu (EXPECTED_STATUS)
+    """
+    if result.status == "error":
+        return True
+    content = result.content
+    if not isinstance(content, str) or not content.lstrip().startswith("{"):
+        return False
+    try:
+        payload = json.loads(content)
+    except ValueError:
+        return False
+    if not isinstance(payload, dict):
+        return False
+    expected = EXPECTED_STATUS.get(result.name)
+    return "error" in payload or (expected is not None and payload.get("status") != expected)
+
+
+def choose_route(state: dict) -> str:
+    """FAST pour une reformulation ou une politesse, STRONG sinon"""
+    messages = state["messages"]
+    if not messages:
+        return STRONG
+    last = messages[-1]
+    if isinstance(last, ToolMessage):
+        results = _pending_tool_results(state)
+        if all(r.name in LOOKUP_TOOLS and not _failed(r) for r in results):
+            return FAST
+        return STRONG
+    if isinstance(last, HumanMessage) and isinstance(last.content, str) and _SMALL_TALK.match(last.content):
+        return FAST
+    return STRONG
+
+
+def route_settings(settings: Settings, route: str) -> Settings:
+    """Paramètres du modèle pour cette route"""
+    if route == FAST and settings.fast_model_name:
+        return settings.model_copy(update={"model_name": settings.fast_model_name})
+    return settings
+
+
+class RoutingStats:
+    """Appels, latences et tokens par route"""
+
+    def __init__(self, window: int = 500) -> None:
+        self._lock = threading.Lock()
+        self._window = window
+        self._routes: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, route: str, model_name: str, latency: float, response: Any) -> None:
+        usage = getattr(response, "usage_metadata", None) or {}
+        with self._lock:
+            entry = self._routes.setdefault(
+                route,
+                {"calls": 0, "input_tokens": 0, "output_tokens": 0, "latencies": deque(maxlen=self._window), "models": {}},
+            )
+            entry["calls"] += 1
+            entry["input_tokens"] += usage.get("input_tokens", 0)
+            entry["output_tokens"] += usage.get("output_tokens", 0)
+            entry["latencies"].append(latency * 1000)
+            entry["models"][model_name] = entry["models"].get(model_name, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            result = {}
+            for route, entry in self._routes.items():
+                latencies: Deque[float] = entry["latencies"]
+                ordered = sorted(latencies)
+                calls = entry["calls"]
+                result[route] = {
+                    "calls": calls,
+                    "models": dict(entry["models"]),
+                    "avg_latency_ms": round(sum(ordered) / len(ordered), 1) if ordered else 0.0,
+                    "p95_latency_ms": round(ordered[int(0.95 * (len(ordered) - 1))], 1) if ordered else 0.0,
+                    "input_tokens": entry["input_tokens"],
+                    "output_tokens": entry["output_tokens"],
+                    "avg_output_tokens": round(entry["output_tokens"] / calls, 1) if calls else 0.0,
+                }
+            return result
+
+
+# Instance globale des statistiques de routage
+routing_stats = RoutingStats()
+
@@ -0,0 +1,103 @@
+"""
+Arguments typés des outils
+
+Les outils qui prenaient une chaîne JSON (critères de recherche, données
+client, participants) exposent désormais un schéma structuré : le modèle émet
+un objet JSON au lieu d'un JSON échappé dans une chaîne. Pour la
+compatibilité, une chaîne JSON est encore acceptée et décodée avant validation.
+"""
+import json
+from typing import Annotated, Any, List, Optional
+
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field, model_validator
+
+
+def _from_json_string(value: Any) -> Any:
+    """Décode l'ancienne forme « JSON dans une chaîne », laisse le reste intact"""
+    if isinstance(value, str):
+        text = value.strip()
+        if not text:
+            return None
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            # La validation pydantic signalera l'erreur avec le bon champ
+            return value
+    return value
+
+
+def _compact_schema(schema: dict) -> None:
+    """Retire des propriétés les titres et défauts, inutiles au modèle"""
+    for prop in schema.get("properties", {}).values():
+        prop.pop("title", None)
+        prop.pop("default", None)
+
+
+class _ToolArgs(BaseModel):
+    """Base des arguments structurés : un ``null`` explicite vaut un champ absent"""
+
+    # Les champs sont déclarés ``str = None`` (et non Optional[str]) : le schéma
+    # envoyé au modèle reste plus court, sans alternative « null »
+    model_config = ConfigDict(json_schema_extra=_compact_schema)
+
+    @model_validator(mode="before")
+    @classmethod
+    def _drop_nulls(cls, data: Any) -> Any:
+        if data is None:
+            return {}
+        if isinstance(data, dict):
+            return {k: v for k, v in data.items() if v is not None}
+        return data
+
+
+class PropertyCriteria(_ToolArgs):
+    """Critères de recherche de propriétés"""
+
+    type: str = Field(None, description="Appartement, Maison, Bureau, etc.")
+    min_price: float = None
+    max_price: float = None
+    min_surface: float = None
+    max_surface: float = None
+    min_bedrooms: int = None
+    location: str = None
+    agent_id: str = None
+
+
+class ClientPreferences(_ToolArgs):
+    """Préférences d'un client pour la recherche de biens ou d'agent"""
+
+    property_type: str = None
+    budget_range: str = Field(None, description="accessible, moyen, luxe")
+    location_preference: str = None
+
+
+class ClientData(_ToolArgs):
+    """Données d'un client à valider"""
+
+    name: str = None
+    email: str = None
+    phone: str = None
+    preferred_agent: str = None
+    property_type: str = None
+    budget_range: str = None
+    location_preference: str = None
+    notes: str = None
+
+
+class Attendee(_ToolArgs):
+    """Participant à un rendez-vous"""
+
+    name: str = None
+    email: str = None
+
+
+# Types d'arguments : objet structuré, ou ancienne forme chaîne JSON
+CriteriaArg = Annotated[PropertyCriteria, BeforeValidator(_from_json_string)]
+ClientDataArg = Annotated[ClientData, BeforeValidator(_from_json_string)]
+PreferencesArg = Annotated[ClientPreferences, BeforeValidator(_from_json_string)]
+AttendeesArg = Annotated[Optional[List[Attendee]], BeforeValidator(_from_json_string)]
+
+
+def as_dict(model: Optional[BaseModel]) -> dict:
+    """Dictionnaire attendu par les fonctions de tools/ (champs absents omis)"""
+    return model.model_dump(exclude_none=True) if model is not None else {}
@@ -0,0 +1,147 @@
+"""
+Cache des résultats des outils déterministes
+
+Les wrappers ``@lc_tool`` qui renvoient toujours le même JSON pour les mêmes
+arguments peuvent être décorés avec ``cached_tool`` : la chaîne sérialisée est
+mise en cache (TTL par outil, taille bornée en LRU) et le cache est vidé quand
+un des stores de données dont dépend l'outil est modifié.
+"""
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from tools import on_store_change
+
+
+class ToolResultCache:
+    """Cache LRU à expiration pour les résultats d'un outil"""
+
+    def __init__(self, name: str, ttl: float, maxsize: int = 128) -> None:
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.generation = 0  # incrémenté à chaque invalidation (clear)
+
+    def get(self, key: Hashable) -> Optional[str]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key: Hashable, value: str, generation: Optional[int] = None) -> None:
+        """Ajoute une entrée ; ignorée si le cache a été invalidé depuis ``generation``"""
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.invalidations += 1
+            self.generation += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+
+# Caches déclarés, par nom d'outil
+TOOL_CACHES: Dict[str, ToolResultCache] = {}
+
+
+def _normalize(value: Any, casefold: bool) -> Hashable:
+    """Normalise un argument pour construire la clé de cache"""
+    if isinstance(value, str):
+        value = value.strip()
+        return value.casefold() if casefold else value
+    if isinstance(value, dict):
+        return tuple(sorted((k, _normalize(v, casefold)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize(v, casefold) for v in value)
+    return value
+
+
+def cached_tool(
+    ttl: float,
+    maxsize: int = 128,
+    stores: Iterable[str] = (),
+    casefold: Iterable[str] = (),
+    variant: Optional[Callable[[str], Hashable]] = None,
+) -> Callable:
+    """
+    Décore la fonction d'un outil pour mettre en cache son résultat sérialisé.
+
+    Args:
+        ttl: Durée de vie d'une entrée (secondes)
+        maxsize: Nombre maximal d'entrées (éviction LRU)
+        stores: Stores de données dont dépend l'outil (invalidation)
+        casefold: Arguments insensibles à la casse
+        variant: Appelé avec le nom de l'outil, sa valeur entre dans la clé
+            (ex: mode d'encodage du résultat)
+    """
+    casefold = frozenset(casefold)
+
+    def decorator(func: Callable[..., str]) -> Callable[..., str]:
+        cache = ToolResultCache(func.__name__, ttl=ttl, maxsize=maxsize)
+        TOOL_CACHES[func.__name__] = cache
+        for store in stores:
+            on_store_change(store, cache.clear)
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs) -> str:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = tuple(
+                (name, _normalize(value, name in casefold))
+                for name, value in bound.arguments.items()
+            )
+            if variant is not None:
+                key = (variant(func.__name__),) + key
+            result = cache.get(key)
+            if result is None:
+                # Store modifié pendant l'appel : résultat peut-être périmé, non gardé
+                generation = cache.generation
+                result = func(*args, **kwargs)
+                cache.set(key, result, generation)
+            return result
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+def tool_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Statistiques de tous les caches d'outils"""
+    return {name: cache.stats() for name, cache in TOOL_CACHES.items()}
+
+
+def clear_tool_caches() -> None:
+    """Vide tous les caches d'outils"""
+    for cache in TOOL_CACHES.values():
+        cache.clear()
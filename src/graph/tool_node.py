@@ -0,0 +1,319 @@
+"""
+Nœud d'exécution parallèle des appels d'outils
+
+Quand le modèle émet plusieurs ``tool_calls`` dans un même AIMessage, ils sont
+exécutés en parallèle (pool de workers borné, plafond de concurrence par outil)
+et les ToolMessage sont renvoyés dans l'ordre des appels. Chaque ToolMessage
+porte son chronométrage dans ``response_metadata["tool_timing"]``.
+
+Chaque outil a une échéance (attente comprise). Un appel qui la dépasse est
+annulé sur le chemin asynchrone ; sur le chemin synchrone, un appel encore en
+attente n'est jamais exécuté, un appel déjà démarré (ou un outil synchrone
+exécuté dans un thread) est abandonné et termine en arrière-plan.
+Le modèle reçoit un ToolMessage d'erreur structuré (``"error": "timeout"``).
+"""
+import asyncio
+import contextvars
+import json
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from langchain_core.messages import AIMessage, ToolCall, ToolMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langchain_core.tools import BaseTool
+
+
+class ToolExecutionStats:
+    """Exécutions terminées, erreurs, dépassements d'échéance et durées par outil"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._tools: Dict[str, Dict[str, float]] = {}
+        # Appels abandonnés (chemin synchrone) encore en cours dans un thread
+        self.abandoned_running = 0
+
+    def _entry(self, tool_name: str) -> Dict[str, float]:
+        return self._tools.setdefault(tool_name, {"calls": 0, "errors": 0, "timeouts": 0, "total_ms": 0.0})
+
+    def record(self, tool_name: str, message: ToolMessage, duration: float) -> None:
+        with self._lock:
+            entry = self._entry(tool_name)
+            entry["calls"] += 1
+            entry["total_ms"] += duration * 1000
+            if message.status == "error":
+                entry["errors"] += 1
+
+    def record_timeout(self, tool_name: str) -> None:
+        # Un appel abandonné qui finit plus tard est aussi compté dans "calls"
+        with self._lock:
+            self._entry(tool_name)["timeouts"] += 1
+
+    def abandoned(self, delta: int) -> None:
+        with self._lock:
+            self.abandoned_running += delta
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            tools = {}
+            for tool_name, entry in self._tools.items():
+                calls = entry["calls"]
+                tools[tool_name] = {
+                    "calls": int(calls),
+                    "errors": int(entry["errors"]),
+                    "timeouts": int(entry["timeouts"]),
+                    "avg_ms": round(entry["total_ms"] / calls, 2) if calls else 0.0,
+                }
+            return {"abandoned_running": self.abandoned_running, "tools": tools}
+
+
+# Instance globale, partagée par les nœuds d'outils du processus
+tool_stats = ToolExecutionStats()
+
+
+class _CallClaim:
+    """
+    Décide une seule fois, sous verrou, entre démarrage et abandon d'un appel à
+    échéance (chemin synchrone) : un appel abandonné en attente ne démarre jamais.
+    """
+
+    def __init__(self, deadline: float) -> None:
+        self.deadline = deadline
+        self._lock = threading.Lock()
+        self._state: Optional[str] = None
+
+    def _claim(self, state: str) -> bool:
+        with self._lock:
+            if self._state is None:
+                self._state = state
+            return self._state == state
+
+    def start(self) -> bool:
+        """True si l'appel peut démarrer (pas encore abandonné)"""
+        return self._claim("started")
+
+    def abandon(self) -> bool:
+        """True si l'appel n'avait pas démarré : il ne démarrera plus"""
+        return self._claim("abandoned")
+
+
+class ParallelToolNode:
+    """Exécute les appels d'outils du dernier AIMessage en parallèle"""
+
+    def __init__(
+        self,
+        tools: Sequence[BaseTool],
+        max_workers: int = 8,
+        concurrency_limits: Optional[Mapping[str, int]] = None,
+        timeouts: Optional[Mapping[str, float]] = None,
+        name: str = "tools",
+    ) -> None:
+        self.name = name
+        self.tools_by_name: Dict[str, BaseTool] = {t.name: t for t in tools}
+        self.max_workers = max(1, max_workers)
+        self.concurrency_limits = {k: v for k, v in (concurrency_limits or {}).items() if v and v > 0}
+        self._thread_limits = {
+            tool_name: threading.BoundedSemaphore(limit)
+            for tool_name, limit in self.concurrency_limits.items()
+        }
+        # Échéance par outil (secondes), "*" pour les autres ; 0 ou absent = aucune
+        self.timeouts = dict(timeouts or {})
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._deadline_executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        # Les sémaphores asyncio sont liés à une boucle : un jeu par boucle
+        self._loop_limits: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    # --- Entrées du nœud ---
+    def as_runnable(self) -> RunnableLambda:
+        """Runnable exposant les chemins synchrone et asynchrone"""
+        return RunnableLambda(self.invoke, afunc=self.ainvoke, name=self.name)
+
+    def invoke(self, state: Dict[str, Any], config: RunnableConfig) -> dict:
+        calls = self._tool_calls(state)
+        if len(calls) == 1:
+            return {"messages": [self._run_call(calls[0], config)]}
+        # executor.map conserve l'ordre des appels
+        results = list(self._get_executor().map(lambda call: self._run_call(call, config), calls))
+        return {"messages": results}
+
+    async def ainvoke(self, state: Dict[str, Any], config: RunnableConfig) -> dict:
+        calls = self._tool_calls(state)
+        limits = self._async_limits()
+        results = await asyncio.gather(*(self._arun_call(call, config, limits) for call in calls))
+        return {"messages": list(results)}
+
+    # --- Exécution d'un appel ---
+    def timeout_for(self, tool_name: str) -> Optional[float]:
+        """Échéance de l'outil en secondes, None si aucune"""
+        timeout = self.timeouts.get(tool_name, self.timeouts.get("*"))
+        return timeout if timeout and timeout > 0 else None
+
+    def _run_call(self, call: ToolCall, config: RunnableConfig) -> ToolMessage:
+        queued = time.perf_counter()
+        timeout = self.timeout_for(call["name"])
+        if timeout is None:
+            return self._run_limited(call, config, queued)
+        # L'appel tourne dans un thread dédié pour pouvoir l'abandonner à l'échéance
+        claim = _CallClaim(deadline=queued + timeout)
+        context = contextvars.copy_context()
+        future = self._get_deadline_executor().submit(context.run, self._run_limited, call, config, queued, claim)
+        try:
+            message = future.result(timeout)
+            if message is not None:
+                return message
+        except FutureTimeoutError:
+            # Un appel encore en attente (pool ou plafond de l'outil) ne s'exécutera jamais
+            if not future.cancel() and not claim.abandon():
+                tool_stats.abandoned(1)
+                future.add_done_callback(lambda _: tool_stats.abandoned(-1))
+        return self._timeout_message(call, timeout, queued)
+
+    def _run_limited(
+        self, call: ToolCall, config: RunnableConfig, queued: float, claim: Optional["_CallClaim"] = None
+    ) -> Optional[ToolMessage]:
+        limit = self._thread_limits.get(call["name"])
+        if limit is not None:
+            if claim is None:
+                limit.acquire()
+            elif not limit.acquire(timeout=max(0.0, claim.deadline - time.perf_counter())):
+                return None  # échéance atteinte en attendant le plafond : jamais exécuté
+        try:
+            if claim is not None and not claim.start():
+                return None  # abandonné par l'appelant avant de démarrer
+            started = time.perf_counter()
+            message = self._invoke_tool(call, config)
+        finally:
+            if limit is not None:
+                limit.release()
+        tool_stats.record(call["name"], message, time.perf_counter() - started)
+        return self._with_timing(message, queued, started)
+
+    async def _arun_call(
+        self, call: ToolCall, config: RunnableConfig, limits: Dict[str, asyncio.Semaphore]
+    ) -> ToolMessage:
+        queued = time.perf_counter()
+        timeout = self.timeout_for(call["name"])
+        if timeout is None:
+            return await self._arun_limited(call, config, limits, queued)
+        try:
+            # wait_for annule l'appel ; un outil synchrone continue dans son thread
+            return await asyncio.wait_for(self._arun_limited(call, config, limits, queued), timeout)
+        except asyncio.TimeoutError:
+            return self._timeout_message(call, timeout, queued)
+
+    async def _arun_limited(
+        self, call: ToolCall, config: RunnableConfig, limits: Dict[str, asyncio.Semaphore], queued: float
+    ) -> ToolMessage:
+        async with limits["*"]:
+            tool_limit = limits.get(call["name"])
+            if tool_limit is None:
+                started = time.perf_counter()
+                message = await self._ainvoke_tool(call, config)
+            else:
+                async with tool_limit:
+                    started = time.perf_counter()
+                    message = await self._ainvoke_tool(call, config)
+        tool_stats.record(call["name"], message, time.perf_counter() - started)
+        return self._with_timing(message, queued, started)
+
+    def _invoke_tool(self, call: ToolCall, config: RunnableConfig) -> ToolMessage:
+        tool = self.tools_by_name.get(call["name"])
+        if tool is None:
+            return self._error_message(call, f"Outil inconnu: {call['name']}")
+        try:
+            return self._as_tool_message(call, tool.invoke({**call, "type": "tool_call"}, config))
+        except Exception as e:
+            return self._error_message(call, repr(e))
+
+    async def _ainvoke_tool(self, call: ToolCall, config: RunnableConfig) -> ToolMessage:
+        tool = self.tools_by_name.get(call["name"])
+        if tool is None:
+            return self._error_message(call, f"Outil inconnu: {call['name']}")
+        try:
+            return self._as_tool_message(call, await tool.ainvoke({**call, "type": "tool_call"}, config))
+        except Exception as e:
+            return self._error_message(call, repr(e))
+
+    # --- Utilitaires ---
+    @staticmethod
+    def _tool_calls(state: Dict[str, Any]) -> List[ToolCall]:
+        messages = state["messages"] if isinstance(state, dict) else state
+        for message in reversed(messages):
+            if isinstance(message, AIMessage):
+                return list(message.tool_calls)
+        raise ValueError("Aucun AIMessage trouvé dans l'état pour exécuter des outils")
+
+    @staticmethod
+    def _as_tool_message(call: ToolCall, output: Any) -> ToolMessage:
+        if isinstance(output, ToolMessage):
+            return output
+        return ToolMessage(content=str(output), name=call["name"], tool_call_id=call["id"])
+
+    @staticmethod
+    def _error_message(call: ToolCall, error: str) -> ToolMessage:
+        return ToolMessage(
+            content=f"Error: {error}\n Please fix your mistakes.",
+            name=call["name"],
+            tool_call_id=call["id"],
+            status="error",
+        )
+
+    @staticmethod
+    def _timeout_message(call: ToolCall, timeout: float, queued: float) -> ToolMessage:
+        tool_stats.record_timeout(call["name"])
+        content = json.dumps({
+            "error": "timeout",
+            "tool": call["name"],
+            "timeout_s": timeout,
+            "message": (
+                f"L'outil {call['name']} n'a pas répondu en {timeout:g} s. Son résultat est inconnu : "
+                "informez le client, puis réessayez ou proposez une alternative."
+            ),
+        }, ensure_ascii=False)
+        message = ToolMessage(content=content, name=call["name"], tool_call_id=call["id"], status="error")
+        elapsed_ms = round((time.perf_counter() - queued) * 1000, 3)
+        message.response_metadata = {"tool_timing": {"wait_ms": 0.0, "duration_ms": elapsed_ms, "timed_out": True}}
+        return message
+
+    @staticmethod
+    def _with_timing(message: ToolMessage, queued: float, started: float) -> ToolMessage:
+        finished = time.perf_counter()
+        message.response_metadata = {
+            **(message.response_metadata or {}),
+            "tool_timing": {
+                "wait_ms": round((started - queued) * 1000, 3),
+                "duration_ms": round((finished - started) * 1000, 3),
+            },
+        }
+        return message
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=f"{self.name}-worker"
+                )
+            return self._executor
+
+    def _get_deadline_executor(self) -> ThreadPoolExecutor:
+        """Threads des appels à échéance (un appel abandonné y termine en arrière-plan)"""
+        with self._executor_lock:
+            if self._deadline_executor is None:
+                self._deadline_executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers * 2, thread_name_prefix=f"{self.name}-deadline"
+                )
+            return self._deadline_executor
+
+    def _async_limits(self) -> Dict[str, asyncio.Semaphore]:
+        loop = asyncio.get_running_loop()
+        limits = self._loop_limits.get(loop)
+        if limits is None:
+            limits = {"*": asyncio.Semaphore(self.max_workers)}
+            limits.update({k: asyncio.Semaphore(v) for k, v in self.concurrency_limits.items()})
+            self._loop_limits[loop] = limits
+        return limits
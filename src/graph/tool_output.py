@@ -0,0 +1,97 @@
+"""
+Encodage des résultats d'outils lus par le modèle
+
+Deux modes, choisis par outil :
+  - ``full`` : JSON complet, tel que renvoyé par tools/ ;
+  - ``compact`` : séparateurs serrés, champs ``null`` retirés, champs identiques
+    dans tous les éléments d'une liste regroupés une seule fois sous ``common``
+    (``{"common": {...}, "items": [...]}``). Les créneaux de check_availability
+    sont réduits aux créneaux libres, groupés par jour.
+
+``expand`` redonne la forme liste d'un résultat compact pour le code qui relit
+les résultats (réponses directes).
+"""
+import json
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+FULL, COMPACT = "full", "compact"
+MODES = (FULL, COMPACT)
+
+
+def drop_nulls(data: Any) -> Any:
+    """Retire récursivement les clés dont la valeur est None"""
+    if isinstance(data, dict):
+        return {k: drop_nulls(v) for k, v in data.items() if v is not None}
+    if isinstance(data, list):
+        return [drop_nulls(v) for v in data]
+    return data
+
+
+def hoist_common(records: List[Any]) -> Any:
+    """Regroupe sous ``common`` les champs de même valeur dans tous les éléments"""
+    if len(records) < 2 or not all(isinstance(r, dict) for r in records):
+        return records
+    first, rest = records[0], records[1:]
+    common = {k: v for k, v in first.items() if all(k in r and r[k] == v for r in rest)}
+    if not common:
+        return records
+    return {"common": common, "items": [{k: v for k, v in r.items() if k not in common} for r in records]}
+
+
+def expand(data: Any) -> Any:
+    """Forme liste d'un résultat regroupé par ``hoist_common`` (inchangé sinon)"""
+    if isinstance(data, dict) and set(data) == {"common", "items"}:
+        return [{**data["common"], **item} for item in data["items"]]
+    return data
+
+
+def compact_slots(slots: List[Dict[str, Any]]) -> Any:
+    """Créneaux libres seulement, heures de début groupées par jour"""
+    if not slots:
+        return []
+    free = [s for s in slots if s.get("is_available")]
+    days: "OrderedDict[str, List[str]]" = OrderedDict()
+    for slot in free:
+        start = datetime.fromisoformat(slot["start_iso"])
+        days.setdefault(start.date().isoformat(), []).append(start.strftime("%H:%M"))
+    # Champs constants (agent, fuseau, durée, source...) une seule fois ; ceux
+    # qui varient d'un créneau libre à l'autre sont omis
+    rows = [{k: v for k, v in s.items() if k not in ("start_iso", "end_iso", "is_available", "reason")} for s in free]
+    hoisted = hoist_common(rows)
+    if len(rows) == 1:
+        common = rows[0]
+    else:
+        common = hoisted["common"] if isinstance(hoisted, dict) else {}
+    return {**drop_nulls(common), "free": days, "busy_count": len(slots) - len(free)}
+
+
+# Encodages compacts propres à un outil (les autres : drop_nulls + hoist_common)
+COMPACTORS: Dict[str, Callable[[Any], Any]] = {
+    "check_availability": compact_slots,
+}
+
+
+def _compact(tool_name: str, data: Any) -> Any:
+    compactor = COMPACTORS.get(tool_name)
+    if compactor is not None:
+        return compactor(data)
+    data = drop_nulls(data)
+    return hoist_common(data) if isinstance(data, list) else data
+
+
+def encode(tool_name: str, data: Any, mode: str = FULL) -> str:
+    """Sérialise le résultat d'un outil dans le mode demandé"""
+    if mode == COMPACT:
+        return json.dumps(_compact(tool_name, data), ensure_ascii=False, separators=(",", ":"), default=str)
+    return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def resolve_mode(tool_name: str, overrides: Dict[str, str], defaults: Dict[str, str]) -> str:
+    """Mode d'un outil : réglage explicite, puis ``*`` des réglages, puis défaut du code"""
+    for source, key in ((overrides, tool_name), (overrides, "*"), (defaults, tool_name)):
+        mode = source.get(key)
+        if mode in MODES:
+            return mode
+    return FULL
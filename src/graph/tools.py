@@ -2,13 +2,18 @@
 Outils LangGraph pour le chatbot immobilier
 """
 import json
-from langchain_core.tools import tool as lc_tool
+from typing import List
+
+from langchain_core.tools import BaseTool, tool as lc_tool
 
 from tools import (
     calculate_expression, 
     get_current_time, 
     check_availability as check_availability_tool, 
     create_event_sync as create_event_tool,
+    create_event as acreate_event_tool,
+    book_visit as book_visit_tool,
+    abook_visit as abook_visit_tool,
     get_agent_info as get_agent_info_tool,
     list_agents as list_agents_tool,
     find_agent_by_speciality as find_agent_by_speciality_tool,
@@ -22,8 +27,52 @@ from tools import (
     search_properties_by_criteria as search_properties_by_criteria_tool,
     get_properties_by_agent as get_properties_by_agent_tool,
     get_property_summary as get_property_summary_tool,
-    suggest_properties_for_client as suggest_properties_for_client_tool
+    suggest_properties_for_client as suggest_properties_for_client_tool,
+    get_properties_info as get_properties_info_tool,
+    get_property_summaries as get_property_summaries_tool,
+    get_agents_info as get_agents_info_tool,
+    get_properties_by_agents as get_properties_by_agents_tool,
+    AGENTS_STORE,
+    PROPERTIES_STORE,
+    EVENTS_STORE,
 )
+from src.core.config import get_settings
+from src.graph.tool_args import AttendeesArg, ClientDataArg, CriteriaArg, PreferencesArg, as_dict
+from src.graph.tool_cache import cached_tool
+from src.graph.tool_output import COMPACT, encode, resolve_mode
+
+
+# Encodage des résultats lus par le modèle ("full" ou "compact", voir tool_output).
+# Surchargeable via TOOL_OUTPUT_MODES (ex: "*:full" ou "check_availability:full").
+TOOL_OUTPUT_MODES = {
+    "check_availability": COMPACT,
+    "get_agent_info": COMPACT,
+    "list_agents": COMPACT,
+    "find_agent_by_speciality": COMPACT,
+    "get_property_info": COMPACT,
+    "list_properties": COMPACT,
+    "search_properties_by_criteria": COMPACT,
+    "get_properties_by_agent": COMPACT,
+    "suggest_properties_for_client": COMPACT,
+}
+
+
+def output_mode(tool_name: str) -> str:
+    """Mode d'encodage courant d'un outil"""
+    return resolve_mode(tool_name, get_settings().tool_output_modes, TOOL_OUTPUT_MODES)
+
+
+def _dump(tool_name: str, data) -> str:
+    return encode(tool_name, data, output_mode(tool_name))
+
+
+def _with_coroutine(sync_tool: BaseTool, coroutine) -> BaseTool:
+    """
+    Ajoute une implémentation asynchrone native à un outil @lc_tool.
+    Le chemin async du graphe l'attend directement, sans passer par un thread ;
+    le chemin sync (CLI) garde la fonction d'origine.
+    """
+    return sync_tool.model_copy(update={"coroutine": coroutine})
 
 
 @lc_tool
@@ -33,17 +82,26 @@ def calc(expression: str) -> str:
 
 
 @lc_tool
+@cached_tool(ttl=60, maxsize=256, stores=(AGENTS_STORE, EVENTS_STORE), casefold=("window",), variant=output_mode)
 def check_availability(agent_id: str, window: str) -> str:
     """
     Retourne un JSON stringifié de slots triés (is_available True/False).
     Exemple d'entrée: "today", "tomorrow afternoon", "next 7 days", "2025-08-12 morning"
     """
     data = check_availability_tool(agent_id, window)
-    return json.dumps(data, ensure_ascii=False)
+    return _dump("check_availability", data)
+
+
+async def _acheck_availability(agent_id: str, window: str) -> str:
+    # Calcul en mémoire (et souvent en cache) : plus rapide sur la boucle qu'avec un saut de thread
+    return check_availability.func(agent_id, window)
+
+
+check_availability = _with_coroutine(check_availability, _acheck_availability)
 
 
 @lc_tool
-def create_event(agent_id: str, start: str, end: str, title: str, attendees: str = None, location: str = None, description: str = None) -> str:
+def create_event(agent_id: str, start: str, end: str, title: str, attendees: AttendeesArg = None, location: str = None, description: str = None) -> str:
     """
     Crée un événement de rendez-vous immobilier.
     
@@ -52,7 +110,7 @@ def create_event(agent_id: str, start: str, end: str, title: str, attendees: str
         start: Date/heure de début (format ISO: "2025-01-15T14:00:00")
         end: Date/heure de fin (format ISO: "2025-01-15T15:00:00")
         title: Titre du rendez-vous
-        attendees: JSON string des participants [{"name": "John Doe", "email": "john@example.com"}]
+        attendees: Participants [{"name": "John Doe", "email": "john@example.com"}]
         location: Adresse du bien à visiter
         description: Description du rendez-vous
     
@@ -60,9 +118,7 @@ def create_event(agent_id: str, start: str, end: str, title: str, attendees: str
         JSON string avec les détails de l'événement créé
     """
     try:
-        attendees_list = None
-        if attendees:
-            attendees_list = json.loads(attendees)
+        attendees_list = [as_dict(a) for a in attendees] if attendees else None
         
         data = create_event_tool(
             agent_id=agent_id,
@@ -73,12 +129,107 @@ def create_event(agent_id: str, start: str, end: str, title: str, attendees: str
             location=location,
             description=description
         )
-        return json.dumps(data, ensure_ascii=False, default=str)
+        return _dump("create_event", data)
     except Exception as e:
         return json.dumps({"error": str(e)}, ensure_ascii=False)
 
 
+async def _acreate_event(agent_id: str, start: str, end: str, title: str, attendees: AttendeesArg = None, location: str = None, description: str = None) -> str:
+    try:
+        data = await acreate_event_tool(
+            agent_id=agent_id,
+            start=start,
+            end=end,
+            title=title,
+            attendees=[as_dict(a) for a in attendees] if attendees else None,
+            location=location,
+            description=description
+        )
+        return _dump("create_event", data)
+    except Exception as e:
+        return json.dumps({"error": str(e)}, ensure_ascii=False)
+
+
+create_event = _with_coroutine(create_event, _acreate_event)
+
+
 @lc_tool
+def book_visit(
+    agent_id: str,
+    start: str,
+    client_name: str,
+    client_email: str,
+    client_phone: str = None,
+    property_id: str = None,
+    duration_min: int = 45,
+    notes: str = None,
+) -> str:
+    """
+    Réserve une visite en un seul appel : valide le client, vérifie le créneau,
+    crée le rendez-vous et propose des alternatives si le créneau est pris.
+    À préférer à l'enchaînement validate_client_data / check_availability / create_event.
+    
+    Args:
+        agent_id: Identifiant de l'agent (ex: "agent1")
+        start: Date/heure de début (format ISO: "2025-01-15T14:00:00")
+        client_name: Nom du client
+        client_email: Email du client
+        client_phone: Téléphone du client (optionnel)
+        property_id: Bien à visiter (ex: "prop1"), fixe le titre et l'adresse
+        duration_min: Durée de la visite en minutes (45 par défaut)
+        notes: Précisions pour l'agent
+    
+    Returns:
+        JSON string avec status "booked", "conflict" (+ alternatives),
+        "invalid_client" ou "bad_request" (+ errors)
+    """
+    try:
+        data = book_visit_tool(
+            agent_id=agent_id,
+            start=start,
+            client_name=client_name,
+            client_email=client_email,
+            client_phone=client_phone,
+            property_id=property_id,
+            duration_min=duration_min,
+            notes=notes,
+        )
+        return _dump("book_visit", data)
+    except Exception as e:
+        return json.dumps({"error": str(e)}, ensure_ascii=False)
+
+
+async def _abook_visit(
+    agent_id: str,
+    start: str,
+    client_name: str,
+    client_email: str,
+    client_phone: str = None,
+    property_id: str = None,
+    duration_min: int = 45,
+    notes: str = None,
+) -> str:
+    try:
+        data = await abook_visit_tool(
+            agent_id=agent_id,
+            start=start,
+            client_name=client_name,
+            client_email=client_email,
+            client_phone=client_phone,
+            property_id=property_id,
+            duration_min=duration_min,
+            notes=notes,
+        )
+        return _dump("book_visit", data)
+    except Exception as e:
+        return json.dumps({"error": str(e)}, ensure_ascii=False)
+
+
+book_visit = _with_coroutine(book_visit, _abook_visit)
+
+
+@lc_tool
+@cached_tool(ttl=3600, stores=(AGENTS_STORE,), variant=output_mode)
 def get_agent_info(agent_id: str) -> str:
     """
     Récupère les informations détaillées d'un agent immobilier.
@@ -90,10 +241,11 @@ def get_agent_info(agent_id: str) -> str:
         JSON string avec les informations de l'agent
     """
     data = get_agent_info_tool(agent_id)
-    return json.dumps(data, ensure_ascii=False)
+    return _dump("get_agent_info", data)
 
 
 @lc_tool
+@cached_tool(ttl=3600, maxsize=1, stores=(AGENTS_STORE,), variant=output_mode)
 def list_agents() -> str:
     """
     Liste tous les agents disponibles avec leurs informations de base.
@@ -102,10 +254,11 @@ def list_agents() -> str:
         JSON string avec la liste des agents
     """
     data = list_agents_tool()
-    return json.dumps(data, ensure_ascii=False)
+    return _dump("list_agents", data)
 
 
 @lc_tool
+@cached_tool(ttl=3600, stores=(AGENTS_STORE,), casefold=("speciality",), variant=output_mode)
 def find_agent_by_speciality(speciality: str) -> str:
     """
     Trouve les agents spécialisés dans un domaine particulier.
@@ -117,7 +270,7 @@ def find_agent_by_speciality(speciality: str) -> str:
         JSON string avec la liste des agents correspondants
     """
     data = find_agent_by_speciality_tool(speciality)
-    return json.dumps(data, ensure_ascii=False)
+    return _dump("find_agent_by_speciality", data)
 
 
 @lc_tool
@@ -132,23 +285,22 @@ def get_agent_availability_summary(agent_id: str) -> str:
         JSON string avec le résumé des horaires de travail
     """
     data = get_agent_availability_summary_tool(agent_id)
-    return json.dumps(data, ensure_ascii=False)
+    return _dump("get_agent_availability_summary", data)
 
 
 @lc_tool
-def validate_client_data(client_data: str) -> str:
+def validate_client_data(client_data: ClientDataArg) -> str:
     """
     Valide les données client (nom, email, téléphone, etc.).
     
     Args:
-        client_data: JSON string avec les données client
+        client_data: Données client (name, email, phone, preferred_agent, ...)
     
     Returns:
         JSON string avec le résultat de la validation
     """
     try:
-        data = json.loads(client_data)
-        is_valid, errors = validate_client_data_tool(data)
+        is_valid, errors = validate_client_data_tool(as_dict(client_data))
         return json.dumps({
             "is_valid": is_valid,
             "errors": errors
@@ -158,19 +310,18 @@ def validate_client_data(client_data: str) -> str:
 
 
 @lc_tool
-def suggest_agent_by_preferences(client_data: str) -> str:
+def suggest_agent_by_preferences(client_data: PreferencesArg) -> str:
     """
     Suggère un agent basé sur les préférences du client.
     
     Args:
-        client_data: JSON string avec les données client
+        client_data: Préférences du client (property_type, budget_range, location_preference)
     
     Returns:
         JSON string avec l'agent suggéré
     """
     try:
-        data = json.loads(client_data)
-        suggested_agent = suggest_agent_by_preferences_tool(data)
+        suggested_agent = suggest_agent_by_preferences_tool(as_dict(client_data))
         return json.dumps({
             "suggested_agent": suggested_agent
         }, ensure_ascii=False)
@@ -179,6 +330,7 @@ def suggest_agent_by_preferences(client_data: str) -> str:
 
 
 @lc_tool
+@cached_tool(ttl=3600, stores=(PROPERTIES_STORE,), variant=output_mode)
 def get_property_info(property_id: str) -> str:
     """
     Récupère les informations détaillées d'une propriété.
@@ -190,10 +342,11 @@ def get_property_info(property_id: str) -> str:
         JSON string avec les informations de la propriété
     """
     data = get_property_info_tool(property_id)
-    return json.dumps(data, ensure_ascii=False)
+    return _dump("get_property_info", data)
 
 
 @lc_tool
+@cached_tool(ttl=3600, stores=(PROPERTIES_STORE,), casefold=("property_type", "location"), variant=output_mode)
 def list_properties(property_type: str = None, max_price: str = None, location: str = None) -> str:
     """
     Liste les propriétés avec filtres optionnels.
@@ -209,26 +362,25 @@ def list_properties(property_type: str = None, max_price: str = None, location:
     try:
         max_price_float = float(max_price) if max_price else None
         data = list_properties_tool(property_type, max_price_float, location)
-        return json.dumps(data, ensure_ascii=False)
+        return _dump("list_properties", data)
     except Exception as e:
         return json.dumps({"error": str(e)}, ensure_ascii=False)
 
 
 @lc_tool
-def search_properties_by_criteria(criteria: str) -> str:
+def search_properties_by_criteria(criteria: CriteriaArg) -> str:
     """
     Recherche avancée de propriétés selon plusieurs critères.
     
     Args:
-        criteria: JSON string avec les critères de recherche
+        criteria: Critères de recherche (type, min_price, max_price, min_bedrooms, location, ...)
     
     Returns:
         JSON string avec la liste des propriétés correspondantes
     """
     try:
-        criteria_dict = json.loads(criteria)
-        data = search_properties_by_criteria_tool(criteria_dict)
-        return json.dumps(data, ensure_ascii=False)
+        data = search_properties_by_criteria_tool(as_dict(criteria))
+        return _dump("search_properties_by_criteria", data)
     except Exception as e:
         return json.dumps({"error": str(e)}, ensure_ascii=False)
 
@@ -245,10 +397,11 @@ def get_properties_by_agent(agent_id: str) -> str:
         JSON string avec la liste des propriétés de l'agent
     """
     data = get_properties_by_agent_tool(agent_id)
-    return json.dumps(data, ensure_ascii=False)
+    return _dump("get_properties_by_agent", data)
 
 
 @lc_tool
+@cached_tool(ttl=3600, stores=(PROPERTIES_STORE,))
 def get_property_summary(property_id: str) -> str:
     """
     Génère un résumé formaté d'une propriété.
@@ -263,21 +416,89 @@ def get_property_summary(property_id: str) -> str:
     return summary
 
 
+def _compact_json(data) -> str:
+    """JSON sans espaces superflus (moins de tokens de sortie)"""
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+@lc_tool
+@cached_tool(ttl=3600, stores=(PROPERTIES_STORE,))
+def get_properties_info(property_ids: List[str], fields: List[str] = None) -> str:
+    """
+    Récupère les informations de plusieurs propriétés en un seul appel.
+    À préférer à plusieurs appels de get_property_info (comparaison de biens).
+    
+    Args:
+        property_ids: Identifiants des propriétés (ex: ["prop1", "prop3"])
+        fields: Champs à renvoyer (ex: ["title", "price", "surface"]), tous par défaut
+    
+    Returns:
+        JSON compact {property_id: informations}, null pour un identifiant inconnu
+    """
+    return _compact_json(get_properties_info_tool(property_ids, fields))
+
+
+@lc_tool
+@cached_tool(ttl=3600, stores=(PROPERTIES_STORE,))
+def get_property_summaries(property_ids: List[str]) -> str:
+    """
+    Génère le résumé formaté de plusieurs propriétés en un seul appel.
+    
+    Args:
+        property_ids: Identifiants des propriétés (ex: ["prop1", "prop2"])
+    
+    Returns:
+        JSON compact {property_id: résumé}, null pour un identifiant inconnu
+    """
+    return _compact_json(get_property_summaries_tool(property_ids))
+
+
+@lc_tool
+@cached_tool(ttl=3600, stores=(AGENTS_STORE,))
+def get_agents_info(agent_ids: List[str], fields: List[str] = None) -> str:
+    """
+    Récupère les informations de plusieurs agents en un seul appel.
+    
+    Args:
+        agent_ids: Identifiants des agents (ex: ["agent1", "agent3"])
+        fields: Champs à renvoyer (ex: ["name", "phone", "specialities"]), tous par défaut
+    
+    Returns:
+        JSON compact {agent_id: informations}, null pour un identifiant inconnu
+    """
+    return _compact_json(get_agents_info_tool(agent_ids, fields))
+
+
+@lc_tool
+@cached_tool(ttl=3600, stores=(AGENTS_STORE, PROPERTIES_STORE))
+def get_properties_by_agents(agent_ids: List[str], fields: List[str] = None) -> str:
+    """
+    Récupère les propriétés gérées par plusieurs agents en un seul appel.
+    
+    Args:
+        agent_ids: Identifiants des agents (ex: ["agent1", "agent2"])
+        fields: Champs à renvoyer pour chaque propriété (ex: ["id", "title", "price"]), tous par défaut
+    
+    Returns:
+        JSON compact {agent_id: [propriétés]}, null pour un agent inconnu
+    """
+    return _compact_json(get_properties_by_agents_tool(agent_ids, fields))
+
+
 @lc_tool
-def suggest_properties_for_client(client_preferences: str) -> str:
+def suggest_properties_for_client(client_preferences: PreferencesArg) -> str:
     """
     Suggère des propriétés basées sur les préférences client.
     
     Args:
-        client_preferences: JSON string avec les préférences du client
+        client_preferences: Préférences du client (property_type, budget_range, location_preference)
     
     Returns:
         JSON string avec la liste des propriétés suggérées
     """
     try:
-        preferences_dict = json.loads(client_preferences)
-        data = suggest_properties_for_client_tool(preferences_dict)
-        return json.dumps(data, ensure_ascii=False)
+        data = suggest_properties_for_client_tool(as_dict(client_preferences))
+        return _dump("suggest_properties_for_client", data)
     except Exception as e:
         return json.dumps({"error": str(e)}, ensure_ascii=False)
 
@@ -288,11 +509,35 @@ def now() -> str:
     return get_current_time()
 
 
+# Plafonds de concurrence par outil lors de l'exécution parallèle des appels.
+# create_event et book_visit vérifient puis écrivent dans le registre mémoire :
+# on sérialise les réservations pour éviter deux créations concurrentes sur le même créneau.
+# Surchargeable via TOOL_CONCURRENCY_LIMITS (ex: "create_event:1,check_availability:4").
+TOOL_CONCURRENCY_LIMITS = {
+    "create_event": 1,
+    "book_visit": 1,
+}
+
+
+# Échéances par outil (secondes, attente comprise) ; "*" pour les autres outils.
+# create_event et book_visit attendent l'envoi SMTP de la confirmation : sans
+# échéance, un serveur mail bloqué immobilise tout le tour.
+# Surchargeable via TOOL_TIMEOUTS (ex: "create_event:10,*:20", 0 = aucune).
+TOOL_TIMEOUTS = {
+    "*": 30,
+    "calc": 2,
+    "check_availability": 5,
+    "create_event": 20,
+    "book_visit": 25,
+}
+
+
 # Liste de tous les outils disponibles
 TOOLS = [
     calc, 
     check_availability, 
     create_event, 
+    book_visit,
     get_agent_info,
     list_agents,
     find_agent_by_speciality,
@@ -304,6 +549,10 @@ TOOLS = [
     search_properties_by_criteria,
     get_properties_by_agent,
     get_property_summary,
+    get_properties_info,
+    get_property_summaries,
+    get_agents_info,
+    get_properties_by_agents,
     suggest_properties_for_client,
     now
 ]
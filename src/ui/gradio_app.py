@@ -9,7 +9,7 @@ from src.core.prompts import prompt_manager
 def create_gradio_interface():
     """Crée l'interface Gradio"""
     
-    def chat_with_bot(message, history):
+    async def chat_with_bot(message, history):
         """Fonction de chat avec le bot"""
         try:
             # Préparer les messages pour le graph
@@ -18,7 +18,7 @@ def create_gradio_interface():
             thread_id = 2
             config = {"configurable": {"thread_id": thread_id}}
             # Exécuter le graph
-            result = graph.invoke(
+            result = await graph.ainvoke(
                 {
                     "messages": messages
                 
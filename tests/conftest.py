@@ -0,0 +1,23 @@
+"""
+Fixtures communes
+"""
+import pytest
+
+from src.core.config import reload_settings
+
+
+@pytest.fixture(autouse=True)
+def _restore_settings():
+    """Recharge les paramètres après chaque test (une fois l'environnement restauré)"""
+    yield
+    reload_settings()
+
+
+@pytest.fixture
+def set_env(monkeypatch):
+    """Modifie des variables d'environnement puis recharge les paramètres"""
+    def _set(**values):
+        for name, value in values.items():
+            monkeypatch.setenv(name, str(value))
+        reload_settings()
+    return _set
@@ -0,0 +1,96 @@
+"""
+Serveur local imitant l'API OpenAI (chat/completions) pour les tests
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeOpenAIServer:
+    """Serveur HTTP keep-alive qui répond toujours le même message (diffusé si demandé)"""
+
+    def __init__(self, reply: str = "Bonjour !", delay: float = 0.0, status: int = 200, headers: dict = None) -> None:
+        self.reply = reply
+        self.delay = delay
+        self.status = status
+        self.headers = headers or {}
+        self.requests = 0
+        self.models = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                server.requests += 1
+                server.models.append(body.get("model"))
+                if server.delay:
+                    time.sleep(server.delay)
+                if body.get("stream"):
+                    return self._stream(body)
+                payload = json.dumps({
+                    "id": f"chatcmpl-{server.requests}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", "fake"),
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": server.reply},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": {"prompt_tokens": 10, "completion_tokens": 3, "total_tokens": 13},
+                }).encode()
+                self.send_response(server.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in server.headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _stream(self, body: dict) -> None:
+                # Réponse diffusée (SSE) : un chunk par mot, puis [DONE]
+                words = server.reply.split(" ")
+                deltas = [{"role": "assistant", "content": ""}]
+                deltas += [{"content": w if i == 0 else f" {w}"} for i, w in enumerate(words)]
+                events = [
+                    {
+                        "id": f"chatcmpl-{server.requests}",
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": body.get("model", "fake"),
+                        "choices": [{"index": 0, "delta": delta, "finish_reason": None}],
+                    }
+                    for delta in deltas
+                ]
+                events[-1]["choices"][0]["finish_reason"] = "stop"
+                payload = "".join(f"data: {json.dumps(e)}\n\n" for e in events) + "data: [DONE]\n\n"
+                payload = payload.encode()
+                self.send_response(server.status)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self) -> "FakeOpenAIServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
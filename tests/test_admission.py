@@ -0,0 +1,99 @@
+"""
+Tests du contrôle d'admission des appels au modèle
+"""
+import asyncio
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.app import app
+from src.graph.admission import AdmissionController, ModelOverloadedError
+from tests.fake_openai import FakeOpenAIServer
+
+
+def test_round_robin_between_threads():
+    """Une conversation bavarde ne passe pas devant les autres"""
+    controller = AdmissionController(max_concurrency=1, max_queue_per_thread=10)
+    order = []
+
+    async def call(thread_id, label):
+        async with controller.aslot(thread_id):
+            order.append(label)
+            await asyncio.sleep(0.01)
+
+    async def main():
+        first = asyncio.ensure_future(call("a", "a0"))
+        await asyncio.sleep(0)
+        tasks = [asyncio.ensure_future(call("a", f"a{i}")) for i in range(1, 4)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.ensure_future(call("b", "b1")))
+        await asyncio.gather(first, *tasks)
+
+    asyncio.run(main())
+    assert order == ["a0", "a1", "b1", "a2", "a3"]
+
+
+def test_sync_path_caps_concurrency():
+    """Le chemin synchrone respecte la même limite"""
+    controller = AdmissionController(max_concurrency=2, max_queue_per_thread=10)
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def call(i):
+        with controller.slot(f"t{i % 4}"):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(call, range(16)))
+
+    assert peak[0] == 2
+    assert controller.stats()["admitted"] == 16
+
+
+def test_rejects_when_thread_queue_full_or_deadline_passes():
+    """File pleine pour un thread ou délai dépassé : échec rapide"""
+    controller = AdmissionController(max_concurrency=1, max_queue_per_thread=1, queue_timeout=0.05)
+
+    async def hold():
+        async with controller.aslot("a"):
+            await asyncio.sleep(0.2)
+
+    async def call(thread_id):
+        async with controller.aslot(thread_id):
+            pass
+
+    async def main():
+        holder = asyncio.ensure_future(hold())
+        await asyncio.sleep(0)
+        waiting = asyncio.ensure_future(call("b"))
+        await asyncio.sleep(0)
+        with pytest.raises(ModelOverloadedError) as full:
+            await call("b")
+        assert full.value.reason == "thread_queue_full"
+        with pytest.raises(ModelOverloadedError) as late:
+            await waiting
+        assert late.value.reason == "timeout" and late.value.retry_after >= 1
+        await holder
+
+    asyncio.run(main())
+    assert controller.stats()["rejections"] == {"thread_queue_full": 1, "timeout": 1}
+
+
+def test_provider_429_becomes_503(set_env):
+    """Un 429 du fournisseur est renvoyé en 503 avec Retry-After"""
+    headers = {"Retry-After": "7", "x-should-retry": "false"}
+    with FakeOpenAIServer(status=429, headers=headers) as server:
+        set_env(API_KEY="test", BASE_URL=server.base_url)
+        response = TestClient(app).post("/chat/", json={"message": "Bonjour", "thread_id": str(uuid.uuid4())})
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "7"
@@ -0,0 +1,31 @@
+"""
+Tests du chemin asynchrone du graphe
+"""
+import asyncio
+import time
+import uuid
+
+from src.graph.builder import graph
+from tests.fake_openai import FakeOpenAIServer
+
+
+def test_concurrent_conversations_do_not_block(set_env):
+    """Plusieurs conversations avancent en parallèle sur une seule boucle"""
+    with FakeOpenAIServer(reply="Bonjour !", delay=0.3) as server:
+        set_env(API_KEY="test", BASE_URL=server.base_url)
+
+        async def run_one():
+            config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+            result = await graph.ainvoke({"messages": [{"role": "user", "content": "Salut"}]}, config)
+            return result["messages"][-1].content
+
+        async def run_all():
+            return await asyncio.gather(*(run_one() for _ in range(5)))
+
+        started = time.perf_counter()
+        replies = asyncio.run(run_all())
+        elapsed = time.perf_counter() - started
+
+    assert replies == ["Bonjour !"] * 5
+    # 5 appels de 0.3 s en série prendraient au moins 1.5 s
+    assert elapsed < 1.2
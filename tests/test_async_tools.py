@@ -0,0 +1,61 @@
+"""
+Tests des implémentations asynchrones natives des outils
+"""
+import asyncio
+import json
+
+from tools.create_event import _EVENTS
+from src.graph import tools as graph_tools
+from src.graph.tools import book_visit, check_availability, create_event
+
+
+def _event_args(agent_id: str) -> dict:
+    return {"agent_id": agent_id, "start": "2030-03-04T12:00:00", "end": "2030-03-04T12:45:00", "title": "Visite test"}
+
+
+def test_tools_expose_native_coroutines():
+    """Les outils d'agenda ont une coroutine, et gardent leur fonction synchrone"""
+    for t in (check_availability, create_event, book_visit):
+        assert t.coroutine is not None
+        assert t.func is not None
+
+
+def test_async_create_event_runs_on_caller_loop(tmp_path, monkeypatch):
+    """ainvoke crée l'événement sans passer par create_event_sync (thread + boucle)"""
+    monkeypatch.chdir(tmp_path)
+
+    def no_sync(**kwargs):
+        raise AssertionError("chemin synchrone utilisé")
+
+    monkeypatch.setattr(graph_tools, "create_event_tool", no_sync)
+
+    result = json.loads(asyncio.run(create_event.ainvoke(_event_args("async-agent-1"))))
+
+    assert result["event_id"] in _EVENTS
+
+
+def test_async_create_event_reports_conflict(tmp_path, monkeypatch):
+    """Un conflit est renvoyé comme erreur JSON, comme sur le chemin synchrone"""
+    monkeypatch.chdir(tmp_path)
+    asyncio.run(create_event.ainvoke(_event_args("async-agent-2")))
+
+    result = json.loads(asyncio.run(create_event.ainvoke(_event_args("async-agent-2"))))
+
+    assert "Créneau indisponible" in result["error"]
+
+
+def test_async_book_visit(tmp_path, monkeypatch):
+    """book_visit réserve aussi par son chemin asynchrone"""
+    monkeypatch.chdir(tmp_path)
+    args = {"agent_id": "async-agent-3", "start": "2030-03-04T12:00:00", "client_name": "Jean Dupont", "client_email": "not-an-email"}
+
+    result = json.loads(asyncio.run(book_visit.ainvoke(args)))
+
+    assert result["status"] == "invalid_client"
+
+
+def test_async_check_availability_matches_sync():
+    """Le chemin asynchrone renvoie exactement le résultat synchrone"""
+    args = {"agent_id": "agent1", "window": "2030-03-04"}
+
+    assert asyncio.run(check_availability.ainvoke(args)) == check_availability.invoke(args)
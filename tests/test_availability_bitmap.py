@@ -0,0 +1,102 @@
+"""
+Tests du calendrier de disponibilités en bitmaps
+"""
+from datetime import datetime, timedelta
+
+from tools.availability_bitmap import AvailabilityCalendar, slot_starts, span_mask
+from tools.check_availability import TZ, check_availability
+from tools.create_event import cancel_event, create_event_sync
+
+DAY = datetime(2030, 3, 4, tzinfo=TZ)  # lundi
+
+
+def _at(hour: int, minute: int = 0) -> datetime:
+    return DAY.replace(hour=hour, minute=minute)
+
+
+def _working(day, daypart):
+    if day.weekday() >= 5:
+        return []
+    return [(day.replace(hour=9), day.replace(hour=12)), (day.replace(hour=14), day.replace(hour=18))]
+
+
+def _calendar(busy):
+    return AvailabilityCalendar(_working, [lambda agent_id, day: busy.get(agent_id, [])])
+
+
+def test_span_mask_rounds_outwards():
+    """Une plage entamée bloque toute la tranche de 5 minutes"""
+    assert span_mask(_at(9), _at(9, 10), DAY) == 0b11 << 108
+    assert span_mask(_at(9, 2), _at(9, 6), DAY) == 0b11 << 108
+    assert span_mask(DAY - timedelta(hours=1), DAY + timedelta(minutes=5), DAY) == 1
+
+
+def test_is_free():
+    """Libre seulement pendant les heures de travail et hors occupation"""
+    calendar = _calendar({"a1": [(_at(10), _at(10, 45))]})
+
+    assert calendar.is_free("a1", _at(9), _at(9, 45))
+    assert not calendar.is_free("a1", _at(10, 30), _at(11))
+    assert not calendar.is_free("a1", _at(12), _at(12, 30))  # pause déjeuner
+    assert calendar.is_free("a2", _at(10), _at(10, 45))
+
+
+def test_free_slots_over_window():
+    """Créneaux alignés sur l'heure, sans les heures occupées ni le week-end"""
+    calendar = _calendar({"a1": [(_at(10), _at(10, 45))]})
+
+    slots = calendar.free_slots("a1", DAY, DAY + timedelta(days=1))
+
+    assert [s.hour for s, _ in slots] == [9, 11, 14, 15, 16, 17]
+    assert all(e - s == timedelta(minutes=45) for s, e in slots)
+    assert len(calendar.free_slots("a1", DAY, DAY + timedelta(days=7))) == 6 + 4 * 7
+
+
+def test_mark_busy_and_invalidate():
+    """mark_busy met à jour une journée déjà construite ; invalidate la reconstruit"""
+    busy = {"a1": []}
+    calendar = _calendar(busy)
+    assert calendar.is_free("a1", _at(15), _at(15, 45))
+
+    calendar.mark_busy("a1", _at(15), _at(15, 45))
+    assert not calendar.is_free("a1", _at(15), _at(15, 45))
+
+    calendar.invalidate("a1", _at(15), _at(15, 45))
+    assert calendar.is_free("a1", _at(15), _at(15, 45))
+
+
+def test_check_availability_sees_bookings(tmp_path, monkeypatch):
+    """Un rendez-vous pris rend le créneau indisponible, puis libre une fois annulé"""
+    monkeypatch.chdir(tmp_path)
+
+    def slot_at(hour):
+        return next(s for s in check_availability("bitmap-agent", "2030-03-04") if s["start_iso"].startswith(f"2030-03-04T{hour}"))
+
+    hour = next(s["start_iso"][11:13] for s in check_availability("bitmap-agent", "2030-03-04") if s["is_available"])
+    event = create_event_sync(
+        agent_id="bitmap-agent", start=f"2030-03-04T{hour}:00:00", end=f"2030-03-04T{hour}:45:00", title="Visite test"
+    )
+    assert not slot_at(hour)["is_available"]
+
+    cancel_event(event["event_id"])
+    assert slot_at(hour)["is_available"]
+
+
+def test_slot_starts_requires_full_width():
+    """Un départ n'est retenu que si toutes les tranches du créneau sont libres"""
+    free = 0b0111101111  # tranches 0-3 et 5-8 libres
+    assert slot_starts(free, 4) == 0b0000100001
+    assert slot_starts(free, 5) == 0
+    assert slot_starts(free, 2, step=2) == 0b0001000101
+
+
+def test_count_and_first_free_slot():
+    """count_free_slots et first_free_slot s'accordent avec free_slots"""
+    calendar = _calendar({"a1": [(_at(9), _at(12))]})
+    window = (DAY, DAY + timedelta(days=14))
+
+    slots = calendar.free_slots("a1", *window)
+
+    assert calendar.count_free_slots("a1", *window) == len(slots)
+    assert calendar.first_free_slot("a1", *window) == slots[0] == (_at(14), _at(14, 45))
+    assert _calendar({"a1": [(DAY, DAY + timedelta(days=1))]}).first_free_slot("a1", DAY, DAY + timedelta(days=1)) is None
@@ -0,0 +1,40 @@
+"""
+Tests des outils de consultation groupée
+"""
+import json
+
+from tools.batch_lookup import MAX_BATCH_IDS, _dedupe
+from src.graph.tools import get_agents_info, get_properties_by_agents, get_properties_info, get_property_summaries
+
+
+def test_dedupe_keeps_order_and_accepts_strings():
+    """Les doublons et vides disparaissent, l'ordre est conservé, une chaîne CSV est acceptée"""
+    assert _dedupe(["prop2", " prop1", "prop2", "", "prop1 "]) == ["prop2", "prop1"]
+    assert _dedupe("prop3, prop1,prop3") == ["prop3", "prop1"]
+    assert len(_dedupe([f"p{i}" for i in range(MAX_BATCH_IDS + 10)])) == MAX_BATCH_IDS
+
+
+def test_properties_info_projects_fields_and_flags_unknown_ids():
+    """Un seul JSON compact, réduit aux champs demandés, null pour un identifiant inconnu"""
+    raw = get_properties_info.invoke({"property_ids": ["prop1", "prop1", "prop9", "prop3"], "fields": ["title", "price"]})
+    data = json.loads(raw)
+
+    assert list(data) == ["prop1", "prop9", "prop3"]
+    assert data["prop1"] == {"title": "Appartement T3 moderne - Quartier Latin", "price": 450000}
+    assert data["prop9"] is None
+    assert ", " not in raw and ": " not in raw
+
+
+def test_agents_and_their_properties():
+    """Agents et propriétés par agent en un appel chacun"""
+    agents = json.loads(get_agents_info.invoke({"agent_ids": ["agent1", "agent2"], "fields": ["name"]}))
+    assert agents == {"agent1": {"name": "Marie Dubois"}, "agent2": {"name": "Pierre Martin"}}
+
+    by_agent = json.loads(get_properties_by_agents.invoke({"agent_ids": ["agent2", "nobody"], "fields": ["id"]}))
+    assert by_agent == {"agent2": [{"id": "prop3"}, {"id": "prop4"}], "nobody": None}
+
+
+def test_property_summaries_without_projection():
+    """Les résumés groupés reprennent le résumé formaté de chaque bien"""
+    data = json.loads(get_property_summaries.invoke({"property_ids": ["prop5"]}))
+    assert data["prop5"].startswith("**Penthouse")
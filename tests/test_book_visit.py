@@ -0,0 +1,94 @@
+"""
+Tests de l'outil de réservation en un seul appel
+"""
+import json
+from datetime import datetime, timedelta
+
+from tools.check_availability import TZ, _mock_busy
+from tools.create_event import _EVENTS
+from src.graph.tools import TOOL_CONCURRENCY_LIMITS, TOOLS, book_visit
+
+
+def _free_slot(agent_id: str) -> datetime:
+    """Premier créneau libre (agenda simulé) d'un jour ouvré futur"""
+    day = datetime(2030, 3, 4, tzinfo=TZ)  # lundi
+    while True:
+        busy = _mock_busy(agent_id, day)
+        for hour in (9, 10, 11, 14, 15, 16, 17):
+            start = day.replace(hour=hour)
+            if all(start + timedelta(minutes=45) <= b_s or b_e <= start for b_s, b_e in busy):
+                return start
+        day += timedelta(days=1)
+
+
+def _book(**args) -> dict:
+    base = {"agent_id": "booking-agent", "client_name": "Jean Dupont", "client_email": "jean@example.com"}
+    return json.loads(book_visit.invoke({**base, **args}))
+
+
+def test_books_free_slot_in_one_call(tmp_path, monkeypatch):
+    """Un créneau libre est réservé directement, avec le titre et le lieu du bien"""
+    monkeypatch.chdir(tmp_path)
+    start = _free_slot("booking-agent")
+
+    result = _book(start=start.isoformat(), property_id="prop1")
+
+    assert result["status"] == "booked"
+    event = _EVENTS[result["event_id"]]
+    assert event["title"].startswith("Visite Appartement T3")
+    assert event["attendees"] == [{"email": "jean@example.com", "name": "Jean Dupont"}]
+    assert event["end_dt"] - event["start_dt"] == timedelta(minutes=45)
+
+
+def test_conflict_returns_alternatives(tmp_path, monkeypatch):
+    """Un créneau déjà pris renvoie des alternatives libres au lieu d'une erreur"""
+    monkeypatch.chdir(tmp_path)
+    start = _free_slot("conflict-agent")
+    assert _book(agent_id="conflict-agent", start=start.isoformat())["status"] == "booked"
+
+    result = _book(agent_id="conflict-agent", start=start.isoformat(), client_email="autre@example.com")
+
+    assert result["status"] == "conflict"
+    assert 0 < len(result["alternatives"]) <= 3
+    assert all(alt["start_iso"] != start.isoformat() for alt in result["alternatives"])
+
+
+def test_out_of_hours_start_is_a_conflict(tmp_path, monkeypatch):
+    """Un créneau hors des heures de travail n'est pas réservé ; des alternatives sont proposées"""
+    monkeypatch.chdir(tmp_path)
+    before = len(_EVENTS)
+
+    for start in ("2030-03-03T10:00:00", "2030-03-04T03:00:00", "2030-03-04T12:00:00"):  # dimanche, nuit, pause
+        result = _book(agent_id="hours-agent", start=start)
+        assert result["status"] == "conflict", start
+        assert result["alternatives"]
+    assert len(_EVENTS) == before
+
+
+def test_past_start_is_rejected(tmp_path, monkeypatch):
+    """Une date de début passée est refusée sans créer d'événement"""
+    monkeypatch.chdir(tmp_path)
+    before = len(_EVENTS)
+
+    result = _book(agent_id="past-agent", start="2020-03-03T10:00:00")
+
+    assert result["status"] == "bad_request"
+    assert len(_EVENTS) == before
+
+
+def test_invalid_client_is_rejected_before_booking(tmp_path, monkeypatch):
+    """Un client invalide est refusé sans créer d'événement"""
+    monkeypatch.chdir(tmp_path)
+    before = len(_EVENTS)
+
+    result = _book(start=_free_slot("booking-agent").isoformat(), client_email="pas-un-email")
+
+    assert result["status"] == "invalid_client"
+    assert result["errors"]
+    assert len(_EVENTS) == before
+
+
+def test_registered_and_serialized():
+    """L'outil est exposé au modèle et sérialisé comme create_event"""
+    assert book_visit in TOOLS
+    assert TOOL_CONCURRENCY_LIMITS["book_visit"] == 1
@@ -0,0 +1,71 @@
+"""
+Tests de l'index des plages occupées et de l'annulation d'événements
+"""
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from tools.busy_index import BusyIndex
+from tools.check_availability import TZ, _overlaps
+from tools.create_event import BadRequestError, _BUSY_INDEX, _EVENTS, cancel_event, create_event_sync
+
+BASE = datetime(2030, 3, 4, tzinfo=TZ)
+
+
+def test_overlapping_matches_linear_scan():
+    """Les requêtes rendent exactement les plages d'un parcours complet"""
+    rng = random.Random(7)
+    index, plain = BusyIndex(), []
+    for i in range(2000):
+        start = BASE + timedelta(minutes=5 * rng.randrange(10000))
+        end = start + timedelta(minutes=rng.choice((15, 30, 45, 90, 240)))
+        index.add("a1", start, end, f"ev{i}")
+        plain.append((start, end))
+
+    for _ in range(300):
+        q_start = BASE + timedelta(minutes=5 * rng.randrange(10000))
+        q_end = q_start + timedelta(minutes=rng.choice((15, 45, 600)))
+        expected = sorted(p for p in plain if _overlaps(q_start, q_end, *p))
+        assert index.overlapping("a1", q_start, q_end) == expected
+
+
+def test_touching_intervals_do_not_overlap():
+    """Une plage qui finit au début de la requête n'est pas renvoyée"""
+    index = BusyIndex()
+    index.add("a1", BASE, BASE + timedelta(hours=1), "ev1")
+
+    assert index.overlapping("a1", BASE + timedelta(hours=1), BASE + timedelta(hours=2)) == []
+    assert index.overlapping("a2", BASE, BASE + timedelta(hours=2)) == []
+
+
+def test_remove():
+    """remove retire la plage indiquée et seulement elle"""
+    index = BusyIndex()
+    index.add("a1", BASE, BASE + timedelta(hours=1), "ev1")
+    index.add("a1", BASE, BASE + timedelta(hours=1), "ev2")
+
+    assert index.remove("a1", BASE, BASE + timedelta(hours=1), "ev1")
+    assert not index.remove("a1", BASE, BASE + timedelta(hours=1), "ev1")
+    assert index.count("a1") == 1
+
+
+def test_cancel_event_frees_slot(tmp_path, monkeypatch):
+    """Un créneau annulé peut être réservé à nouveau"""
+    monkeypatch.chdir(tmp_path)
+    args = {"agent_id": "index-agent", "start": "2030-03-04T12:00:00", "end": "2030-03-04T12:45:00", "title": "Visite test"}
+    event = create_event_sync(**args)
+    assert _BUSY_INDEX.count("index-agent") == 1
+
+    result = cancel_event(event["event_id"])
+
+    assert result["status"] == "cancelled"
+    assert event["event_id"] not in _EVENTS
+    assert _BUSY_INDEX.count("index-agent") == 0
+    assert create_event_sync(**args)["event_id"] == event["event_id"]
+
+
+def test_cancel_unknown_event():
+    """Annuler un événement inconnu est une erreur de paramètre"""
+    with pytest.raises(BadRequestError):
+        cancel_event("does-not-exist")
@@ -0,0 +1,189 @@
+"""
+Tests du checkpointer SQLite
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Annotated, List, TypedDict
+
+from langchain_core.messages import AIMessage
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import AnyMessage, add_messages
+
+from src.graph.checkpoint import SQLiteCheckpointSaver
+
+
+class _State(TypedDict):
+    messages: Annotated[List[AnyMessage], add_messages]
+
+
+def _echo_graph(checkpointer):
+    """Graphe minimal qui répond en écho, sans appel au modèle"""
+    def echo(state: _State) -> dict:
+        return {"messages": [AIMessage(content=f"echo:{state['messages'][-1].content}")]}
+
+    builder = StateGraph(_State)
+    builder.add_node("echo", echo)
+    builder.add_edge(START, "echo")
+    builder.add_edge("echo", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def test_conversation_survives_restart(tmp_path):
+    """Une conversation est relue par un nouveau saver sur le même fichier"""
+    path = str(tmp_path / "checkpoints.sqlite")
+    config = {"configurable": {"thread_id": "t1"}}
+    _echo_graph(SQLiteCheckpointSaver(path)).invoke({"messages": [("user", "bonjour")]}, config)
+
+    state = _echo_graph(SQLiteCheckpointSaver(path)).get_state(config)
+
+    assert [m.content for m in state.values["messages"]] == ["bonjour", "echo:bonjour"]
+
+
+def test_concurrent_threads_throughput(tmp_path):
+    """Beaucoup de threads concurrents gardent un historique complet"""
+    saver = SQLiteCheckpointSaver(str(tmp_path / "checkpoints.sqlite"), pool_size=4)
+    graph = _echo_graph(saver)
+    threads, turns = 40, 5
+
+    def run_thread(i: int) -> None:
+        config = {"configurable": {"thread_id": f"thread-{i}"}}
+        for turn in range(turns):
+            graph.invoke({"messages": [("user", f"{i}-{turn}")]}, config)
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        list(executor.map(run_thread, range(threads)))
+
+    for i in range(threads):
+        messages = graph.get_state({"configurable": {"thread_id": f"thread-{i}"}}).values["messages"]
+        assert len(messages) == 2 * turns
+        assert messages[-1].content == f"echo:{i}-{turns - 1}"
+    assert len(list(saver.list({"configurable": {"thread_id": "thread-0"}}))) > 0
+
+
+def test_async_error_writes_flush_off_loop(tmp_path):
+    """aput_writes tamponne en mémoire ; un write d'erreur est validé hors de la boucle"""
+    import asyncio
+    import threading
+
+    from langgraph.checkpoint.base import ERROR, empty_checkpoint
+
+    saver = SQLiteCheckpointSaver(str(tmp_path / "checkpoints.sqlite"))
+    flushes = []
+    flush = saver.flush
+
+    def record(thread_id=None):
+        flushes.append(threading.current_thread())
+        flush(thread_id)
+
+    saver.flush = record
+
+    async def run():
+        config = await saver.aput({"configurable": {"thread_id": "t1", "checkpoint_ns": ""}}, empty_checkpoint(), {}, {})
+        await saver.aput_writes(config, [("messages", "ok")], "task-1")
+        assert flushes == []
+        await saver.aput_writes(config, [(ERROR, "boom")], "task-2")
+        return config, threading.current_thread()
+
+    config, loop_thread = asyncio.run(run())
+
+    assert len(flushes) == 1 and flushes[0] is not loop_thread
+    writes = SQLiteCheckpointSaver(str(tmp_path / "checkpoints.sqlite")).get_tuple(config).pending_writes
+    assert ("task-2", ERROR, "boom") in writes
+
+
+def test_bounded_saver_evicts_and_faults_back(tmp_path):
+    """Les threads évincés sont déversés sur disque puis rechargés"""
+    from langgraph.checkpoint.memory import MemorySaver
+
+    from src.graph.checkpoint import BoundedCheckpointSaver
+
+    saver = BoundedCheckpointSaver(MemorySaver(), max_threads=2, spill_dir=str(tmp_path / "spill"), evict_grace=0)
+    graph = _echo_graph(saver)
+    for i in range(5):
+        graph.invoke({"messages": [("user", f"m{i}")]}, {"configurable": {"thread_id": f"t{i}"}})
+
+    stats = saver.stats()
+    assert stats["resident_threads"] == 2
+    assert stats["spills"] == 3
+
+    # Accès à un thread évincé : rechargé depuis le disque, conversation intacte
+    config = {"configurable": {"thread_id": "t0"}}
+    graph.invoke({"messages": [("user", "encore")]}, config)
+    messages = graph.get_state(config).values["messages"]
+    assert [m.content for m in messages] == ["m0", "echo:m0", "encore", "echo:encore"]
+    assert saver.stats()["faults"] == 1
+    assert saver.stats()["resident_threads"] == 2
+
+
+def test_bounded_saver_byte_limit_and_ttl():
+    """Les limites d'octets et d'inactivité évincent les threads anciens"""
+    from langgraph.checkpoint.memory import MemorySaver
+
+    from src.graph.checkpoint import BoundedCheckpointSaver
+
+    saver = BoundedCheckpointSaver(MemorySaver(), max_bytes=20_000, idle_ttl=0.2, evict_grace=0)
+    graph = _echo_graph(saver)
+    for i in range(20):
+        graph.invoke({"messages": [("user", "x" * 1000)]}, {"configurable": {"thread_id": f"t{i}"}})
+    assert saver.stats()["resident_bytes"] <= 20_000
+
+    time.sleep(0.25)
+    graph.invoke({"messages": [("user", "y")]}, {"configurable": {"thread_id": "fresh"}})
+    assert saver.stats()["resident_threads"] == 1
+    # Sans répertoire de déversement, un thread évincé repart de zéro
+    assert graph.get_state({"configurable": {"thread_id": "t0"}}).values == {}
+
+
+def test_bounded_saver_spares_threads_in_flight():
+    """Un thread accédé récemment n'est pas évincé entre deux super-steps"""
+    from langgraph.checkpoint.memory import MemorySaver
+
+    from src.graph.checkpoint import BoundedCheckpointSaver
+
+    saver = BoundedCheckpointSaver(MemorySaver(), max_threads=1, evict_grace=0.2)
+    graph = _echo_graph(saver)
+    for i in range(3):
+        graph.invoke({"messages": [("user", f"m{i}")]}, {"configurable": {"thread_id": f"t{i}"}})
+
+    # Limite dépassée le temps de la période de grâce, sans rien perdre
+    assert saver.stats()["resident_threads"] == 3
+    assert [m.content for m in graph.get_state({"configurable": {"thread_id": "t0"}}).values["messages"]] == ["m0", "echo:m0"]
+
+    time.sleep(0.25)
+    graph.invoke({"messages": [("user", "m3")]}, {"configurable": {"thread_id": "t3"}})
+    assert saver.stats()["resident_threads"] == 1
+    assert saver.stats()["evictions"] == 3
+
+
+def test_bounded_saver_async_spill_runs_off_loop(tmp_path):
+    """En asynchrone, déversement et rechargement sur disque ne bloquent pas la boucle"""
+    import asyncio
+    import threading
+
+    from langgraph.checkpoint.memory import MemorySaver
+
+    from src.graph.checkpoint import BoundedCheckpointSaver
+
+    saver = BoundedCheckpointSaver(MemorySaver(), max_threads=1, spill_dir=str(tmp_path / "spill"), evict_grace=0)
+    disk_threads = []
+    for name in ("_evict", "_fault_in"):
+        original = getattr(saver, name)
+
+        def record(thread_id, _original=original):
+            disk_threads.append(threading.current_thread())
+            return _original(thread_id)
+
+        setattr(saver, name, record)
+    graph = _echo_graph(saver)
+
+    async def run():
+        for thread_id in ("t0", "t1", "t0"):
+            await graph.ainvoke({"messages": [("user", thread_id)]}, {"configurable": {"thread_id": thread_id}})
+        return threading.current_thread()
+
+    loop_thread = asyncio.run(run())
+
+    assert saver.stats()["spills"] >= 2 and saver.stats()["faults"] == 1
+    assert disk_threads and loop_thread not in disk_threads
+    messages = graph.get_state({"configurable": {"thread_id": "t0"}}).values["messages"]
+    assert [m.content for m in messages] == ["t0", "echo:t0", "t0", "echo:t0"]
@@ -0,0 +1,92 @@
+"""
+Tests du regroupement des requêtes identiques
+"""
+import asyncio
+import uuid
+
+import httpx
+
+from src.api.app import app
+from src.api.coalescing import SingleFlight
+from tests.fake_openai import FakeOpenAIServer
+
+
+def test_identical_calls_share_one_execution():
+    """Les appels identiques simultanés partagent le même résultat"""
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    async def main():
+        results = await asyncio.gather(*(flight.run("k", work) for _ in range(5)))
+        return results + [await flight.run("k", work)]
+
+    assert asyncio.run(main()) == ["ok"] * 6
+    assert len(calls) == 2
+    assert flight.stats()["coalesced"] == 4
+
+
+def test_late_subscriber_replays_stream():
+    """Un abonné arrivé en cours de flux reçoit tous les éléments"""
+    flight = SingleFlight()
+
+    async def produce():
+        for i in range(3):
+            await asyncio.sleep(0.02)
+            yield i
+
+    async def consume(delay):
+        await asyncio.sleep(delay)
+        return [item async for item in flight.stream("k", produce)]
+
+    async def main():
+        return await asyncio.gather(consume(0), consume(0.03))
+
+    assert asyncio.run(main()) == [[0, 1, 2], [0, 1, 2]]
+    assert flight.stats()["coalesced_streams"] == 1
+
+
+def test_duplicate_chat_requests_call_model_once(set_env):
+    """Deux POST /chat identiques sur le même thread n'appellent le modèle qu'une fois"""
+    body = {"message": "Bonjour", "thread_id": str(uuid.uuid4())}
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.post("/chat/", json=body) for _ in range(3)))
+
+    with FakeOpenAIServer(reply="Salut !", delay=0.3) as server:
+        set_env(API_KEY="test", BASE_URL=server.base_url)
+        responses = asyncio.run(main())
+        assert server.requests == 1
+
+    assert {r.status_code for r in responses} == {200}
+    assert len({r.json()["response"] for r in responses}) == 1
+
+
+def test_stream_pump_kept_until_done():
+    """La tâche qui alimente un flux est gardée jusqu'à la fin, même sans abonné actif"""
+    flight = SingleFlight()
+    produced = []
+
+    async def produce():
+        for i in range(3):
+            await asyncio.sleep(0.02)
+            produced.append(i)
+            yield i
+
+    async def main():
+        flight.stream("k", produce)  # abonné abandonné aussitôt
+        await asyncio.sleep(0)
+        running = len(flight._pumps)
+        while flight.stats()["in_flight"]:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0)
+        return running, len(flight._pumps)
+
+    assert asyncio.run(main()) == (1, 0)
+    assert produced == [0, 1, 2]
@@ -0,0 +1,56 @@
+"""
+Tests du compactage de l'historique
+"""
+import uuid
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from src.graph.builder import graph
+from src.graph.compaction import find_compaction_cut
+from tests.fake_openai import FakeOpenAIServer
+
+
+def _turn(i: int, with_tool: bool = False):
+    messages = [HumanMessage(content=f"question {i} " + "x" * 400, id=f"h{i}")]
+    if with_tool:
+        messages += [
+            AIMessage(content="", id=f"a{i}", tool_calls=[{"name": "list_agents", "args": {}, "id": f"c{i}"}]),
+            ToolMessage(content="[" + "y" * 400 + "]", tool_call_id=f"c{i}", id=f"t{i}"),
+        ]
+    messages.append(AIMessage(content=f"réponse {i}", id=f"r{i}"))
+    return messages
+
+
+def test_no_cut_under_budget():
+    """Sous le budget, rien n'est compacté"""
+    messages = _turn(0) + _turn(1)
+    assert find_compaction_cut(messages, budget=10_000, keep_recent_tokens=500) is None
+
+
+def test_cut_keeps_tool_calls_with_their_results():
+    """La coupe tombe au début d'un tour, jamais entre un tool_call et sa réponse"""
+    messages = [SystemMessage(content="prompt")]
+    for i in range(6):
+        messages += _turn(i, with_tool=True)
+
+    cut = find_compaction_cut(messages, budget=500, keep_recent_tokens=300)
+
+    assert cut is not None and cut > 1
+    assert isinstance(messages[cut], HumanMessage)
+    kept_calls = {c["id"] for m in messages[cut:] if isinstance(m, AIMessage) for c in m.tool_calls}
+    kept_results = {m.tool_call_id for m in messages[cut:] if isinstance(m, ToolMessage)}
+    assert kept_calls == kept_results
+
+
+def test_graph_summarizes_old_turns(set_env):
+    """Le graphe remplace les anciens tours par un résumé glissant"""
+    config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+    with FakeOpenAIServer(reply="Résumé ou réponse") as server:
+        set_env(HISTORY_TOKEN_BUDGET=300, HISTORY_KEEP_RECENT_TOKENS=150, API_KEY="test", BASE_URL=server.base_url)
+        for i in range(6):
+            graph.invoke({"messages": [("user", f"message {i} " + "z" * 300)]}, config)
+
+    state = graph.get_state(config).values
+    assert state["summary"] == "Résumé ou réponse"
+    assert len(state["messages"]) < 12
+    assert state["messages"][-2].content.startswith("message 5")
@@ -0,0 +1,46 @@
+"""
+Tests des paramètres mémoïsés et de leur rechargement
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.testclient import TestClient
+
+from src.api.app import app
+from src.core.config import get_settings, on_settings_change, reload_settings
+from src.graph.model_pool import model_registry
+
+
+def test_settings_are_parsed_once(monkeypatch):
+    """get_settings renvoie la même instance tant qu'on ne recharge pas"""
+    first = get_settings()
+    monkeypatch.setenv("MODEL_NAME", "autre-modele")
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        seen = set(map(id, pool.map(lambda _: get_settings(), range(64))))
+
+    assert seen == {id(first)}
+    assert get_settings().model_name == first.model_name
+
+
+def test_reload_notifies_subscribers(set_env):
+    """Le rechargement signale les champs modifiés et vide le pool du modèle"""
+    set_env(API_KEY="test")
+    events = []
+    on_settings_change(lambda old, new: events.append((old.temperature, new.temperature)))
+    model_registry.get(get_settings())
+
+    set_env(TEMPERATURE=0.9)
+
+    assert get_settings().temperature == 0.9
+    assert events[-1][1] == 0.9
+    assert model_registry.stats()["entries"] == 0
+    assert reload_settings() == []
+
+
+def test_admin_reload_endpoint(monkeypatch):
+    """POST /admin/settings/reload renvoie les noms des champs modifiés"""
+    monkeypatch.setenv("TOOL_MAX_WORKERS", "3")
+    response = TestClient(app).post("/admin/settings/reload")
+
+    assert response.status_code == 200
+    assert response.json() == {"changed": ["tool_max_workers"]}
+    assert get_settings().tool_max_workers == 3
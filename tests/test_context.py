@@ -0,0 +1,50 @@
+"""
+Tests de l'élision des anciens résultats d'outils dans le contexte du modèle
+"""
+import uuid
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from src.graph.builder import _prepare_messages, graph
+from src.graph.context import elide_stale_tool_results
+from tests.fake_openai import FakeOpenAIServer
+
+
+def _turn(i: int):
+    return [
+        HumanMessage(content=f"question {i}", id=f"h{i}"),
+        AIMessage(content="", id=f"a{i}", tool_calls=[{"name": "list_agents", "args": {"page": i}, "id": f"c{i}"}]),
+        ToolMessage(content="[" + '{"agent_id": "agent1"}, ' * 20 + "{}]", tool_call_id=f"c{i}", name="list_agents", id=f"t{i}"),
+        AIMessage(content=f"réponse {i}", id=f"r{i}"),
+    ]
+
+
+def test_old_tool_results_become_stubs():
+    """Seuls les résultats de plus de N tours sont résumés"""
+    messages = _turn(0) + _turn(1) + _turn(2)
+
+    shaped, elided, saved = elide_stale_tool_results(messages, max_age_turns=0)
+
+    assert elided == 2 and saved > 0
+    stub = shaped[2]
+    assert stub.tool_call_id == "c0" and stub.id == "t0"
+    assert stub.content.startswith('[résultat élidé] list_agents({"page":0})')
+    assert "liste de 21 éléments" in stub.content
+    assert shaped[10] is messages[10]
+    # Les messages d'origine ne sont pas modifiés
+    assert messages[2].content.startswith('[{"agent_id"')
+
+
+def test_graph_keeps_full_payload_in_checkpoint(set_env):
+    """Le checkpoint conserve le ToolMessage complet"""
+    config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+    graph.update_state(config, {"messages": _turn(0)})
+    with FakeOpenAIServer(reply="ok") as server:
+        set_env(TOOL_RESULT_MAX_AGE_TURNS=0, API_KEY="test", BASE_URL=server.base_url)
+        graph.invoke({"messages": [("user", "suite")]}, config)
+
+        state = graph.get_state(config).values
+        shaped = _prepare_messages(state)
+
+    assert state["messages"][2].content.startswith('[{"agent_id"')
+    assert shaped[3].content.startswith("[résultat élidé]")
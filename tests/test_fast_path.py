@@ -0,0 +1,51 @@
+"""
+Tests du routeur de réponses directes
+"""
+import uuid
+
+from langchain_core.messages import AIMessage, ToolMessage
+
+from src.graph.builder import create_graph
+from src.graph.fast_path import fast_path_router
+from tests.fake_openai import FakeOpenAIServer
+
+
+def test_matches_only_unambiguous_lookups():
+    """Les consultations simples sont reconnues, le reste passe au modèle"""
+    def intent(text):
+        matched = fast_path_router.match(text)
+        return matched and (matched[0], matched[2])
+
+    assert intent("quels sont les agents disponibles ?") == ("list_agents", {})
+    assert intent("Montre-moi prop3") == ("property_summary", {"property_id": "prop3"})
+    assert intent("agents spécialisés en luxury") == ("agents_by_speciality", {"speciality": "Luxury"})
+    assert intent("quelles maisons avez-vous ?") == ("properties_by_type", {"property_type": "Maison"})
+    assert intent("je veux visiter prop3 demain") is None
+    assert intent("appartements à Paris sous 500000 €") is None
+    assert intent("compare prop1 et prop2") is None
+    assert intent("bonjour") is None
+
+
+def test_graph_answers_without_model(set_env):
+    """Une consultation simple ne fait aucun appel au modèle"""
+    set_env(FAST_PATH_ENABLED="true")
+    graph = create_graph()
+    config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+    before = fast_path_router.stats.snapshot()["hits"]
+
+    with FakeOpenAIServer(reply="réponse du modèle") as server:
+        set_env(API_KEY="test", BASE_URL=server.base_url)
+        result = graph.invoke({"messages": [("user", "montre-moi prop3")]}, config)
+        assert server.requests == 0
+        messages = result["messages"]
+        assert isinstance(messages[-2], ToolMessage) and messages[-2].name == "get_property_summary"
+        assert messages[-3].tool_calls[0]["id"] == messages[-2].tool_call_id
+        assert "Bureau 200m²" in messages[-1].content
+
+        result = graph.invoke({"messages": [("user", "Je voudrais réserver une visite")]}, config)
+        assert server.requests == 1
+        assert result["messages"][-1].content == "réponse du modèle"
+
+    stats = fast_path_router.stats.snapshot()
+    assert stats["hits"] == before + 1
+    assert isinstance(result["messages"][-1], AIMessage)
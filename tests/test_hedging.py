@@ -0,0 +1,191 @@
+"""
+Tests de la couverture des requêtes sur plusieurs points d'accès
+"""
+import asyncio
+import time
+from typing import Any, List
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from src.core.config import Settings
+from src.graph.hedging import HedgedModel, endpoint_health, hedged_model
+from tests.fake_openai import FakeOpenAIServer
+
+
+def _settings(*servers, **overrides):
+    values = {"api_key": "test", "base_urls": [s.base_url for s in servers], "hedge_initial_delay": 0.1}
+    values.update(overrides)
+    return Settings(**values)
+
+
+def test_async_hedge_wins_and_cancels_slow_primary():
+    """La copie vers le second point d'accès gagne, la requête lente est annulée"""
+    with FakeOpenAIServer(reply="lent", delay=1.0) as slow, FakeOpenAIServer(reply="rapide") as fast:
+        model = hedged_model(_settings(slow, fast))
+        assert isinstance(model, HedgedModel)
+
+        started = time.perf_counter()
+        response = asyncio.run(model.ainvoke([HumanMessage(content="Bonjour")]))
+        elapsed = time.perf_counter() - started
+
+    assert response.content == "rapide"
+    assert elapsed < 0.8
+    assert endpoint_health(slow.base_url).stats()["cancelled"] == 1
+    assert endpoint_health(fast.base_url).stats()["wins"] == 1
+
+
+def test_sync_hedge_returns_first_answer():
+    """Le chemin synchrone renvoie aussi la première réponse"""
+    with FakeOpenAIServer(reply="lent", delay=1.0) as slow, FakeOpenAIServer(reply="rapide") as fast:
+        started = time.perf_counter()
+        response = hedged_model(_settings(slow, fast)).invoke([HumanMessage(content="Bonjour")])
+        assert time.perf_counter() - started < 0.8
+
+    assert response.content == "rapide"
+
+
+def test_breaker_demotes_failing_endpoint():
+    """Après plusieurs échecs, le point d'accès défaillant n'est plus appelé"""
+    no_retry = {"x-should-retry": "false"}
+    with FakeOpenAIServer(status=500, headers=no_retry) as broken, FakeOpenAIServer(reply="ok") as healthy:
+        model = hedged_model(_settings(broken, healthy, breaker_failure_threshold=2, breaker_reset_timeout=60))
+        for _ in range(4):
+            assert model.invoke([HumanMessage(content="Bonjour")]).content == "ok"
+
+        assert broken.requests == 2
+        assert endpoint_health(broken.base_url).stats()["state"] == "open"
+
+
+class _StreamingModel(BaseChatModel):
+    """Modèle factice qui diffuse ses tokens (premier après first_delay, puis un tous les token_delay)"""
+
+    reply: str
+    first_delay: float = 0.0
+    token_delay: float = 0.0
+    streaming: bool = False
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-streaming"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.first_delay + self.token_delay * len(self.reply.split()))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.reply))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.first_delay + self.token_delay * len(self.reply.split()))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.reply))])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.first_delay)
+        for i, word in enumerate(self.reply.split()):
+            if i:
+                await asyncio.sleep(self.token_delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=("" if not i else " ") + word))
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+class _Tokens(BaseCallbackHandler):
+    """Tokens reçus par le client"""
+
+    def __init__(self) -> None:
+        self.tokens: List[str] = []
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        self.tokens.append(token)
+
+
+def _streaming_hedge(name: str, primary: BaseChatModel, backup: BaseChatModel) -> HedgedModel:
+    settings = Settings(api_key="test", hedge_initial_delay=0.1)
+    return HedgedModel([(f"http://{name}-primary.test/v1", primary), (f"http://{name}-backup.test/v1", backup)], settings)
+
+
+def test_streaming_primary_is_not_hedged_after_first_token():
+    """Un principal lent qui diffuse déjà n'est pas remplacé : pas de réponse en double"""
+    primary = _StreamingModel(reply="une longue réponse diffusée mot par mot", first_delay=0.02, token_delay=0.08, streaming=True)
+    backup = _StreamingModel(reply="copie", first_delay=0.05)
+    client = _Tokens()
+
+    response = asyncio.run(_streaming_hedge("streamed", primary, backup).ainvoke([HumanMessage(content="Bonjour")], {"callbacks": [client]}))
+
+    assert response.content == "une longue réponse diffusée mot par mot"
+    assert "".join(client.tokens) == response.content
+    assert endpoint_health("http://streamed-backup.test/v1").stats()["attempts"] == 0
+
+
+def test_streaming_primary_hedged_before_first_token():
+    """Sans premier token avant le délai, la copie part et gagne ; rien n'a été diffusé"""
+    primary = _StreamingModel(reply="trop tard", first_delay=1.0, streaming=True)
+    backup = _StreamingModel(reply="copie", first_delay=0.05)
+    client = _Tokens()
+
+    started = time.perf_counter()
+    response = asyncio.run(_streaming_hedge("silent", primary, backup).ainvoke([HumanMessage(content="Bonjour")], {"callbacks": [client]}))
+
+    assert response.content == "copie"
+    assert time.perf_counter() - started < 0.8
+    assert client.tokens == []
+
+
+
+def test_graph_streams_tokens_through_hedged_model(set_env):
+    """Avec plusieurs points d'accès, le graphe diffuse toujours les tokens du principal"""
+    from src.graph.builder import create_graph
+
+    with FakeOpenAIServer(reply="a b c d") as primary, FakeOpenAIServer(reply="copie") as backup:
+        set_env(API_KEY="test", BASE_URLS=f"{primary.base_url},{backup.base_url}", HEDGE_INITIAL_DELAY=5)
+        graph = create_graph()
+
+        async def main():
+            config = {"configurable": {"thread_id": "hedged-stream"}}
+            return [
+                message
+                async for message, metadata in graph.astream(
+                    {"messages": [("user", "Bonjour")]}, config, stream_mode="messages"
+                )
+                if metadata["langgraph_node"] == "model"
+            ]
+
+        messages = asyncio.run(main())
+        assert backup.requests == 0
+
+    assert all(isinstance(m, AIMessageChunk) for m in messages)
+    assert [m.content for m in messages if m.content] == ["a", " b", " c", " d"]
+
+
+def test_node_without_config_keeps_graph_callbacks():
+    """Appelé sans config depuis un nœud, le principal garde le flux de messages du graphe"""
+    from typing import Annotated, TypedDict
+
+    from langgraph.graph import END, START, StateGraph
+    from langgraph.graph.message import AnyMessage, add_messages
+
+    class State(TypedDict):
+        messages: Annotated[List[AnyMessage], add_messages]
+
+    primary = _StreamingModel(reply="a b c d", first_delay=0.02, token_delay=0.05)
+    backup = _StreamingModel(reply="copie", first_delay=0.05)
+    model = _streaming_hedge("node", primary, backup)
+
+    async def node(state: State) -> dict:
+        return {"messages": [await model.ainvoke(state["messages"])]}
+
+    builder = StateGraph(State)
+    builder.add_node("model", node)
+    builder.add_edge(START, "model")
+    builder.add_edge("model", END)
+    graph = builder.compile()
+
+    async def main():
+        return [m async for m, _ in graph.astream({"messages": [("user", "Bonjour")]}, stream_mode="messages")]
+
+    messages = asyncio.run(main())
+
+    assert all(isinstance(m, AIMessageChunk) for m in messages)
+    assert [m.content for m in messages if m.content] == ["a", " b", " c", " d"]
+    assert endpoint_health("http://node-backup.test/v1").stats()["attempts"] == 0
@@ -0,0 +1,83 @@
+"""
+Tests de la boucle d'arrière-plan des appels synchrones
+"""
+import asyncio
+import threading
+
+import pytest
+
+from tools.create_event import EventConflictError, _EVENTS, create_event_sync
+from tools.loop_runner import BackgroundLoopRunner, LoopRunnerBusyError, loop_runner
+
+
+async def _thread_name() -> str:
+    return threading.current_thread().name
+
+
+def test_reuses_one_loop_thread():
+    """Tous les appels passent par le même thread, créé une seule fois"""
+    runner = BackgroundLoopRunner(name="test-loop")
+    try:
+        names = {runner.run(_thread_name()) for _ in range(5)}
+        assert names == {"test-loop"}
+        assert sum(t.name == "test-loop" for t in threading.enumerate()) == 1
+    finally:
+        runner.close()
+
+
+def test_propagates_exceptions():
+    """L'exception de la coroutine est relevée chez l'appelant"""
+    async def boom():
+        raise ValueError("boom")
+
+    runner = BackgroundLoopRunner()
+    try:
+        with pytest.raises(ValueError, match="boom"):
+            runner.run(boom())
+    finally:
+        runner.close()
+
+
+def test_bounded_pending_work():
+    """Au-delà de max_pending coroutines en cours, l'appel échoue au lieu d'empiler"""
+    started, release = threading.Event(), threading.Event()
+
+    async def wait_release():
+        started.set()
+        while not release.is_set():
+            await asyncio.sleep(0.01)
+
+    runner = BackgroundLoopRunner(max_pending=1, submit_timeout=0.05)
+    blocker = threading.Thread(target=runner.run, args=(wait_release(),))
+    blocker.start()
+    try:
+        started.wait(5)
+        with pytest.raises(LoopRunnerBusyError):
+            runner.run(_thread_name())
+    finally:
+        release.set()
+        blocker.join()
+        runner.close()
+    assert runner.run(_thread_name()) == "tools-loop"
+    runner.close()
+
+
+def test_usable_from_running_loop():
+    """Un outil synchrone appelé depuis une coroutine ne crée pas de boucle imbriquée"""
+    async def caller():
+        return loop_runner.run(_thread_name())
+
+    assert asyncio.run(caller()) == "tools-loop"
+
+
+def test_create_event_sync_raises_conflict_without_rebooking(tmp_path, monkeypatch):
+    """Un conflit est relevé tel quel, sans seconde exécution de la réservation"""
+    monkeypatch.chdir(tmp_path)
+    args = {"agent_id": "runner-agent", "start": "2030-03-04T12:00:00", "end": "2030-03-04T12:45:00", "title": "Visite test"}
+    create_event_sync(**args)
+    before = len(_EVENTS)
+
+    with pytest.raises(EventConflictError):
+        create_event_sync(**args)
+
+    assert len(_EVENTS) == before
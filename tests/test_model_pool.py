@@ -0,0 +1,52 @@
+"""
+Tests du registre des clients du modèle
+"""
+from langchain_core.messages import HumanMessage
+
+from src.core.config import Settings
+from src.graph.model_pool import ModelRegistry
+from src.graph.tools import TOOLS
+from tests.fake_openai import FakeOpenAIServer
+
+
+def test_same_settings_reuse_bound_model():
+    """Les mêmes paramètres retournent le même client lié"""
+    registry = ModelRegistry(TOOLS)
+    settings = Settings(api_key="test", base_url="http://127.0.0.1:9/v1")
+
+    first = registry.get(settings)
+    second = registry.get(settings.model_copy())
+
+    assert first is second
+    stats = registry.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_changed_settings_rebuild_model():
+    """Un changement de paramètre reconstruit le client"""
+    registry = ModelRegistry(TOOLS, max_entries=1)
+    settings = Settings(api_key="test", base_url="http://127.0.0.1:9/v1")
+
+    first = registry.get(settings)
+    second = registry.get(settings.model_copy(update={"temperature": 0.7}))
+
+    assert first is not second
+    assert registry.stats()["misses"] == 2
+    assert registry.stats()["entries"] == 1
+
+
+def test_connections_are_reused_across_calls():
+    """Les appels successifs réutilisent la même connexion keep-alive"""
+    registry = ModelRegistry(TOOLS)
+    with FakeOpenAIServer(reply="Bonjour") as server:
+        settings = Settings(api_key="test", base_url=server.base_url)
+        for _ in range(3):
+            response = registry.get(settings).invoke([HumanMessage(content="Salut")])
+            assert response.content == "Bonjour"
+
+    stats = registry.stats()
+    assert stats["requests"] == 3
+    assert stats["new_connections"] == 1
+    assert stats["reused_connections"] == 2
+    registry.clear()
@@ -0,0 +1,50 @@
+"""
+Tests du cache des prompts et du préfixe stable
+"""
+import os
+
+from src.core.prompts import PromptCache, PromptManager
+from src.graph.builder import _prepare_messages
+from src.graph.context import stable_prefix
+
+
+def test_cache_checks_mtime_at_most_once_per_interval(tmp_path):
+    """Le fichier n'est relu que si son mtime change, après l'intervalle"""
+    path = tmp_path / "chatbot_v1.md"
+    path.write_text("version 1", encoding="utf-8")
+    cache = PromptCache(check_interval=3600)
+
+    assert cache.read(str(path)) == "version 1"
+    path.write_text("version 2", encoding="utf-8")
+    assert cache.read(str(path)) == "version 1"
+    assert cache.stats()["stat_checks"] == 1
+
+    cache.check_interval = 0
+    os.utime(path, ns=(0, 10**18))
+    assert cache.read(str(path)) == "version 2"
+    assert cache.read(str(path)) == "version 2"
+    assert cache.stats()["reloads"] == 2
+
+
+def test_missing_prompt_returns_none(tmp_path):
+    """Un fichier absent donne None, sans exception"""
+    assert PromptCache().read(str(tmp_path / "absent.md")) is None
+
+
+def test_manager_sees_new_versions(tmp_path):
+    """Une nouvelle version ajoutée au répertoire est prise en compte"""
+    manager = PromptManager(str(tmp_path))
+    (tmp_path / "demo_v1.md").write_text("un", encoding="utf-8")
+    assert manager.load("demo") == "un"
+    (tmp_path / "demo_v2.md").write_text("deux", encoding="utf-8")
+    os.utime(tmp_path, ns=(0, 10**18))
+    assert manager.available_versions("demo") == [1, 2]
+
+
+def test_prefix_is_reused_between_calls():
+    """Le même message système (même objet) est envoyé à chaque appel"""
+    first = _prepare_messages({"messages": [("user", "bonjour")]})[0]
+    second = _prepare_messages({"messages": [("user", "autre")]})[0]
+
+    assert first is second is stable_prefix().system_message
+    assert len(stable_prefix().fingerprint) == 16
@@ -0,0 +1,59 @@
+"""
+Tests du choix du modèle par étape
+"""
+import uuid
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from src.graph.builder import graph
+from src.graph.routing import FAST, STRONG, choose_route, routing_stats
+from tests.fake_openai import FakeOpenAIServer
+
+
+def _after_tools(*results, content="{}"):
+    calls = [{"name": name, "args": {}, "id": f"c{i}"} for i, (name, _) in enumerate(results)]
+    messages = [HumanMessage(content="question"), AIMessage(content="", tool_calls=calls)]
+    for i, (name, status) in enumerate(results):
+        messages.append(ToolMessage(content=content, tool_call_id=f"c{i}", name=name, status=status))
+    return {"messages": messages}
+
+
+def test_route_features():
+    """Reformulation et politesse en rapide, planification en principal"""
+    assert choose_route(_after_tools(("list_agents", "success"))) == FAST
+    assert choose_route(_after_tools(("get_agent_info", "success"), ("check_availability", "success"))) == STRONG
+    assert choose_route(_after_tools(("get_property_info", "error"))) == STRONG
+    assert choose_route({"messages": [HumanMessage(content="Merci !")]}) == FAST
+    assert choose_route({"messages": [HumanMessage(content="Je veux visiter prop1 demain")]}) == STRONG
+
+
+def test_error_payload_routes_to_strong():
+    """Une erreur renvoyée dans le contenu (ToolMessage « success ») demande de replanifier"""
+    conflict = '{"error": "Créneau indisponible: chevauchement"}'
+    assert choose_route(_after_tools(("create_event", "success"), content=conflict)) == STRONG
+    assert choose_route(_after_tools(("get_property_info", "success"), content='{"error":"introuvable"}')) == STRONG
+    assert choose_route(_after_tools(("create_event", "success"), content='{"event_id": "e1"}')) == FAST
+    assert choose_route(_after_tools(("calc", "success"), content="42")) == FAST
+
+
+def test_booking_outcome_routes():
+    """Une visite réservée se reformule ; un conflit (alternatives à proposer) se planifie"""
+    conflict = '{"status":"conflict","alternatives":[{"start_iso":"2030-03-04T14:00:00+01:00"}]}'
+    assert choose_route(_after_tools(("book_visit", "success"), content=conflict)) == STRONG
+    assert choose_route(_after_tools(("book_visit", "success"), content='{"status":"invalid_client","errors":["email"]}')) == STRONG
+    assert choose_route(_after_tools(("book_visit", "success"), content='{"status":"booked","event_id":"e1"}')) == FAST
+
+
+def test_graph_uses_fast_model_for_small_talk(set_env):
+    """Le graphe envoie la politesse au modèle rapide et compte par route"""
+    before = routing_stats.snapshot().get(FAST, {}).get("calls", 0)
+    config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+    with FakeOpenAIServer(reply="Avec plaisir") as server:
+        set_env(API_KEY="test", BASE_URL=server.base_url, MODEL_NAME="grand", FAST_MODEL_NAME="petit")
+        graph.invoke({"messages": [("user", "Merci !")]}, config)
+        graph.invoke({"messages": [("user", "Quels biens à Paris ?")]}, config)
+
+    assert server.models == ["petit", "grand"]
+    stats = routing_stats.snapshot()
+    assert stats[FAST]["calls"] == before + 1
+    assert stats[FAST]["models"]["petit"] >= 1 and stats[FAST]["output_tokens"] >= 3
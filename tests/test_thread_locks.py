@@ -0,0 +1,101 @@
+"""
+Tests de la sérialisation des tours par conversation
+"""
+import asyncio
+import random
+import uuid
+
+import httpx
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.api.app import app
+from src.api.thread_locks import ThreadLockManager, ThreadQueueFullError, ThreadQueueTimeoutError
+from src.graph.builder import graph
+from tests.fake_openai import FakeOpenAIServer
+
+
+def test_stress_same_thread_in_order_other_threads_parallel():
+    """Des milliers de tours mêlés : ordre conservé par thread, threads en parallèle"""
+    manager = ThreadLockManager(max_entries=50, max_queue_depth=10_000)
+    histories = {f"t{i}": [] for i in range(100)}
+    running = {"now": 0, "max": 0}
+
+    async def turn(thread_id, n):
+        async with manager.turn(thread_id):
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+            snapshot = list(histories[thread_id])
+            await asyncio.sleep(0)
+            histories[thread_id] = snapshot + [n]
+            running["now"] -= 1
+
+    async def main():
+        counters = dict.fromkeys(histories, 0)
+        tasks = []
+        for _ in range(5000):
+            thread_id = random.choice(list(histories))
+            tasks.append(turn(thread_id, counters[thread_id]))
+            counters[thread_id] += 1
+        await asyncio.gather(*tasks)
+        return counters
+
+    counters = asyncio.run(main())
+    for thread_id, history in histories.items():
+        assert history == list(range(counters[thread_id]))
+    assert running["max"] > 1
+    stats = manager.stats()
+    assert stats["turns"] == 5000 and stats["threads"] <= 50
+
+
+def test_queue_depth_and_timeout():
+    """La file d'un thread est bornée en profondeur et en durée"""
+    manager = ThreadLockManager(max_queue_depth=1, wait_timeout=0.05)
+
+    async def hold():
+        async with manager.turn("t"):
+            await asyncio.sleep(0.2)
+
+    async def wait_turn():
+        async with manager.turn("t"):
+            pass
+
+    async def main():
+        holder = asyncio.ensure_future(hold())
+        await asyncio.sleep(0.01)
+        waiter = asyncio.ensure_future(wait_turn())
+        await asyncio.sleep(0.01)
+        with pytest.raises(ThreadQueueFullError):
+            await wait_turn()
+        with pytest.raises(ThreadQueueTimeoutError):
+            await waiter
+        await holder
+
+    asyncio.run(main())
+    assert manager.stats()["rejections"] == 1 and manager.stats()["timeouts"] == 1
+
+
+def test_concurrent_api_turns_keep_histories_consistent(set_env):
+    """Des requêtes /chat concurrentes sur quelques threads ne perdent aucun message"""
+    threads = [str(uuid.uuid4()) for _ in range(20)]
+    sent = {thread_id: [] for thread_id in threads}
+    requests = []
+    for i in range(300):
+        thread_id = random.choice(threads)
+        sent[thread_id].append(f"message {i}")
+        requests.append({"message": f"message {i}", "thread_id": thread_id})
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=60) as client:
+            return await asyncio.gather(*(client.post("/chat/", json=body) for body in requests))
+
+    with FakeOpenAIServer(reply="ok") as server:
+        set_env(API_KEY="test", BASE_URL=server.base_url, THREAD_QUEUE_DEPTH=300)
+        responses = asyncio.run(main())
+
+    assert {r.status_code for r in responses} == {200}
+    for thread_id in threads:
+        messages = graph.get_state({"configurable": {"thread_id": thread_id}}).values.get("messages", [])
+        assert [m.content for m in messages if isinstance(m, HumanMessage)] == sent[thread_id]
+        assert all(isinstance(m, AIMessage) for m in messages[1::2])
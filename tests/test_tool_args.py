@@ -0,0 +1,56 @@
+"""
+Tests des arguments typés des outils
+"""
+import json
+
+import pytest
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import ValidationError
+
+from src.graph.tools import create_event, search_properties_by_criteria, validate_client_data
+
+
+def _ids(raw: str) -> list:
+    return [p["id"] for p in json.loads(raw)]
+
+
+def test_schema_exposes_nested_objects():
+    """Le modèle voit un objet structuré, plus une chaîne JSON"""
+    params = convert_to_openai_tool(search_properties_by_criteria)["function"]["parameters"]
+    criteria = params["properties"]["criteria"]
+    assert criteria["type"] == "object"
+    assert criteria["properties"]["max_price"] == {"type": "number"}
+
+
+def test_typed_and_legacy_forms_agree():
+    """L'ancienne forme chaîne JSON donne le même résultat que l'objet"""
+    criteria = {"type": "Appartement", "max_price": 600000, "min_bedrooms": None}
+    typed = search_properties_by_criteria.invoke({"criteria": criteria})
+    legacy = search_properties_by_criteria.invoke({"criteria": json.dumps(criteria)})
+    assert typed == legacy
+    assert _ids(typed) == ["prop1"]
+
+
+def test_client_data_validation_keeps_business_errors():
+    """Les champs absents restent signalés par la validation métier"""
+    result = json.loads(validate_client_data.invoke({"client_data": {"name": "Jean Dupont"}}))
+    assert result == {"is_valid": False, "errors": ["L'email est obligatoire"]}
+
+
+def test_legacy_attendees_string(tmp_path, monkeypatch):
+    """Les participants passés en chaîne JSON sont encore acceptés"""
+    monkeypatch.chdir(tmp_path)
+    result = json.loads(create_event.invoke({
+        "agent_id": "typed-args-agent",
+        "start": "2030-03-04T12:00:00",
+        "end": "2030-03-04T12:45:00",
+        "title": "Visite test",
+        "attendees": '[{"name": "Jean Dupont", "email": "jean@example.com"}]',
+    }))
+    assert "event_id" in result
+
+
+def test_malformed_string_is_a_validation_error():
+    """Une chaîne JSON invalide échoue à la validation, avec le nom du champ"""
+    with pytest.raises(ValidationError, match="criteria"):
+        search_properties_by_criteria.invoke({"criteria": "{'type': 'Maison'}"})
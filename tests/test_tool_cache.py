@@ -0,0 +1,84 @@
+"""
+Tests du cache des résultats d'outils
+"""
+import time
+
+from src.graph.tool_cache import ToolResultCache, cached_tool
+from src.graph.tools import check_availability, find_agent_by_speciality
+from tools import create_event_sync, notify_store_change
+
+
+def test_normalized_arguments_share_entry():
+    """Des arguments équivalents tombent sur la même entrée"""
+    cache = find_agent_by_speciality.func.cache
+    cache.clear()
+
+    first = find_agent_by_speciality.invoke({"speciality": "Luxury"})
+    second = find_agent_by_speciality.invoke({"speciality": "  luxury "})
+
+    assert first == second
+    assert cache.stats()["size"] == 1
+
+
+def test_ttl_and_lru_bound():
+    """Les entrées expirent et la taille reste bornée"""
+    cache = ToolResultCache("demo", ttl=0.05, maxsize=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.set("c", "3")
+    assert cache.get("a") is None
+    assert cache.get("c") == "3"
+    time.sleep(0.06)
+    assert cache.get("c") is None
+
+
+def test_store_change_invalidates():
+    """Une modification du store vide le cache de l'outil"""
+    calls = []
+
+    @cached_tool(ttl=60, stores=("demo_store",))
+    def demo(value: str) -> str:
+        calls.append(value)
+        return value
+
+    demo("x")
+    demo("x")
+    notify_store_change("demo_store")
+    demo("x")
+
+    assert calls == ["x", "x"]
+
+
+def test_result_overlapping_invalidation_not_cached():
+    """Un résultat calculé pendant une modification du store n'est pas gardé"""
+    calls = []
+
+    @cached_tool(ttl=60, stores=("racing_store",))
+    def racing(value: str) -> str:
+        calls.append(value)
+        if len(calls) == 1:
+            notify_store_change("racing_store")  # réservation pendant la lecture
+        return f"{value}-{len(calls)}"
+
+    assert racing("x") == "x-1"
+    assert racing.cache.stats()["size"] == 0
+    assert racing("x") == "x-2"
+    assert racing("x") == "x-2"
+
+
+def test_booking_invalidates_availability(tmp_path, monkeypatch):
+    """Une réservation invalide le cache de check_availability"""
+    monkeypatch.chdir(tmp_path)
+    cache = check_availability.func.cache
+    check_availability.invoke({"agent_id": "agent1", "window": "next 7 days"})
+    assert cache.stats()["size"] >= 1
+
+    create_event_sync(
+        agent_id="cache-test-agent",
+        start="2030-01-07T09:00:00+01:00",
+        end="2030-01-07T09:30:00+01:00",
+        title="Visite test",
+        send_email=False,
+    )
+
+    assert cache.stats()["size"] == 0
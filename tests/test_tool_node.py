@@ -0,0 +1,147 @@
+"""
+Tests du nœud d'exécution parallèle des outils
+"""
+import asyncio
+import json
+import time
+
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool as lc_tool
+
+from src.graph.tool_node import ParallelToolNode, tool_stats
+
+
+@lc_tool
+def slow_echo(value: str) -> str:
+    """Renvoie la valeur après 0.2 s."""
+    time.sleep(0.2)
+    return value
+
+
+@lc_tool
+def serialized(value: str) -> str:
+    """Renvoie la valeur après 0.1 s."""
+    time.sleep(0.1)
+    return value
+
+
+@lc_tool
+def broken(value: str) -> str:
+    """Lève toujours une erreur."""
+    raise RuntimeError("boom")
+
+
+def _state(*calls):
+    tool_calls = [
+        {"name": name, "args": {"value": value}, "id": f"call_{i}", "type": "tool_call"}
+        for i, (name, value) in enumerate(calls)
+    ]
+    return {"messages": [AIMessage(content="", tool_calls=tool_calls)]}
+
+
+def test_calls_run_in_parallel_and_keep_order():
+    """Les appels tournent en parallèle et les résultats suivent l'ordre des appels"""
+    node = ParallelToolNode([slow_echo], max_workers=4)
+    state = _state(("slow_echo", "a"), ("slow_echo", "b"), ("slow_echo", "c"))
+
+    started = time.perf_counter()
+    result = node.invoke(state, {})
+    elapsed = time.perf_counter() - started
+
+    assert [m.content for m in result["messages"]] == ["a", "b", "c"]
+    assert [m.tool_call_id for m in result["messages"]] == ["call_0", "call_1", "call_2"]
+    assert elapsed < 0.5
+    timing = result["messages"][0].response_metadata["tool_timing"]
+    assert timing["duration_ms"] >= 200
+
+
+def test_per_tool_cap_serializes_calls():
+    """Un plafond de 1 sérialise les appels du même outil"""
+    node = ParallelToolNode([serialized], max_workers=4, concurrency_limits={"serialized": 1})
+    state = _state(("serialized", "a"), ("serialized", "b"), ("serialized", "c"))
+
+    started = time.perf_counter()
+    result = node.invoke(state, {})
+    elapsed = time.perf_counter() - started
+
+    assert elapsed >= 0.3
+    waits = sorted(m.response_metadata["tool_timing"]["wait_ms"] for m in result["messages"])
+    assert waits[-1] >= 150
+
+
+def test_async_path_and_errors():
+    """Le chemin asynchrone transforme les erreurs en ToolMessage"""
+    node = ParallelToolNode([slow_echo, broken], max_workers=4)
+    state = _state(("slow_echo", "a"), ("broken", "b"), ("unknown", "c"))
+
+    result = asyncio.run(node.ainvoke(state, {}))
+
+    ok, failed, unknown = result["messages"]
+    assert ok.content == "a"
+    assert failed.status == "error" and "boom" in failed.content
+    assert unknown.status == "error"
+
+
+@lc_tool
+def hung(value: str) -> str:
+    """Ne répond pas avant 1 s."""
+    time.sleep(1.0)
+    return value
+
+
+@lc_tool
+async def hung_async(value: str) -> str:
+    """Coroutine qui ne répond pas avant 1 s."""
+    await asyncio.sleep(1.0)
+    return value
+
+
+def test_sync_timeout_returns_structured_error():
+    """Un outil qui dépasse son échéance est abandonné, les autres appels aboutissent"""
+    node = ParallelToolNode([hung, slow_echo], max_workers=4, timeouts={"hung": 0.1})
+    state = _state(("hung", "a"), ("slow_echo", "b"))
+    before = tool_stats.snapshot()["tools"].get("hung", {}).get("timeouts", 0)
+
+    started = time.perf_counter()
+    timed_out, ok = node.invoke(state, {})["messages"]
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.5
+    assert ok.content == "b"
+    assert timed_out.status == "error" and timed_out.tool_call_id == "call_0"
+    assert json.loads(timed_out.content)["error"] == "timeout"
+    assert timed_out.response_metadata["tool_timing"]["timed_out"] is True
+    assert tool_stats.snapshot()["tools"]["hung"]["timeouts"] == before + 1
+
+
+def test_async_timeout_cancels_coroutine():
+    """Sur le chemin asynchrone, la coroutine en retard est annulée ; « * » sert de défaut"""
+    node = ParallelToolNode([hung_async, slow_echo], max_workers=4, timeouts={"*": 0.1, "slow_echo": 0})
+    state = _state(("hung_async", "a"), ("slow_echo", "b"))
+
+    started = time.perf_counter()
+    timed_out, ok = asyncio.run(node.ainvoke(state, {}))["messages"]
+
+    assert time.perf_counter() - started < 0.5
+    assert ok.content == "b"
+    assert json.loads(timed_out.content)["timeout_s"] == 0.1
+    assert node.timeout_for("slow_echo") is None
+
+
+def test_sync_timeout_skips_calls_still_queued():
+    """Un appel qui dépasse son échéance en attendant le plafond de l'outil ne s'exécute jamais"""
+    executed = []
+
+    @lc_tool
+    def book(value: str) -> str:
+        """Réservation lente, une à la fois."""
+        executed.append(value)
+        time.sleep(0.3)
+        return value
+
+    node = ParallelToolNode([book], max_workers=4, concurrency_limits={"book": 1}, timeouts={"book": 0.2})
+    messages = node.invoke(_state(("book", "a"), ("book", "b"), ("book", "c")), {})["messages"]
+    time.sleep(0.4)  # « a » libère le plafond : les appels abandonnés ne doivent pas démarrer
+
+    assert [json.loads(m.content)["error"] for m in messages] == ["timeout"] * 3
+    assert executed == ["a"]
@@ -0,0 +1,54 @@
+"""
+Tests de l'encodage compact des résultats d'outils
+"""
+import json
+
+from src.graph.tool_output import COMPACT, FULL, compact_slots, encode, expand, hoist_common, resolve_mode
+from src.graph.tools import TOOL_OUTPUT_MODES, check_availability, output_mode
+from tools import check_availability as check_availability_raw
+
+
+def test_hoist_and_expand_round_trip():
+    """Les champs communs sont regroupés puis restitués à l'identique"""
+    records = [
+        {"id": "a", "source": "mock", "tz": "Europe/Rome"},
+        {"id": "b", "source": "mock", "tz": "Europe/Rome"},
+    ]
+    hoisted = hoist_common(records)
+    assert hoisted == {"common": {"source": "mock", "tz": "Europe/Rome"}, "items": [{"id": "a"}, {"id": "b"}]}
+    assert expand(hoisted) == records
+    assert expand([{"id": "a"}]) == [{"id": "a"}]
+
+
+def test_compact_slots_keeps_free_slots_by_day():
+    """Seuls les créneaux libres restent, groupés par jour, sans champs répétés ni reason null"""
+    slots = check_availability_raw("agent1", "2030-03-04")
+    compact = compact_slots(slots)
+
+    free = [s for s in slots if s["is_available"]]
+    assert compact["free"] == {"2030-03-04": [s["start_iso"][11:16] for s in free]}
+    assert compact["busy_count"] == len(slots) - len(free)
+    assert compact["agent_id"] == "agent1" and compact["timezone"] == "Europe/Rome"
+    assert "reason" not in compact
+    assert len(encode("check_availability", slots, COMPACT)) < len(encode("check_availability", slots, FULL)) / 3
+
+
+def test_mode_resolution_order():
+    """Réglage explicite, puis « * », puis défaut du code"""
+    defaults = {"check_availability": COMPACT}
+    assert resolve_mode("check_availability", {}, defaults) == COMPACT
+    assert resolve_mode("check_availability", {"*": FULL}, defaults) == FULL
+    assert resolve_mode("check_availability", {"*": FULL, "check_availability": COMPACT}, defaults) == COMPACT
+    assert resolve_mode("calc", {"calc": "unknown"}, defaults) == FULL
+
+
+def test_mode_is_part_of_cache_key(set_env):
+    """Changer de mode ne renvoie pas un résultat mis en cache dans l'autre mode"""
+    args = {"agent_id": "agent2", "window": "2030-03-04"}
+    assert output_mode("check_availability") == TOOL_OUTPUT_MODES["check_availability"] == COMPACT
+    compact = json.loads(check_availability.invoke(args))
+    assert "free" in compact
+
+    set_env(TOOL_OUTPUT_MODES="check_availability:full")
+    full = json.loads(check_availability.invoke(args))
+    assert isinstance(full, list) and "is_available" in full[0]
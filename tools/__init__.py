@@ -1,9 +1,12 @@
 from .calculator import calculate_expression
 from .system import get_current_time
 from .check_availability import check_availability
-from .create_event import create_event,create_event_sync
+from .create_event import create_event,create_event_sync,cancel_event
+from .booking import book_visit, abook_visit
 from .agent_info import get_agent_info, list_agents, find_agent_by_speciality, get_agent_availability_summary
 from .client_validation import validate_client_data, create_client_info, suggest_agent_by_preferences, format_client_summary
+from .batch_lookup import get_properties_info, get_property_summaries, get_agents_info, get_properties_by_agents
+from .store_hooks import on_store_change, notify_store_change, AGENTS_STORE, PROPERTIES_STORE, EVENTS_STORE
 from .property_manager import get_property_info, list_properties, search_properties_by_criteria, get_properties_by_agent, get_property_summary, suggest_properties_for_client
 
 __all__ = [
@@ -20,12 +23,24 @@ __all__ = [
     "suggest_agent_by_preferences",
     "format_client_summary",
     "create_event_sync",
+    "cancel_event",
+    "book_visit",
+    "abook_visit",
     "get_property_info",
     "list_properties",
     "search_properties_by_criteria",
     "get_properties_by_agent",
     "get_property_summary",
     "suggest_properties_for_client",
+    "get_properties_info",
+    "get_property_summaries",
+    "get_agents_info",
+    "get_properties_by_agents",
+    "on_store_change",
+    "notify_store_change",
+    "AGENTS_STORE",
+    "PROPERTIES_STORE",
+    "EVENTS_STORE",
 ]
 
 
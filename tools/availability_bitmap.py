@@ -0,0 +1,221 @@
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Résolution des bitmaps : un bit par tranche de 5 minutes, 288 bits par jour
+BUCKET_MIN = 5
+BUCKETS_PER_DAY = 24 * 60 // BUCKET_MIN
+# Journées (agent, date) gardées en mémoire
+MAX_DAYS = 50_000
+
+Span = Tuple[datetime, datetime]
+WorkingBlocks = Callable[[datetime, Optional[str]], Iterable[Span]]
+BusySource = Callable[[str, datetime], Iterable[Span]]
+
+
+def _bucket(dt: datetime, day: datetime, round_up: bool) -> int:
+    """Indice de tranche de dt dans la journée day (borné à [0, BUCKETS_PER_DAY])"""
+    offset = (dt.date() - day.date()).days
+    if offset:
+        return 0 if offset < 0 else BUCKETS_PER_DAY
+    minutes = dt.hour * 60 + dt.minute
+    index, rest = divmod(minutes, BUCKET_MIN)
+    if round_up and (rest or dt.second or dt.microsecond):
+        index += 1
+    return index
+
+
+def span_mask(start: datetime, end: datetime, day: datetime) -> int:
+    """
+    Bits des tranches de day touchées par [start, end).
+
+    Arrondi vers l'extérieur : une plage occupée bloque toute tranche entamée.
+    """
+    lo, hi = _bucket(start, day, round_up=False), _bucket(end, day, round_up=True)
+    return ((1 << (hi - lo)) - 1) << lo if hi > lo else 0
+
+
+@lru_cache(maxsize=32)
+def _step_mask(step: int) -> int:
+    """Un bit toutes les step tranches depuis minuit"""
+    mask = 0
+    for b in range(0, BUCKETS_PER_DAY, step):
+        mask |= 1 << b
+    return mask
+
+
+def slot_starts(free: int, width: int, step: int = 1) -> int:
+    """
+    Bits des tranches où commence un créneau libre de width tranches.
+
+    free & (free >> 1) & ... & (free >> width-1), en doublant le décalage
+    (log2(width) opérations), puis restreint aux départs alignés sur step.
+    """
+    fits, span = free, 1
+    while span < width:
+        shift = min(span, width - span)
+        fits &= fits >> shift
+        span += shift
+    return fits & _step_mask(step) if step > 1 else fits
+
+
+class AvailabilityCalendar:
+    """
+    Disponibilités par agent et par jour sous forme de bitmaps (entiers Python).
+
+    Pour chaque journée : un masque des heures de travail (par demi-journée)
+    et un masque occupé (sources d'occupation : agenda simulé, rendez-vous
+    pris). Un créneau est libre si ses bits sont tous dans
+    ``travail & ~occupé`` : un ET et une comparaison, quel que soit le nombre
+    de rendez-vous. Les journées sont construites à la demande puis gardées
+    (LRU) ; mark_busy les met à jour en place à chaque réservation.
+    """
+
+    def __init__(self, working_blocks: WorkingBlocks, busy_sources: Iterable[BusySource], max_days: int = MAX_DAYS):
+        self._working_blocks = working_blocks
+        self._busy_sources = tuple(busy_sources)
+        self._max_days = max_days
+        self._busy: "OrderedDict[Tuple[str, date], int]" = OrderedDict()
+        self._working: Dict[Tuple[date, Optional[str]], int] = {}
+        self._generation = 0  # incrémenté à chaque modification (mark_busy, invalidate)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _day_start(dt: datetime) -> datetime:
+        return dt.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def working_mask(self, day: datetime, daypart: Optional[str] = None) -> int:
+        """Bits des heures de travail de la journée (ou de la demi-journée)"""
+        key = (day.date(), daypart)
+        mask = self._working.get(key)
+        if mask is None:
+            mask = 0
+            for start, end in self._working_blocks(day, daypart):
+                mask |= span_mask(start, end, day)
+            if len(self._working) >= self._max_days:
+                self._working.clear()
+            self._working[key] = mask
+        return mask
+
+    def busy_mask(self, agent_id: str, day: datetime) -> int:
+        """Bits occupés de la journée pour l'agent"""
+        key = (agent_id, day.date())
+        with self._lock:
+            mask = self._busy.get(key)
+            if mask is not None:
+                self._busy.move_to_end(key)
+                return mask
+            generation = self._generation
+        mask = 0
+        for source in self._busy_sources:
+            for start, end in source(agent_id, day):
+                mask |= span_mask(start, end, day)
+        with self._lock:
+            # Réservation ou annulation pendant la construction : masque non gardé
+            if generation != self._generation:
+                return mask
+            self._busy[key] = mask
+            if len(self._busy) > self._max_days:
+                self._busy.popitem(last=False)
+        return mask
+
+    def free_mask(self, agent_id: str, day: datetime, daypart: Optional[str] = None) -> int:
+        """Bits libres (travail et non occupé) de la journée"""
+        day = self._day_start(day)
+        return self.working_mask(day, daypart) & ~self.busy_mask(agent_id, day)
+
+    def _days(self, start: datetime, end: datetime) -> Iterable[datetime]:
+        day = self._day_start(start)
+        while day < end:
+            yield day
+            day += timedelta(days=1)
+
+    def is_free(self, agent_id: str, start: datetime, end: datetime) -> bool:
+        """True si l'agent travaille et n'est pas occupé sur toute la plage [start, end)"""
+        for day in self._days(start, end):
+            need = span_mask(start, end, day)
+            if self.free_mask(agent_id, day) & need != need:
+                return False
+        return True
+
+    def _start_masks(
+        self, agent_id: str, start: datetime, end: datetime, duration_min: int, step_min: int, daypart: Optional[str]
+    ) -> Iterable[Tuple[datetime, int]]:
+        """(journée, bits des départs libres dans [start, end)) pour chaque journée de la fenêtre"""
+        width = -(-duration_min // BUCKET_MIN)
+        step = max(1, step_min // BUCKET_MIN)
+        first_day, last_day = start.date(), end.date()
+        for day in self._days(start, end):
+            free = self.working_mask(day, daypart) & ~self.busy_mask(agent_id, day)
+            starts = slot_starts(free, width, step) if free else 0
+            if not starts:
+                continue
+            # Départs limités à [start, end) : seules la première et la dernière journée sont coupées
+            if day.date() == first_day:
+                starts &= ~((1 << _bucket(start, day, round_up=True)) - 1)
+            if day.date() == last_day:
+                starts &= (1 << _bucket(end, day, round_up=True)) - 1
+            if starts:
+                yield day, starts
+
+    def free_slots(
+        self,
+        agent_id: str,
+        start: datetime,
+        end: datetime,
+        duration_min: int = 45,
+        step_min: int = 60,
+        daypart: Optional[str] = None,
+    ) -> List[Span]:
+        """
+        Créneaux libres de duration_min minutes commençant dans [start, end),
+        alignés sur step_min minutes depuis minuit.
+        """
+        duration = timedelta(minutes=duration_min)
+        found: List[Span] = []
+        for day, starts in self._start_masks(agent_id, start, end, duration_min, step_min, daypart):
+            while starts:
+                low = starts & -starts
+                s = day + timedelta(minutes=(low.bit_length() - 1) * BUCKET_MIN)
+                found.append((s, s + duration))
+                starts ^= low
+        return found
+
+    def count_free_slots(
+        self, agent_id: str, start: datetime, end: datetime, duration_min: int = 45, step_min: int = 60
+    ) -> int:
+        """Nombre de créneaux libres de la fenêtre, sans les construire"""
+        return sum(starts.bit_count() for _, starts in self._start_masks(agent_id, start, end, duration_min, step_min, None))
+
+    def first_free_slot(
+        self, agent_id: str, start: datetime, end: datetime, duration_min: int = 45, step_min: int = 60
+    ) -> Optional[Span]:
+        """Premier créneau libre de la fenêtre (None si l'agent n'est jamais libre)"""
+        for day, starts in self._start_masks(agent_id, start, end, duration_min, step_min, None):
+            s = day + timedelta(minutes=((starts & -starts).bit_length() - 1) * BUCKET_MIN)
+            return s, s + timedelta(minutes=duration_min)
+        return None
+
+    def mark_busy(self, agent_id: str, start: datetime, end: datetime) -> None:
+        """Ajoute une plage occupée aux journées déjà construites (les autres la liront à la construction)"""
+        with self._lock:
+            self._generation += 1
+            for day in self._days(start, end):
+                key = (agent_id, day.date())
+                if key in self._busy:
+                    self._busy[key] |= span_mask(start, end, day)
+
+    def invalidate(self, agent_id: str, start: datetime, end: datetime) -> None:
+        """Oublie les journées touchées par [start, end) : reconstruites au prochain accès (annulation)"""
+        with self._lock:
+            self._generation += 1
+            for day in self._days(start, end):
+                self._busy.pop((agent_id, day.date()), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._busy.clear()
+            self._working.clear()
@@ -0,0 +1,117 @@
+from __future__ import annotations
+from typing import Dict, Iterable, List, Optional
+
+from tools.agent_info import AGENTS_DB, get_agent_info
+from tools.property_manager import (
+    PROPERTIES_DB,
+    get_properties_by_agent,
+    get_property_info,
+    get_property_summary,
+)
+
+# Nombre maximal d'identifiants traités par appel
+MAX_BATCH_IDS = 50
+
+
+def _dedupe(ids: str | Iterable[str]) -> List[str]:
+    """
+    Normalise une liste d'identifiants : espaces retirés, doublons et vides
+    supprimés, ordre d'apparition conservé.
+
+    Args:
+        ids: Liste d'identifiants, ou chaîne séparée par des virgules
+
+    Returns:
+        Liste d'identifiants uniques (au plus MAX_BATCH_IDS)
+    """
+    if isinstance(ids, str):
+        ids = ids.split(",")
+    unique: List[str] = []
+    for raw in ids or []:
+        item = str(raw).strip()
+        if item and item not in unique:
+            unique.append(item)
+    return unique[:MAX_BATCH_IDS]
+
+
+def _project(record: Dict, fields: Optional[Iterable[str]]) -> Dict:
+    """
+    Ne garde que les champs demandés d'un enregistrement.
+
+    Args:
+        record: Enregistrement complet
+        fields: Champs à conserver (None ou vide : tous)
+
+    Returns:
+        Enregistrement réduit aux champs demandés qui existent
+    """
+    if not fields:
+        return record
+    return {name: record[name] for name in fields if name in record}
+
+
+def get_properties_info(property_ids: str | Iterable[str], fields: Optional[List[str]] = None) -> Dict[str, Optional[Dict]]:
+    """
+    Récupère les informations de plusieurs propriétés en un appel.
+
+    Args:
+        property_ids: Identifiants des propriétés (prop1, prop2, etc.)
+        fields: Champs à renvoyer (ex: ["title", "price"]), tous par défaut
+
+    Returns:
+        Dictionnaire property_id -> informations (None si inconnue)
+    """
+    return {
+        pid: _project(get_property_info(pid), fields) if pid in PROPERTIES_DB else None
+        for pid in _dedupe(property_ids)
+    }
+
+
+def get_property_summaries(property_ids: str | Iterable[str]) -> Dict[str, Optional[str]]:
+    """
+    Génère le résumé formaté de plusieurs propriétés en un appel.
+
+    Args:
+        property_ids: Identifiants des propriétés
+
+    Returns:
+        Dictionnaire property_id -> résumé (None si inconnue)
+    """
+    return {
+        pid: get_property_summary(pid) if pid in PROPERTIES_DB else None
+        for pid in _dedupe(property_ids)
+    }
+
+
+def get_agents_info(agent_ids: str | Iterable[str], fields: Optional[List[str]] = None) -> Dict[str, Optional[Dict]]:
+    """
+    Récupère les informations de plusieurs agents en un appel.
+
+    Args:
+        agent_ids: Identifiants des agents (agent1, agent2, agent3)
+        fields: Champs à renvoyer (ex: ["name", "phone"]), tous par défaut
+
+    Returns:
+        Dictionnaire agent_id -> informations (None si inconnu)
+    """
+    return {
+        aid: _project(get_agent_info(aid), fields) if aid in AGENTS_DB else None
+        for aid in _dedupe(agent_ids)
+    }
+
+
+def get_properties_by_agents(agent_ids: str | Iterable[str], fields: Optional[List[str]] = None) -> Dict[str, Optional[List[Dict]]]:
+    """
+    Récupère les propriétés gérées par plusieurs agents en un appel.
+
+    Args:
+        agent_ids: Identifiants des agents
+        fields: Champs à renvoyer pour chaque propriété, tous par défaut
+
+    Returns:
+        Dictionnaire agent_id -> liste des propriétés (None si agent inconnu)
+    """
+    return {
+        aid: [_project(prop, fields) for prop in get_properties_by_agent(aid)] if aid in AGENTS_DB else None
+        for aid in _dedupe(agent_ids)
+    }
@@ -0,0 +1,190 @@
+from __future__ import annotations
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from tools.check_availability import CALENDAR, TZ, _overlaps
+from tools.client_validation import validate_client_data
+from tools.create_event import (
+    BadRequestError,
+    EventConflictError,
+    _collect_busy,
+    _norm_dt,
+    create_event,
+    create_event_sync,
+)
+from tools.property_manager import PROPERTIES_DB
+
+# Nombre de créneaux proposés en cas de conflit et horizon de recherche (jours)
+MAX_ALTERNATIVES = 3
+ALTERNATIVES_HORIZON_DAYS = 7
+
+
+def _alternatives(agent_id: str, start_dt: datetime, duration: timedelta) -> List[Dict]:
+    """
+    Cherche les prochains créneaux libres à partir du jour demandé.
+
+    Args:
+        agent_id: Identifiant de l'agent
+        start_dt: Début du créneau refusé
+        duration: Durée de la visite
+
+    Returns:
+        Liste de créneaux libres {start_iso, end_iso}, au plus MAX_ALTERNATIVES
+    """
+    found: List[Dict] = []
+    day = start_dt.replace(hour=0, minute=0, second=0, microsecond=0)
+    begin = max(day, datetime.now(TZ))
+    # Le calendrier couvre agenda simulé et rendez-vous déjà pris
+    for s, e in CALENDAR.free_slots(agent_id, begin, day + timedelta(days=ALTERNATIVES_HORIZON_DAYS), duration_min=int(duration.total_seconds() // 60)):
+        if s == start_dt:
+            continue
+        found.append({"start_iso": s.isoformat(), "end_iso": e.isoformat()})
+        if len(found) >= MAX_ALTERNATIVES:
+            break
+    return found
+
+
+def _prepare_booking(
+    agent_id: str,
+    start: str | datetime,
+    client_name: str,
+    client_email: str,
+    client_phone: Optional[str],
+    property_id: Optional[str],
+    duration_min: int,
+    notes: Optional[str],
+) -> Tuple[Optional[Dict], Optional[Dict]]:
+    """
+    Valide la demande et vérifie le créneau, sans rien écrire.
+
+    Returns:
+        (réponse finale, None) si la réservation s'arrête là, sinon
+        (None, arguments de create_event)
+    """
+    is_valid, errors = validate_client_data({
+        "name": client_name or "",
+        "email": client_email or "",
+        "phone": client_phone or "",
+    })
+    if not is_valid:
+        return {"status": "invalid_client", "errors": errors}, None
+
+    prop = PROPERTIES_DB.get(property_id) if property_id else None
+    if property_id and prop is None:
+        return {"status": "bad_request", "errors": [f"Propriété {property_id} non trouvée"]}, None
+
+    try:
+        start_dt = _norm_dt(start)
+    except (TypeError, ValueError):
+        return {"status": "bad_request", "errors": [f"Date de début invalide: {start}"]}, None
+    end_dt = start_dt + timedelta(minutes=duration_min)
+    if start_dt < datetime.now(TZ):
+        return {"status": "bad_request", "errors": [f"Date de début passée: {start_dt.isoformat()}"]}, None
+
+    # Vérification du créneau avant d'écrire : heures de travail (même modèle que
+    # check_availability), puis agenda simulé + rendez-vous existants
+    if not CALENDAR.is_free(agent_id, start_dt, end_dt):
+        return _conflict(agent_id, start_dt, end_dt), None
+    busy = _collect_busy(agent_id, start_dt, end_dt)
+    if any(_overlaps(start_dt, end_dt, b_s, b_e) for b_s, b_e in busy):
+        return _conflict(agent_id, start_dt, end_dt), None
+
+    description = f"Client: {client_name} <{client_email}>"
+    if client_phone:
+        description += f", {client_phone}"
+    if notes:
+        description += f"\n{notes}"
+    return None, {
+        "agent_id": agent_id,
+        "start": start_dt,
+        "end": end_dt,
+        "title": f"Visite {prop.title}" if prop else f"Visite avec {client_name}",
+        "attendees": [{"name": client_name, "email": client_email}],
+        "location": prop.location if prop else None,
+        "description": description,
+    }
+
+
+def _conflict(agent_id: str, start_dt: datetime, end_dt: datetime) -> Dict:
+    return {
+        "status": "conflict",
+        "requested": {"start_iso": start_dt.isoformat(), "end_iso": end_dt.isoformat()},
+        "alternatives": _alternatives(agent_id, start_dt, end_dt - start_dt),
+    }
+
+
+def book_visit(
+    agent_id: str,
+    start: str | datetime,
+    client_name: str,
+    client_email: str,
+    client_phone: Optional[str] = None,
+    property_id: Optional[str] = None,
+    duration_min: int = 45,
+    notes: Optional[str] = None,
+) -> Dict:
+    """
+    Réserve une visite en un seul appel : validation du client, vérification
+    du créneau, création du rendez-vous, et alternatives en cas de conflit.
+
+    Args:
+        agent_id: Identifiant de l'agent
+        start: Date/heure de début (ISO)
+        client_name: Nom du client
+        client_email: Email du client
+        client_phone: Téléphone du client (optionnel)
+        property_id: Bien visité (optionnel, fixe le titre et le lieu)
+        duration_min: Durée de la visite en minutes
+        notes: Précisions ajoutées à la description
+
+    Returns:
+        Dictionnaire avec status "booked" (et l'événement), "conflict" (et les
+        alternatives), "invalid_client" ou "bad_request" (et les erreurs)
+    """
+    result, event_args = _prepare_booking(
+        agent_id, start, client_name, client_email, client_phone, property_id, duration_min, notes
+    )
+    if result is not None:
+        return result
+    try:
+        event = create_event_sync(**event_args)
+    except EventConflictError:
+        # Créneau pris entre la vérification et l'écriture
+        return _conflict(agent_id, event_args["start"], event_args["end"])
+    except BadRequestError as e:
+        return {"status": "bad_request", "errors": [str(e)]}
+    return {"status": "booked", "property_id": property_id, **event}
+
+
+async def abook_visit(
+    agent_id: str,
+    start: str | datetime,
+    client_name: str,
+    client_email: str,
+    client_phone: Optional[str] = None,
+    property_id: Optional[str] = None,
+    duration_min: int = 45,
+    notes: Optional[str] = None,
+) -> Dict:
+    """
+    Version asynchrone de book_visit : attend create_event directement, sans
+    thread ni boucle d'événements supplémentaires.
+
+    Args:
+        Voir book_visit
+
+    Returns:
+        Voir book_visit
+    """
+    result, event_args = _prepare_booking(
+        agent_id, start, client_name, client_email, client_phone, property_id, duration_min, notes
+    )
+    if result is not None:
+        return result
+    try:
+        event = await create_event(**event_args)
+    except EventConflictError:
+        return _conflict(agent_id, event_args["start"], event_args["end"])
+    except BadRequestError as e:
+        return {"status": "bad_request", "errors": [str(e)]}
+    return {"status": "booked", "property_id": property_id, **event}
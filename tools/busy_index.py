@@ -0,0 +1,94 @@
+from __future__ import annotations
+import threading
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+# (début, fin, identifiant) ; trié par début puis fin
+Interval = Tuple[datetime, datetime, str]
+
+
+class _AgentIntervals:
+    """Plages d'un agent triées par début, avec la durée maximale rencontrée."""
+
+    __slots__ = ("intervals", "max_length")
+
+    def __init__(self):
+        self.intervals: List[Interval] = []
+        self.max_length = timedelta(0)
+
+
+class BusyIndex:
+    """
+    Index des plages occupées par agent (liste triée + bisect).
+
+    Une plage qui chevauche [start, end) commence avant end et au plus tard
+    max_length avant start : la recherche se limite à cette tranche de la
+    liste triée, soit O(log n + k) quand les durées restent bornées (visites).
+    """
+
+    def __init__(self):
+        self._agents: Dict[str, _AgentIntervals] = {}
+        self._lock = threading.Lock()
+
+    def add(self, agent_id: str, start: datetime, end: datetime, key: str) -> None:
+        """
+        Ajoute une plage occupée.
+
+        Args:
+            agent_id: Identifiant de l'agent
+            start: Début de la plage
+            end: Fin de la plage
+            key: Identifiant de la plage (event_id), utilisé par remove
+        """
+        with self._lock:
+            agent = self._agents.setdefault(agent_id, _AgentIntervals())
+            insort(agent.intervals, (start, end, key))
+            agent.max_length = max(agent.max_length, end - start)
+
+    def remove(self, agent_id: str, start: datetime, end: datetime, key: str) -> bool:
+        """
+        Retire une plage ajoutée par add.
+
+        Returns:
+            True si la plage était présente
+        """
+        with self._lock:
+            agent = self._agents.get(agent_id)
+            if agent is None:
+                return False
+            i = bisect_left(agent.intervals, (start, end, key))
+            if i < len(agent.intervals) and agent.intervals[i] == (start, end, key):
+                del agent.intervals[i]
+                return True
+            return False
+
+    def overlapping(self, agent_id: str, start: datetime, end: datetime) -> List[Tuple[datetime, datetime]]:
+        """
+        Plages de l'agent qui chevauchent [start, end).
+
+        Returns:
+            Liste de (début, fin) triée par début
+        """
+        with self._lock:
+            agent = self._agents.get(agent_id)
+            if agent is None or not agent.intervals:
+                return []
+            intervals = agent.intervals
+            lo = bisect_left(intervals, (start - agent.max_length,))
+            hi = bisect_left(intervals, (end,), lo)
+            return [(s, e) for s, e, _ in intervals[lo:hi] if e > start]
+
+    def count(self, agent_id: str) -> int:
+        """Nombre de plages indexées pour un agent"""
+        with self._lock:
+            agent = self._agents.get(agent_id)
+            return len(agent.intervals) if agent else 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._agents.clear()
+
+
+# Rendez-vous pris (tools.create_event), lus aussi par le calendrier de disponibilités
+BOOKED_INTERVALS = BusyIndex()
@@ -3,7 +3,10 @@ from datetime import datetime, timedelta, time
 from zoneinfo import ZoneInfo
 import re
 import hashlib
+from functools import lru_cache
 from typing import List, Dict, Tuple, Optional
+from tools.availability_bitmap import AvailabilityCalendar, span_mask
+from tools.busy_index import BOOKED_INTERVALS
 
 TZ = ZoneInfo("Europe/Rome")
 
@@ -66,9 +69,11 @@ def _working_blocks(day: datetime, daypart: Optional[str]) -> List[Tuple[datetim
     return [morning, afternoon]
 
 # --- Ocupations simulées (déterministes) ---
-def _mock_busy(agent_id: str, day: datetime) -> List[Tuple[datetime, datetime]]:
+@lru_cache(maxsize=8192)
+def _mock_busy(agent_id: str, day: datetime) -> Tuple[Tuple[datetime, datetime], ...]:
     """
     Simule 0-2 événements occupés par jour, déterministes via hash(agent_id+date).
+    Mémoïsé (résultat immuable) : chaque réservation relit les mêmes journées.
     """
     seed_src = f"{agent_id}:{day.date().isoformat()}".encode()
     h = hashlib.sha256(seed_src).hexdigest()
@@ -91,21 +96,29 @@ def _mock_busy(agent_id: str, day: datetime) -> List[Tuple[datetime, datetime]]:
         s = day.replace(hour=start_h, minute=0)
         busy.append((s, s + timedelta(minutes=45)))
 
-    return busy
+    return tuple(busy)
 
 def _overlaps(s1: datetime, e1: datetime, s2: datetime, e2: datetime) -> bool:
     return not (e1 <= s2 or e2 <= s1)
 
+def _booked_busy(agent_id: str, day: datetime) -> List[Tuple[datetime, datetime]]:
+    """Rendez-vous déjà pris (tools.create_event) qui touchent la journée"""
+    return BOOKED_INTERVALS.overlapping(agent_id, day, day + timedelta(days=1))
+
+# --- Calendrier en bitmaps (heures de travail, agenda simulé, rendez-vous pris) ---
+CALENDAR = AvailabilityCalendar(_working_blocks, (_mock_busy, _booked_busy))
+
 # --- Génération de slots ---
 def _generate_slots_for_day(agent_id: str, day: datetime, daypart: Optional[str]) -> List[Dict]:
     slots = []
-    busy = _mock_busy(agent_id, day)
+    free = CALENDAR.free_mask(agent_id, day)
     for block_start, block_end in _working_blocks(day, daypart):
         # Créneaux de 45 minutes, départ à H:00 uniquement (sobre pour la démo)
         start = block_start
         while start + timedelta(minutes=45) <= block_end:
             end = start + timedelta(minutes=45)
-            is_free = all(not _overlaps(start, end, b_s, b_e) for b_s, b_e in busy)
+            need = span_mask(start, end, day)
+            is_free = free & need == need
             slots.append({
                 "start_iso": start.isoformat(),
                 "end_iso": end.isoformat(),
@@ -115,7 +128,7 @@ def _generate_slots_for_day(agent_id: str, day: datetime, daypart: Optional[str]
                 "is_available": bool(is_free),
                 "source": "calendar:mock",
                 "confidence": 0.82 if is_free else 0.7,
-                "reason": None if is_free else "Busy event overlaps (mock)",
+                "reason": None if is_free else "Busy event overlaps",
             })
             start += timedelta(hours=1)  # on avance d'une heure (créneau suivant)
     return slots
@@ -6,14 +6,16 @@ from typing import List, Dict, Optional
 from uuid import uuid5, NAMESPACE_DNS
 import os
 import re
-import asyncio
-from tools.check_availability import _mock_busy, _overlaps
+from tools.busy_index import BOOKED_INTERVALS
+from tools.check_availability import CALENDAR, _mock_busy, _overlaps
+from tools.loop_runner import loop_runner
+from tools.store_hooks import EVENTS_STORE, notify_store_change
 
 TZ = ZoneInfo("Europe/Rome")
 
 # --- Registry mémoire (fake DB) ---
 _EVENTS: Dict[str, Dict] = {}                 # event_id -> event dict
-_AGENT_BUSY_EXTRA: Dict[str, List[tuple]] = {}  # agent_id -> list[(start_dt, end_dt)]
+_BUSY_INDEX = BOOKED_INTERVALS               # agent_id -> plages des events créés (triées)
 
 # --- Exceptions métier ---
 class EventConflictError(Exception):
@@ -45,10 +47,6 @@ def _validate_attendees(attendees: List[Dict]) -> List[Dict]:
         norm.append({"email": email, "name": name})
     return norm
 
-def _ensure_agent_registry(agent_id: str):
-    if agent_id not in _AGENT_BUSY_EXTRA:
-        _AGENT_BUSY_EXTRA[agent_id] = []
-
 def _existing_busy_for_agent(agent_id: str) -> List[tuple]:
     # Combine les busy “mock” de la journée + les events déjà créés pour l’agent
     busy = []
@@ -59,21 +57,13 @@ def _existing_busy_for_agent(agent_id: str) -> List[tuple]:
 def _collect_busy(agent_id: str, start: datetime, end: datetime) -> List[tuple]:
     """Construit la liste des plages occupées (mock + events déjà créés) pour la période concernée."""
     busy = []
-    # Mock occupé jour par jour (réutilise _mock_busy si présent dans ton module)
+    # Mock occupé jour par jour (mémoïsé dans check_availability)
     day_cursor = start.replace(hour=0, minute=0, second=0, microsecond=0)
     while day_cursor < end:
-        try:
-            # suppose que _mock_busy(agent_id, day_cursor) est défini dans le module précédent
-            busy.extend(_mock_busy(agent_id, day_cursor))
-        except NameError:
-            # si _mock_busy n'existe pas dans ce module, on n'ajoute rien (toujours OK pour la démo)
-            pass
+        busy.extend(_mock_busy(agent_id, day_cursor))
         day_cursor += timedelta(days=1)
-    # Événements déjà créés (mémoire)
-    for ev in _EVENTS.values():
-        if ev["agent_id"] != agent_id:
-            continue
-        busy.append((ev["start_dt"], ev["end_dt"]))
+    # Événements déjà créés qui chevauchent la période (index trié par agent)
+    busy.extend(_BUSY_INDEX.overlapping(agent_id, start, end))
     return busy
 
 def _to_ics_dt(dt: datetime) -> str:
@@ -198,7 +188,6 @@ async def create_event(
         raise BadRequestError("Durée minimale 15 minutes.")
 
     atts = _validate_attendees(attendees or [])
-    _ensure_agent_registry(agent_id)
 
     # Conflits
     busy = _collect_busy(agent_id, start_dt, end_dt)
@@ -228,8 +217,14 @@ async def create_event(
     }
 
     # Ajoute à la "DB"
+    previous = _EVENTS.get(event_id)
+    if previous is not None:  # même créneau recréé (allow_conflict)
+        _BUSY_INDEX.remove(agent_id, previous["start_dt"], previous["end_dt"], event_id)
+        CALENDAR.invalidate(agent_id, previous["start_dt"], previous["end_dt"])
     _EVENTS[event_id] = event
-    _AGENT_BUSY_EXTRA[agent_id].append((start_dt, end_dt))
+    _BUSY_INDEX.add(agent_id, start_dt, end_dt, event_id)
+    CALENDAR.mark_busy(agent_id, start_dt, end_dt)
+    notify_store_change(EVENTS_STORE)
 
     # ICS
     ics = _make_ics_content(event)
@@ -250,6 +245,26 @@ async def create_event(
     }
 
 
+def cancel_event(event_id: str) -> Dict:
+    """
+    Annule un événement créé par create_event et libère son créneau.
+    Lève BadRequestError si l'événement est inconnu.
+    """
+    event = _EVENTS.pop(event_id, None)
+    if event is None:
+        raise BadRequestError(f"Événement inconnu: {event_id}")
+    _BUSY_INDEX.remove(event["agent_id"], event["start_dt"], event["end_dt"], event_id)
+    CALENDAR.invalidate(event["agent_id"], event["start_dt"], event["end_dt"])
+    notify_store_change(EVENTS_STORE)
+    return {
+        "event_id": event_id,
+        "agent_id": event["agent_id"],
+        "start_iso": event["start_dt"].isoformat(),
+        "end_iso": event["end_dt"].isoformat(),
+        "status": "cancelled",
+    }
+
+
 def create_event_sync(
     agent_id: str,
     start: str | datetime,
@@ -262,54 +277,21 @@ def create_event_sync(
     send_email: bool = True,
 ) -> Dict:
     """
-    Version synchrone de create_event pour la compatibilité
+    Version synchrone de create_event pour la compatibilité.
+    S'exécute sur la boucle d'arrière-plan partagée (tools.loop_runner) ;
+    les erreurs (conflit, paramètres) sont relevées telles quelles.
     """
-    try:
-        # Créer une nouvelle boucle d'événements si nécessaire
-        try:
-            loop = asyncio.get_running_loop()
-            # Si on est déjà dans une boucle, on utilise asyncio.create_task
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(asyncio.run, create_event(
-                    agent_id=agent_id,
-                    start=start,
-                    end=end,
-                    title=title,
-                    attendees=attendees,
-                    location=location,
-                    description=description,
-                    allow_conflict=allow_conflict,
-                    send_email=send_email
-                ))
-                return future.result()
-        except RuntimeError:
-            # Pas de boucle en cours, on peut utiliser asyncio.run
-            return asyncio.run(create_event(
-                agent_id=agent_id,
-                start=start,
-                end=end,
-                title=title,
-                attendees=attendees,
-                location=location,
-                description=description,
-                allow_conflict=allow_conflict,
-                send_email=send_email
-            ))
-    except Exception as e:
-        print(f"Erreur lors de la création de l'événement: {e}")
-        # Fallback sans email en cas d'erreur
-        return asyncio.run(create_event(
-            agent_id=agent_id,
-            start=start,
-            end=end,
-            title=title,
-            attendees=attendees,
-            location=location,
-            description=description,
-            allow_conflict=allow_conflict,
-            send_email=False
-        ))
+    return loop_runner.run(create_event(
+        agent_id=agent_id,
+        start=start,
+        end=end,
+        title=title,
+        attendees=attendees,
+        location=location,
+        description=description,
+        allow_conflict=allow_conflict,
+        send_email=send_email
+    ))
 
 # --- Exemple d'utilisation ---
 if __name__ == "__main__":
@@ -0,0 +1,100 @@
+from __future__ import annotations
+import asyncio
+import atexit
+import os
+import threading
+from typing import Any, Coroutine, Optional
+
+# Coroutines en attente ou en cours au-delà desquelles les appelants synchrones attendent
+MAX_PENDING = 64
+# Attente maximale d'une place libre avant d'abandonner (secondes)
+SUBMIT_TIMEOUT_S = 30.0
+
+
+class LoopRunnerBusyError(Exception):
+    """Trop de coroutines en attente sur la boucle d'arrière-plan."""
+
+
+class BackgroundLoopRunner:
+    """
+    Boucle d'événements longue durée, dans un thread dédié, sur laquelle le code
+    synchrone exécute des coroutines (run_coroutine_threadsafe) sans créer de
+    boucle ni de thread à chaque appel.
+    """
+
+    def __init__(self, max_pending: int = MAX_PENDING, submit_timeout: float = SUBMIT_TIMEOUT_S, name: str = "tools-loop"):
+        self.name = name
+        self.max_pending = max_pending
+        self.submit_timeout = submit_timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            # Relance après un fork : le thread de la boucle n'existe pas dans l'enfant
+            if self._loop is None or self._pid != os.getpid() or not self._thread.is_alive():
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+                thread = threading.Thread(target=self._serve, args=(loop, ready), name=self.name, daemon=True)
+                thread.start()
+                ready.wait()
+                self._loop, self._thread, self._pid = loop, thread, os.getpid()
+            return self._loop
+
+    @staticmethod
+    def _serve(loop: asyncio.AbstractEventLoop, ready: threading.Event) -> None:
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    def run(self, coro: Coroutine[Any, Any, Any], timeout: Optional[float] = None) -> Any:
+        """
+        Exécute une coroutine sur la boucle d'arrière-plan et attend son résultat.
+
+        Args:
+            coro: Coroutine à exécuter
+            timeout: Attente maximale du résultat en secondes (None : sans limite)
+
+        Returns:
+            Le résultat de la coroutine ; ses exceptions sont relevées telles quelles
+
+        Raises:
+            LoopRunnerBusyError: si aucune place ne se libère à temps
+            RuntimeError: si appelé depuis la boucle d'arrière-plan elle-même
+        """
+        loop = self._ensure_started()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("run() appelé depuis la boucle d'arrière-plan : utilisez await")
+        if not self._slots.acquire(timeout=self.submit_timeout):
+            coro.close()
+            raise LoopRunnerBusyError(f"{self.name}: plus de {self.max_pending} coroutines en attente")
+        try:
+            future = asyncio.run_coroutine_threadsafe(coro, loop)
+        except BaseException:
+            self._slots.release()
+            coro.close()
+            raise
+        # La place se libère à la fin de la coroutine, même si l'appelant abandonne l'attente
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result(timeout)
+
+    def close(self) -> None:
+        """Arrête la boucle d'arrière-plan (relancée au prochain appel si besoin)"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is not None and thread is not None and thread.is_alive():
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=5)
+
+
+# Instance globale partagée par les outils synchrones
+loop_runner = BackgroundLoopRunner()
+atexit.register(loop_runner.close)
@@ -0,0 +1,35 @@
+from __future__ import annotations
+import threading
+from typing import Callable, Dict, List
+
+# Noms des "stores" de données simulés
+AGENTS_STORE = "agents"          # tools.agent_info.AGENTS_DB
+PROPERTIES_STORE = "properties"  # tools.property_manager.PROPERTIES_DB
+EVENTS_STORE = "events"          # tools.create_event._EVENTS
+
+_LISTENERS: Dict[str, List[Callable[[], None]]] = {}
+_LOCK = threading.Lock()
+
+def on_store_change(store: str, callback: Callable[[], None]) -> None:
+    """
+    Enregistre un callback appelé à chaque modification d'un store.
+    
+    Args:
+        store: Nom du store (AGENTS_STORE, PROPERTIES_STORE, EVENTS_STORE)
+        callback: Fonction sans argument (ex: invalidation d'un cache)
+    """
+    with _LOCK:
+        _LISTENERS.setdefault(store, []).append(callback)
+
+def notify_store_change(store: str) -> None:
+    """
+    Signale qu'un store a été modifié. Tout code qui modifie AGENTS_DB,
+    PROPERTIES_DB ou le registre d'événements doit l'appeler.
+    
+    Args:
+        store: Nom du store modifié
+    """
+    with _LOCK:
+        callbacks = list(_LISTENERS.get(store, []))
+    for callback in callbacks:
+        callback()